@@ -1,15 +1,31 @@
+import time
 from uuid import uuid4
 
-from fastapi import Depends
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from fastapi import Depends, status
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import Environment, settings
 from app.core.exceptions import InvalidTokenError
+from app.core.metrics import registry
+from app.core.request_context import request_id_ctx
 from app.core.security import SecurityService, get_security_service, oauth2_schemes
+from app.db.instrumentation import track_db_operations
 from app.models.user_model import UserResponse
 from app.services.user_service import UserService, get_user_service
 
+_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ("method", "route", "status"),
+)
+_request_db_operations = registry.histogram(
+    "http_request_db_operations",
+    "MongoDB operations issued per HTTP request",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+
 
 async def get_current_user(
     token: str = Depends(oauth2_schemes),
@@ -23,18 +39,51 @@ async def get_current_user(
     if not user_id:
         raise InvalidTokenError("Invalid token payload")
 
-    user = await user_service.get_by_id(user_id)
-    user_copy = dict(user)
-    user_copy["id"] = str(user_copy.pop("_id"))
-    user_copy.pop("password", None)
-    return UserResponse(**user_copy)
+    return await user_service.get_profile(user_id)
+
+
+class RequestIDMiddleware:
+    """Pure ASGI middleware that tags each request with an ID and times it.
+
+    Unlike ``BaseHTTPMiddleware`` it does not wrap the app in an extra task or
+    buffer the response, so streaming responses pass straight through.
+    """
 
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
         request_id = str(uuid4())
-        request.state.request_id = request_id
+        # Backs request.state for everything further down the stack
+        scope.setdefault("state", {})["request_id"] = request_id
+        request_id_token = request_id_ctx.set(request_id)
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        start = time.perf_counter()
+
+        with track_db_operations() as db_operations:
+
+            async def send_with_headers(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-Request-ID", request_id)
+                    if settings.ENVIRONMENT != Environment.PRODUCTION:
+                        headers.append("X-DB-Operations", str(db_operations.total))
+                await send(message)
 
-        response: Response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                # Label by route template, never the raw path, to bound cardinality
+                route = getattr(scope.get("route"), "path", "<unmatched>")
+                labels = dict(method=scope["method"], route=route, status=status_code)
+                _request_duration.observe(time.perf_counter() - start, **labels)
+                _request_db_operations.observe(
+                    db_operations.total, method=scope["method"], route=route
+                )
+                request_id_ctx.reset(request_id_token)
@@ -0,0 +1,61 @@
+import asyncio
+
+from fastapi import APIRouter, status
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.core.exceptions import DatabaseConnectionError
+from app.db.mongodb import get_mongodb_client
+from app.models.health_model import MongoHealth, ReadinessReport
+from app.util.response_builder import ModelJSONResponse
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live", summary="The process is up")
+async def liveness():
+    return {"status": "alive"}
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessReport,
+    responses={503: {"model": ReadinessReport}},
+    summary="Mongo answers and its connection pool has room",
+)
+async def readiness():
+    mongo_client = get_mongodb_client()
+    ping_ms = error = None
+    try:
+        # The ping checks out a pooled connection, so an exhausted pool
+        # shows up here as a timeout
+        ping = await asyncio.wait_for(
+            mongo_client.ping(), settings.READINESS_TIMEOUT_SECONDS
+        )
+        ping_ms = round(ping * 1000, 3)
+    except TimeoutError:
+        error = f"No ping reply within {settings.READINESS_TIMEOUT_SECONDS}s"
+    except DatabaseConnectionError as exc:
+        error = exc.message
+    except PyMongoError as exc:
+        error = str(exc)
+
+    pool = mongo_client.pool_stats()
+    saturated = pool.waiting > 0 and pool.in_use >= settings.MONGO_MAX_POOL_SIZE
+    mongo = MongoHealth(
+        reachable=ping_ms is not None,
+        ping_ms=ping_ms,
+        connections_open=pool.open,
+        connections_in_use=pool.in_use,
+        checkouts_waiting=pool.waiting,
+        max_pool_size=settings.MONGO_MAX_POOL_SIZE,
+        saturated=saturated,
+        error=error,
+    )
+    ready = mongo.reachable and not saturated
+    return ModelJSONResponse(
+        ReadinessReport(status="ready" if ready else "unavailable", mongo=mongo),
+        status_code=status.HTTP_200_OK
+        if ready
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request, status
+
+from app.api.dependencies import get_current_user
+from app.models.account_model import (
+    AccountBalance,
+    AccountCreate,
+    AccountResponse,
+    AccountUpdate,
+)
+from app.models.response_model import SuccessResponse
+from app.models.user_model import UserResponse
+from app.services.account_service import AccountService, get_account_service
+from app.util.clock import utc_now
+from app.util.response_builder import build_success_response
+
+router = APIRouter(prefix="/accounts", tags=["accounts"])
+
+
+@router.post(
+    "",
+    response_model=SuccessResponse[AccountResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Open a new account",
+)
+async def create_account(
+    request: Request,
+    account_data: AccountCreate,
+    current_user: UserResponse = Depends(get_current_user),
+    account_service: AccountService = Depends(get_account_service),
+):
+    result = await account_service.create(str(current_user.id), account_data)
+    return build_success_response(
+        request, result, "Account created", status.HTTP_201_CREATED
+    )
+
+
+@router.get(
+    "",
+    response_model=SuccessResponse[list[AccountResponse]],
+    summary="List accounts with their current balances",
+)
+async def list_accounts(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+    account_service: AccountService = Depends(get_account_service),
+):
+    result = await account_service.list_by_user(str(current_user.id))
+    return build_success_response(request, result, "Accounts fetched")
+
+
+@router.get(
+    "/{account_id}",
+    response_model=SuccessResponse[AccountResponse],
+    summary="Get a single account",
+)
+async def get_account(
+    request: Request,
+    account_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    account_service: AccountService = Depends(get_account_service),
+):
+    result = await account_service.get_by_id(str(current_user.id), account_id)
+    return build_success_response(request, result, "Account fetched")
+
+
+@router.put(
+    "/{account_id}",
+    response_model=SuccessResponse[AccountResponse],
+    summary="Rename an account",
+)
+async def update_account(
+    request: Request,
+    account_id: str,
+    updates: AccountUpdate,
+    current_user: UserResponse = Depends(get_current_user),
+    account_service: AccountService = Depends(get_account_service),
+):
+    result = await account_service.update(str(current_user.id), account_id, updates)
+    return build_success_response(request, result, "Update successful")
+
+
+@router.get(
+    "/{account_id}/balance",
+    response_model=SuccessResponse[AccountBalance],
+    summary="Balance of an account at a point in time (now by default)",
+)
+async def get_account_balance(
+    request: Request,
+    account_id: str,
+    at: Annotated[datetime | None, Query()] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    account_service: AccountService = Depends(get_account_service),
+):
+    result = await account_service.balance_at(
+        str(current_user.id), account_id, at or utc_now()
+    )
+    return build_success_response(request, result, "Balance fetched")
@@ -0,0 +1,104 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request, status
+
+from app.api.dependencies import get_current_user
+from app.models.budget_model import (
+    BudgetAlertResponse,
+    BudgetCreate,
+    BudgetResponse,
+    BudgetUpdate,
+)
+from app.models.report_model import MONTH_PATTERN
+from app.models.response_model import SuccessResponse
+from app.models.user_model import UserResponse
+from app.services.budget_service import BudgetService, get_budget_service
+from app.util.conditional import make_etag, not_modified, with_validators
+from app.util.response_builder import build_success_response
+
+router = APIRouter(prefix="/budgets", tags=["budgets"])
+
+
+@router.post(
+    "",
+    response_model=SuccessResponse[BudgetResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Set a monthly budget for a category",
+)
+async def create_budget(
+    request: Request,
+    budget_data: BudgetCreate,
+    current_user: UserResponse = Depends(get_current_user),
+    budget_service: BudgetService = Depends(get_budget_service),
+):
+    result = await budget_service.create(str(current_user.id), budget_data)
+    return build_success_response(
+        request, result, "Budget created", status.HTTP_201_CREATED
+    )
+
+
+@router.get(
+    "",
+    response_model=SuccessResponse[list[BudgetResponse]],
+    summary="List budgets",
+)
+async def list_budgets(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+    budget_service: BudgetService = Depends(get_budget_service),
+):
+    user_id = str(current_user.id)
+    etag = make_etag("budgets", user_id, await budget_service.version(user_id))
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    result = await budget_service.list_by_user(user_id)
+    return with_validators(
+        build_success_response(request, result, "Budgets fetched"), etag
+    )
+
+
+@router.get(
+    "/alerts",
+    response_model=SuccessResponse[list[BudgetAlertResponse]],
+    summary="Alerts raised on budgets, newest month first",
+)
+async def list_budget_alerts(
+    request: Request,
+    month: Annotated[str | None, Query(pattern=MONTH_PATTERN)] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    budget_service: BudgetService = Depends(get_budget_service),
+):
+    result = await budget_service.list_alerts(str(current_user.id), month)
+    return build_success_response(request, result, "Budget alerts fetched")
+
+
+@router.put(
+    "/{budget_id}",
+    response_model=SuccessResponse[BudgetResponse],
+    summary="Change a budget's monthly limit",
+)
+async def update_budget(
+    request: Request,
+    budget_id: str,
+    updates: BudgetUpdate,
+    current_user: UserResponse = Depends(get_current_user),
+    budget_service: BudgetService = Depends(get_budget_service),
+):
+    result = await budget_service.update(str(current_user.id), budget_id, updates)
+    return build_success_response(request, result, "Update successful")
+
+
+@router.delete(
+    "/{budget_id}",
+    response_model=SuccessResponse[None],
+    summary="Delete a budget",
+)
+async def delete_budget(
+    request: Request,
+    budget_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    budget_service: BudgetService = Depends(get_budget_service),
+):
+    await budget_service.delete(str(current_user.id), budget_id)
+    return build_success_response(request, None, "Budget deleted")
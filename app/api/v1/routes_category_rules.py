@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, Request, status
+
+from app.api.dependencies import get_current_user
+from app.models.category_rule_model import CategoryRuleCreate, CategoryRuleResponse
+from app.models.response_model import SuccessResponse
+from app.models.user_model import UserResponse
+from app.services.category_rule_service import (
+    CategoryRuleService,
+    get_category_rule_service,
+)
+from app.util.conditional import make_etag, not_modified, with_validators
+from app.util.response_builder import build_success_response
+
+router = APIRouter(prefix="/category-rules", tags=["category rules"])
+
+
+@router.post(
+    "",
+    response_model=SuccessResponse[CategoryRuleResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Categorize imported transactions whose text contains a pattern",
+)
+async def create_category_rule(
+    request: Request,
+    rule_data: CategoryRuleCreate,
+    current_user: UserResponse = Depends(get_current_user),
+    rule_service: CategoryRuleService = Depends(get_category_rule_service),
+):
+    result = await rule_service.create(str(current_user.id), rule_data)
+    return build_success_response(
+        request, result, "Category rule created", status.HTTP_201_CREATED
+    )
+
+
+@router.get(
+    "",
+    response_model=SuccessResponse[list[CategoryRuleResponse]],
+    summary="List category rules, oldest first",
+)
+async def list_category_rules(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+    rule_service: CategoryRuleService = Depends(get_category_rule_service),
+):
+    user_id = str(current_user.id)
+    etag = make_etag("category_rules", user_id, await rule_service.version(user_id))
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    result = await rule_service.list_by_user(user_id)
+    return with_validators(
+        build_success_response(request, result, "Category rules fetched"), etag
+    )
+
+
+@router.put(
+    "/{rule_id}",
+    response_model=SuccessResponse[CategoryRuleResponse],
+    summary="Replace a category rule",
+)
+async def update_category_rule(
+    request: Request,
+    rule_id: str,
+    rule_data: CategoryRuleCreate,
+    current_user: UserResponse = Depends(get_current_user),
+    rule_service: CategoryRuleService = Depends(get_category_rule_service),
+):
+    result = await rule_service.update(str(current_user.id), rule_id, rule_data)
+    return build_success_response(request, result, "Update successful")
+
+
+@router.delete(
+    "/{rule_id}",
+    response_model=SuccessResponse[None],
+    summary="Delete a category rule",
+)
+async def delete_category_rule(
+    request: Request,
+    rule_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    rule_service: CategoryRuleService = Depends(get_category_rule_service),
+):
+    await rule_service.delete(str(current_user.id), rule_id)
+    return build_success_response(request, None, "Category rule deleted")
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, Request, status
+
+from app.api.dependencies import get_current_user
+from app.models.recurring_model import (
+    RecurringTransactionCreate,
+    RecurringTransactionResponse,
+)
+from app.models.response_model import SuccessResponse
+from app.models.user_model import UserResponse
+from app.services.recurring_service import (
+    RecurringTransactionService,
+    get_recurring_service,
+)
+from app.util.response_builder import build_success_response
+
+router = APIRouter(prefix="/recurring", tags=["recurring"])
+
+
+@router.post(
+    "",
+    response_model=SuccessResponse[RecurringTransactionResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Schedule a recurring transaction",
+)
+async def create_recurring(
+    request: Request,
+    item_data: RecurringTransactionCreate,
+    current_user: UserResponse = Depends(get_current_user),
+    recurring_service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    result = await recurring_service.create(str(current_user.id), item_data)
+    return build_success_response(
+        request, result, "Recurring transaction created", status.HTTP_201_CREATED
+    )
+
+
+@router.get(
+    "",
+    response_model=SuccessResponse[list[RecurringTransactionResponse]],
+    summary="List recurring transactions",
+)
+async def list_recurring(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+    recurring_service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    result = await recurring_service.list_by_user(str(current_user.id))
+    return build_success_response(request, result, "Recurring transactions fetched")
+
+
+@router.get(
+    "/{item_id}",
+    response_model=SuccessResponse[RecurringTransactionResponse],
+    summary="Get a recurring transaction",
+)
+async def get_recurring(
+    request: Request,
+    item_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    recurring_service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    result = await recurring_service.get_by_id(str(current_user.id), item_id)
+    return build_success_response(request, result, "Recurring transaction fetched")
+
+
+@router.delete(
+    "/{item_id}",
+    response_model=SuccessResponse[None],
+    summary="Stop a recurring transaction",
+)
+async def delete_recurring(
+    request: Request,
+    item_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    recurring_service: RecurringTransactionService = Depends(get_recurring_service),
+):
+    await recurring_service.delete(str(current_user.id), item_id)
+    return build_success_response(request, None, "Recurring transaction deleted")
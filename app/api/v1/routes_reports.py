@@ -0,0 +1,60 @@
+from datetime import UTC, datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.api.dependencies import get_current_user
+from app.models.report_model import MONTH_PATTERN, CategoryReport, MonthlyTotals
+from app.models.response_model import SuccessResponse
+from app.models.user_model import UserResponse
+from app.services.rollup_service import RollupService, get_rollup_service
+from app.util.response_builder import build_success_response
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+def _current_month() -> str:
+    return datetime.now(UTC).strftime("%Y-%m")
+
+
+def _months_ago(months: int) -> str:
+    now = datetime.now(UTC)
+    index = now.year * 12 + now.month - 1 - months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+@router.get(
+    "/spending-by-category",
+    response_model=SuccessResponse[CategoryReport],
+    summary="Income and spending per category for one month",
+)
+async def spending_by_category(
+    request: Request,
+    month: Annotated[str | None, Query(pattern=MONTH_PATTERN)] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    rollup_service: RollupService = Depends(get_rollup_service),
+):
+    result = await rollup_service.spending_by_category(
+        str(current_user.id), month or _current_month()
+    )
+    return build_success_response(request, result, "Report generated")
+
+
+@router.get(
+    "/monthly",
+    response_model=SuccessResponse[list[MonthlyTotals]],
+    summary="Month-over-month income and spending (last 12 months by default)",
+)
+async def monthly_totals(
+    request: Request,
+    start_month: Annotated[str | None, Query(pattern=MONTH_PATTERN)] = None,
+    end_month: Annotated[str | None, Query(pattern=MONTH_PATTERN)] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    rollup_service: RollupService = Depends(get_rollup_service),
+):
+    result = await rollup_service.monthly_totals(
+        str(current_user.id),
+        start_month or _months_ago(11),
+        end_month or _current_month(),
+    )
+    return build_success_response(request, result, "Report generated")
@@ -0,0 +1,194 @@
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import get_current_user
+from app.models.response_model import SuccessResponse
+from app.models.transaction_model import (
+    ExportFormat,
+    ImportSummary,
+    StatementFormat,
+    TransactionCreate,
+    TransactionPage,
+    TransactionResponse,
+    TransactionSearchPage,
+    TransactionUpdate,
+)
+from app.models.user_model import UserResponse
+from app.services.export_service import (
+    MEDIA_TYPES,
+    TransactionExportService,
+    get_export_service,
+)
+from app.services.import_service import StatementImportService, get_import_service
+from app.services.search_index import SearchFilters
+from app.services.search_service import TransactionSearchService, get_search_service
+from app.services.transaction_service import (
+    TransactionService,
+    get_transaction_service,
+)
+from app.util.response_builder import build_success_response
+
+router = APIRouter(prefix="/transactions", tags=["transactions"])
+
+
+@router.post(
+    "",
+    response_model=SuccessResponse[TransactionResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Record a new transaction",
+)
+async def create_transaction(
+    request: Request,
+    transaction_data: TransactionCreate,
+    current_user: UserResponse = Depends(get_current_user),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    result = await transaction_service.create(str(current_user.id), transaction_data)
+    return build_success_response(
+        request, result, "Transaction created", status.HTTP_201_CREATED
+    )
+
+
+@router.get(
+    "",
+    response_model=SuccessResponse[TransactionPage],
+    summary="List transactions, newest first, one page at a time",
+)
+async def list_transactions(
+    request: Request,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    cursor: Annotated[
+        str | None, Query(description="next_cursor of the last page")
+    ] = None,
+    start_date: Annotated[datetime | None, Query()] = None,
+    end_date: Annotated[datetime | None, Query()] = None,
+    category: Annotated[str | None, Query(max_length=50)] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    result = await transaction_service.list_by_user(
+        str(current_user.id), limit, cursor, start_date, end_date, category
+    )
+    return build_success_response(request, result, "Transactions fetched")
+
+
+@router.get(
+    "/search",
+    response_model=SuccessResponse[TransactionSearchPage],
+    summary="Search descriptions and merchants, best matches first",
+)
+async def search_transactions(
+    request: Request,
+    q: Annotated[
+        str, Query(min_length=1, max_length=100, description="Words or prefixes")
+    ],
+    min_amount: Annotated[float | None, Query(ge=0)] = None,
+    max_amount: Annotated[float | None, Query(ge=0)] = None,
+    start_date: Annotated[datetime | None, Query()] = None,
+    end_date: Annotated[datetime | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Annotated[
+        str | None, Query(description="next_cursor of the last page")
+    ] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    search_service: TransactionSearchService = Depends(get_search_service),
+):
+    filters = SearchFilters(min_amount, max_amount, start_date, end_date)
+    result = await search_service.search(
+        str(current_user.id), q, filters, limit, cursor
+    )
+    return build_success_response(request, result, "Search results fetched")
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Download the full transaction history, oldest first",
+)
+async def export_transactions(
+    format: Annotated[ExportFormat, Query()] = ExportFormat.CSV,
+    gzip: Annotated[bool, Query(description="Compress the download")] = False,
+    start_date: Annotated[datetime | None, Query()] = None,
+    end_date: Annotated[datetime | None, Query()] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    export_service: TransactionExportService = Depends(get_export_service),
+):
+    # Rows are encoded as the cursor yields them, never collected in a list
+    body = export_service.export(
+        str(current_user.id), format, gzip, start_date, end_date
+    )
+    filename = f"transactions.{format.value}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@router.post(
+    "/import",
+    response_model=SuccessResponse[ImportSummary],
+    summary="Import a CSV or OFX bank statement sent as the raw request body",
+)
+async def import_statement(
+    request: Request,
+    format: Annotated[StatementFormat, Query()] = StatementFormat.CSV,
+    account_id: Annotated[str | None, Query(description="Account to book into")] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    import_service: StatementImportService = Depends(get_import_service),
+):
+    # The body is consumed chunk by chunk as it arrives, never buffered whole
+    result = await import_service.import_statement(
+        str(current_user.id), request.stream(), format, account_id
+    )
+    return build_success_response(request, result, "Statement imported")
+
+
+@router.get(
+    "/{transaction_id}",
+    response_model=SuccessResponse[TransactionResponse],
+    summary="Get a single transaction",
+)
+async def get_transaction(
+    request: Request,
+    transaction_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    result = await transaction_service.get_by_id(str(current_user.id), transaction_id)
+    return build_success_response(request, result, "Transaction fetched")
+
+
+@router.put(
+    "/{transaction_id}",
+    response_model=SuccessResponse[TransactionResponse],
+    summary="Update a transaction",
+)
+async def update_transaction(
+    request: Request,
+    transaction_id: str,
+    updates: TransactionUpdate,
+    current_user: UserResponse = Depends(get_current_user),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    result = await transaction_service.update(
+        str(current_user.id), transaction_id, updates
+    )
+    return build_success_response(request, result, "Update successful")
+
+
+@router.delete(
+    "/{transaction_id}",
+    response_model=SuccessResponse[None],
+    summary="Delete a transaction",
+)
+async def delete_transaction(
+    request: Request,
+    transaction_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    await transaction_service.delete(str(current_user.id), transaction_id)
+    return build_success_response(request, None, "Transaction deleted")
@@ -1,22 +1,26 @@
 from fastapi import APIRouter, Depends, Request, status
 
 from app.api.dependencies import get_current_user
+from app.core.security import LoginThrottle, get_login_throttle
 from app.models.response_model import SuccessResponse
 from app.models.user_model import (
+    RefreshTokenRequest,
+    TokenResponse,
     UserCreate,
     UserLogin,
     UserResponse,
     UserUpdate,
 )
 from app.services.user_service import UserService, get_user_service
-from app.util.response_builder import build_success_response
+from app.util.conditional import make_etag, not_modified, with_validators
+from app.util.response_builder import ModelJSONResponse, build_success_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post(
     "/register",
-    response_model=SuccessResponse,
+    response_model=SuccessResponse[UserResponse],
     status_code=status.HTTP_201_CREATED,
     summary="Register a new user",
 )
@@ -26,33 +30,84 @@ async def register_user(
     user_service: UserService = Depends(get_user_service),
 ):
     new_user = await user_service.create(user_data)
-    return build_success_response(request, new_user, "User created successfully")
+    return build_success_response(
+        request, new_user, "User created successfully", status.HTTP_201_CREATED
+    )
 
 
 @router.post(
     "/login",
-    response_model=SuccessResponse,
+    response_model=SuccessResponse[TokenResponse],
     summary="Authenticate user and generate JWT token",
 )
 async def login_user(
     user_data: UserLogin,
     request: Request,
     user_service: UserService = Depends(get_user_service),
+    login_throttle: LoginThrottle = Depends(get_login_throttle),
 ):
+    # Throttled before the user lookup and bcrypt, the expensive part.
+    # Behind a proxy, uvicorn rewrites client from X-Forwarded-For only for
+    # the peers in SERVER_FORWARDED_ALLOW_IPS
+    client_ip = request.client.host if request.client else "unknown"
+    login_throttle.check(client_ip, user_data.email)
     result = await user_service.authenticate_user(user_data)
     return build_success_response(request, result, "User Authenticated")
 
 
+@router.post(
+    "/token/refresh",
+    response_model=SuccessResponse[TokenResponse],
+    summary="Exchange a refresh token for new access and refresh tokens",
+)
+async def refresh_token(
+    request: Request,
+    token_data: RefreshTokenRequest,
+    user_service: UserService = Depends(get_user_service),
+):
+    # No password verify: the token is checked against its SHA-256 digest, and
+    # tokens of revoked families are refused before Mongo is asked
+    result = await user_service.refresh(token_data)
+    return build_success_response(request, result, "Token refreshed")
+
+
+@router.post(
+    "/token/revoke",
+    response_model=SuccessResponse[None],
+    summary="Revoke a refresh token and every token rotated from the same login",
+)
+async def revoke_token(
+    request: Request,
+    token_data: RefreshTokenRequest,
+    user_service: UserService = Depends(get_user_service),
+):
+    await user_service.logout(token_data)
+    return build_success_response(request, None, "Refresh token revoked")
+
+
 @router.get(
     "/me", response_model=UserResponse, summary="Get current logged-in user details"
 )
 async def get_current_user_profile(
+    request: Request,
     current_user: UserResponse = Depends(get_current_user),
 ):
-    return current_user
+    # The profile comes from the user cache, so a poll answered with 304
+    # usually touches neither Mongo nor the serializer
+    etag = make_etag("user", current_user.id, current_user.updated_at)
+    response = not_modified(request, etag, current_user.updated_at)
+    if response is not None:
+        return response
+    return with_validators(
+        ModelJSONResponse(current_user), etag, current_user.updated_at
+    )
 
 
-@router.put("/me/update", response_model=SuccessResponse, summary="Update user details")
+@router.put(
+    "/me/update",
+    response_model=SuccessResponse[UserResponse],
+    summary="Update user details",
+)
 async def update_user(
     request: Request,
     updates: UserUpdate,
@@ -1,3 +1,4 @@
+import os
 from enum import Enum
 from typing import Annotated, Literal
 
@@ -27,13 +28,108 @@ class Settings(BaseSettings):
     LOG_FILE: Annotated[str, Field("app.log")]
     LOG_FORMAT: Annotated[Literal["json", "text"], Field("text")]
     LOG_LEVEL: Annotated[LogLevel, Field(LogLevel.DEBUG)]
+    LOG_QUEUE_ENABLED: Annotated[bool, Field(True)]
+    LOG_QUEUE_MAX_SIZE: Annotated[int, Field(10_000, gt=0)]
+    LOG_QUEUE_OVERFLOW_POLICY: Annotated[
+        Literal["drop", "sample", "block"], Field("sample")
+    ]
+    LOG_QUEUE_SAMPLE_RATE: Annotated[int, Field(10, gt=0)]
+    # Suffix the log file with the process id (set by the multi-worker launcher)
+    LOG_FILE_PER_PROCESS: Annotated[bool, Field(False)]
+    # Multi-process serving through python -m app.serve
+    SERVER_HOST: Annotated[str, Field("127.0.0.1")]
+    SERVER_PORT: Annotated[int, Field(8000, gt=0)]
+    # Proxies whose X-Forwarded-For is believed ("*" for any); the client
+    # address the login throttle keys on comes from it
+    SERVER_FORWARDED_ALLOW_IPS: Annotated[str, Field("127.0.0.1")]
+    # More than one splits per-process state across workers; see app.serve
+    SERVER_WORKERS: Annotated[int, Field(1, gt=0)]
+    # Seconds in-flight requests get to finish after SIGTERM before shutdown
+    SHUTDOWN_GRACE_SECONDS: Annotated[int, Field(30, ge=0)]
     # Database
     MONGO_URI: str
     DB_NAME: str
+    # Multi-document transactions need a replica set or sharded cluster;
+    # unset, they are used when the server reports being one
+    MONGO_TRANSACTIONS_ENABLED: Annotated[bool | None, Field(None)]
+    # Connection pool; MONGO_MIN_POOL_SIZE connections are opened at startup
+    MONGO_MAX_POOL_SIZE: Annotated[int, Field(100, gt=0)]
+    MONGO_MIN_POOL_SIZE: Annotated[int, Field(10, ge=0)]
+    MONGO_MAX_IDLE_TIME_MS: Annotated[int | None, Field(None, gt=0)]
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Annotated[int, Field(5000, gt=0)]
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: Annotated[int, Field(5000, gt=0)]
+    MONGO_CONNECT_TIMEOUT_MS: Annotated[int, Field(10_000, gt=0)]
+    # Comma-separated wire compressors, e.g. "zstd,zlib" (empty disables)
+    MONGO_COMPRESSORS: Annotated[str, Field("")]
+    READINESS_TIMEOUT_SECONDS: Annotated[float, Field(2.0, gt=0)]
     # Required secrets
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: Annotated[str, Field("HS256")]
     ACCESS_TOKEN_EXPIRE_MINUTES: Annotated[int, Field(60)]
+    # Refresh tokens are single use and expire this long after being issued;
+    # revoked token families are remembered in memory, at most this many.
+    # The token replaced last is refused without revoking its family for
+    # this long after the rotation, so two concurrent refreshes are not
+    # taken for a stolen token
+    REFRESH_TOKEN_EXPIRE_DAYS: Annotated[int, Field(30, gt=0)]
+    REFRESH_REVOCATIONS_MAX_SIZE: Annotated[int, Field(100_000, ge=0)]
+    REFRESH_REUSE_GRACE_SECONDS: Annotated[float, Field(10.0, ge=0)]
+    # Password hashing worker pool
+    PASSWORD_HASH_EXECUTOR: Annotated[Literal["thread", "process"], Field("thread")]
+    PASSWORD_HASH_WORKERS: Annotated[
+        int, Field(default_factory=lambda: os.cpu_count() or 1, gt=0)
+    ]
+    PASSWORD_HASH_MAX_QUEUE: Annotated[int, Field(64, ge=0)]
+    # Login throttling: attempts allowed in a burst per client IP and per email,
+    # refilled at the per-minute rate (a burst of 0 disables that limit)
+    LOGIN_RATE_LIMIT_IP_BURST: Annotated[int, Field(20, ge=0)]
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: Annotated[float, Field(10.0, gt=0)]
+    LOGIN_RATE_LIMIT_EMAIL_BURST: Annotated[int, Field(5, ge=0)]
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE: Annotated[float, Field(2.0, gt=0)]
+    LOGIN_RATE_LIMIT_MAX_KEYS: Annotated[int, Field(100_000, gt=0)]
+    # Authenticated user cache (0 disables it)
+    USER_CACHE_MAX_SIZE: Annotated[int, Field(10_000, ge=0)]
+    USER_CACHE_TTL_SECONDS: Annotated[float, Field(60.0, ge=0)]
+    # Concurrent user lookups are merged into $in queries of at most this many
+    USER_LOADER_MAX_BATCH: Annotated[int, Field(100, gt=0)]
+    # Verified JWT claims cache (0 disables it)
+    TOKEN_CACHE_MAX_SIZE: Annotated[int, Field(10_000, ge=0)]
+    # Statement imports
+    IMPORT_BATCH_SIZE: Annotated[int, Field(1000, gt=0)]
+    IMPORT_MAX_REPORTED_ERRORS: Annotated[int, Field(100, ge=0)]
+    # Longest line, CSV record or OFX transaction block accepted, in characters
+    IMPORT_MAX_RECORD_LENGTH: Annotated[int, Field(64 * 1024, gt=0)]
+    # Compiled category rule matchers, one per importing user
+    CATEGORY_RULES_CACHE_MAX_SIZE: Annotated[int, Field(1000, ge=0)]
+    CATEGORY_RULES_CACHE_TTL_SECONDS: Annotated[float, Field(3600.0, ge=0)]
+    CATEGORY_RULES_MAX_PER_USER: Annotated[int, Field(5000, gt=0)]
+    # Budget evaluation job: alert thresholds as shares of the limit, and budget
+    # lines evaluated (and held in memory) per chunk
+    BUDGET_ALERT_THRESHOLDS: Annotated[list[float], Field([0.8, 1.0], min_length=1)]
+    BUDGET_EVALUATION_CHUNK_SIZE: Annotated[int, Field(10_000, gt=0)]
+    # Recurring transactions scheduler (runs in the worker holding its lease):
+    # occurrences written per batch, seconds between heap reloads from the
+    # next_due index, lease lifetime, and items held in the heap at most
+    RECURRING_SCHEDULER_ENABLED: Annotated[bool, Field(True)]
+    RECURRING_BATCH_SIZE: Annotated[int, Field(500, gt=0)]
+    RECURRING_REFRESH_SECONDS: Annotated[float, Field(60.0, gt=0)]
+    RECURRING_LEASE_SECONDS: Annotated[float, Field(30.0, gt=0)]
+    RECURRING_MAX_LOADED: Annotated[int, Field(100_000, gt=0)]
+    # Exchange rates: reports and rollups are in FX_HOME_CURRENCY, converted at
+    # each transaction's date. Rates (home units per unit of a currency) come
+    # from FX_RATES_FILE (CSV: date,currency,rate) when set, else from the
+    # fx_rates collection, and are reloaded every FX_REFRESH_SECONDS
+    FX_HOME_CURRENCY: Annotated[str, Field("USD", pattern=r"^[A-Z]{3}$")]
+    FX_RATES_FILE: Annotated[str | None, Field(None)]
+    FX_REFRESH_SECONDS: Annotated[float, Field(3600.0, gt=0)]
+    # Transaction search: in-process per-user indexes are evicted least recently
+    # searched first past this many transactions in total, and rebuilt from
+    # Mongo once older than the max age
+    SEARCH_INDEX_MAX_DOCUMENTS: Annotated[int, Field(2_000_000, gt=0)]
+    SEARCH_INDEX_MAX_AGE_SECONDS: Annotated[float, Field(900.0, gt=0)]
+    # Streaming exports: documents per cursor batch, bytes per response chunk
+    EXPORT_BATCH_SIZE: Annotated[int, Field(1000, gt=0)]
+    EXPORT_CHUNK_SIZE: Annotated[int, Field(64 * 1024, gt=0)]
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="ignore"
@@ -46,6 +142,15 @@ class Settings(BaseSettings):
             raise ValueError("JWT_SECRET_KEY must be at least 32 characters")
         return v
 
+    @field_validator("MONGO_COMPRESSORS")
+    @classmethod
+    def validate_mongo_compressors(cls, v: str):
+        compressors = [c.strip() for c in v.split(",") if c.strip()]
+        unknown = set(compressors) - {"zstd", "zlib", "snappy"}
+        if unknown:
+            raise ValueError(f"Unknown MongoDB compressors: {', '.join(unknown)}")
+        return ",".join(compressors)
+
     @field_validator("ACCESS_TOKEN_EXPIRE_MINUTES")
     @classmethod
     def validate_access_token_expire_minutes(cls, v: int):
@@ -19,7 +19,9 @@ def register_exception_handler(app: FastAPI):
             exc.message,
             extra={"request_path": str(request.url.path), "method": request.method},
         )
-        return JSONResponse(status_code=exc.status_code, content=exc.to_dict())
+        return JSONResponse(
+            status_code=exc.status_code, content=exc.to_dict(), headers=exc.headers
+        )
 
     @app.exception_handler(StarletteHTTPException)
     async def handle_http_exceptions(request: Request, exc: StarletteHTTPException):
@@ -1,3 +1,5 @@
+import math
+
 from fastapi import status
 
 
@@ -9,10 +11,12 @@ class AppBaseError(Exception):
         message: str,
         status_code: int = status.HTTP_400_BAD_REQUEST,
         details: dict | None = None,
+        headers: dict[str, str] | None = None,
     ):
         self.message = message
         self.status_code = status_code
         self.details = details
+        self.headers = headers
 
     def to_dict(self):
         return {"error": {"message": self.message, "details": self.details}}
@@ -64,6 +68,16 @@ class DuplicateResourceError(AppBaseError):
         super().__init__(f"{resource} already exists", status.HTTP_409_CONFLICT)
 
 
+class ExchangeRateNotFoundError(AppBaseError):
+    """Raised when amounts in a currency cannot be converted for lack of rates"""
+
+    def __init__(self, currency: str):
+        super().__init__(
+            f"No exchange rate for {currency}",
+            status.HTTP_422_UNPROCESSABLE_CONTENT,
+        )
+
+
 # ---- Other common error ----
 class DatabaseConnectionError(AppBaseError):
     """Raised when database connection fails"""
@@ -83,6 +97,27 @@ class DatabaseError(AppBaseError):
         )
 
 
+class ServiceOverloadedError(AppBaseError):
+    """Raised when a bounded resource is saturated and the request is shed"""
+
+    def __init__(self):
+        super().__init__(
+            "Service is busy, please retry shortly",
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
+class TooManyRequestsError(AppBaseError):
+    """Raised when a client exceeds a rate limit"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            "Too many requests, please retry later",
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
 class ValidationError(AppBaseError):
     """Raised when data validation fails at a business level"""
 
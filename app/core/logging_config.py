@@ -1,28 +1,116 @@
+import atexit
 import json
 import logging
 import os
+import queue
 from datetime import UTC, datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.request_context import request_id_ctx
 
+# Attributes every LogRecord carries; anything else came in through ``extra=``
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "request_id",
+}
 
-def setup_logging():
+_dropped_records = registry.counter(
+    "log_records_dropped", "Log records shed by the logging queue", ("reason",)
+)
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        log_entry = {
+            # Records may be formatted well after they were emitted
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                log_entry[key] = value
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id while still on the caller"""
+
+    def filter(self, record):
+        record.request_id = request_id_ctx.get()
+        return True
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to a background listener without blocking the caller.
+
+    When the queue is full the overflow policy decides what happens:
+    ``block`` waits for room, ``drop`` sheds the record, and ``sample`` starts
+    keeping only one in ``sample_rate`` records below WARNING once the queue is
+    80% full, dropping whatever still does not fit.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str, sample_rate: int):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.sample_rate = max(1, sample_rate)
+        self._high_water = int(log_queue.maxsize * 0.8)
+        self._sampled = 0
+
+    def prepare(self, record):
+        # Only merge the arguments here; the listener thread does the formatting
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        if (
+            self.policy == "sample"
+            and record.levelno < logging.WARNING
+            and self.queue.qsize() >= self._high_water
+        ):
+            self._sampled += 1
+            if self._sampled % self.sample_rate:
+                _dropped_records.inc(reason="sampled")
+                return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped_records.inc(reason="full")
+
+
+def stop_logging():
+    """Flush queued records and stop the background listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(queued: bool | None = None):
     """Configure logging"""
+    stop_logging()
+    queued = settings.LOG_QUEUE_ENABLED if queued is None else queued
     os.makedirs(settings.LOG_DIR, exist_ok=True)
-    log_path = os.path.join(settings.LOG_DIR, settings.LOG_FILE)
-
-    class JsonFormatter(logging.Formatter):
-        def format(self, record):
-            log_entry = {
-                "timestamp": datetime.now(UTC).isoformat(),
-                "level": record.levelname,
-                "logger": record.name,
-                "message": record.getMessage(),
-            }
-            if record.exc_info:
-                log_entry["exception"] = self.formatException(record.exc_info)
-            return json.dumps(log_entry)
+    log_file = settings.LOG_FILE
+    if settings.LOG_FILE_PER_PROCESS:
+        # Processes rotating one shared file would clobber each other's logs
+        stem, extension = os.path.splitext(log_file)
+        log_file = f"{stem}.{os.getpid()}{extension}"
+    log_path = os.path.join(settings.LOG_DIR, log_file)
 
     text_format = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
     date_format = "%Y-%m-%d %H:%M:%S"
@@ -42,17 +130,46 @@ def setup_logging():
     )
     file_handler.setFormatter(formatter)
 
+    handlers: list[logging.Handler] = [console_handler, file_handler]
+    if queued:
+        # Disk I/O and rotation move to the listener thread, off the event loop
+        global _listener
+        log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_MAX_SIZE)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        handlers = [
+            BoundedQueueHandler(
+                log_queue,
+                settings.LOG_QUEUE_OVERFLOW_POLICY,
+                settings.LOG_QUEUE_SAMPLE_RATE,
+            )
+        ]
+    for handler in handlers:
+        handler.addFilter(RequestContextFilter())
+
     logging.basicConfig(
         level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
-        handlers=[console_handler, file_handler],
+        handlers=handlers,
         force=True,
     )
 
     logger = logging.getLogger(settings.APP_NAME)
     logger.info(
-        f"Logging initialized: (env={settings.ENVIRONMENT}, level={settings.LOG_LEVEL})"
+        f"Logging initialized: (env={settings.ENVIRONMENT}, level={settings.LOG_LEVEL}"
+        f", queued={queued})"
     )
     return logger
 
 
+def _reset_after_fork():
+    # The listener thread did not survive the fork and the file handles are
+    # the parent's; give the child its own queue, listener and log file
+    global _listener
+    queued = _listener is not None
+    _listener = None
+    setup_logging(queued)
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_reset_after_fork)
 logger = setup_logging()
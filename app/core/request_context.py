@@ -0,0 +1,4 @@
+from contextvars import ContextVar
+
+# Set by the request middleware for the lifetime of each HTTP request
+request_id_ctx: ContextVar[str | None] = ContextVar("request_id", default=None)
@@ -1,3 +1,6 @@
+import hashlib
+import os
+import time
 from datetime import UTC, datetime, timedelta
 
 from fastapi.security import OAuth2PasswordBearer
@@ -6,26 +9,52 @@ from passlib.context import CryptContext
 from pydantic import SecretStr
 
 from app.core.config import settings
-from app.core.exceptions import InvalidTokenError
+from app.core.exceptions import InvalidTokenError, TooManyRequestsError
+from app.core.worker_pool import WorkerPool
+from app.util.cache import TTLCache
+from app.util.rate_limit import TokenBucketLimiter
 
 oauth2_schemes = OAuth2PasswordBearer("/api/v1/users/login")
 
+_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Module level so they can be pickled into a process pool worker
+def _hash_secret(password: str) -> str:
+    return _pwd_context.hash(password)
+
+
+def _verify_secret(plain_password: str, hashed_password: str) -> bool:
+    return _pwd_context.verify(plain_password, hashed_password)
+
 
 class SecurityService:
     """Handles password hashing, JWT creation and validation"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        hash_pool: WorkerPool | None = None,
+        token_cache: TTLCache | None = None,
+    ):
         self.__secret_key = settings.JWT_SECRET_KEY
         self.__algorithm = settings.JWT_ALGORITHM
         self.__access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        self.__pwd_content = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.__hash_pool = hash_pool or get_password_hash_pool()
+        self.__token_cache = (
+            token_cache if token_cache is not None else get_token_cache()
+        )
 
-    def hash_password(self, password: SecretStr):
-        return self.__pwd_content.hash(password.get_secret_value())
+    async def hash_password(self, password: SecretStr) -> str:
+        """Hash on the worker pool so bcrypt never blocks the event loop"""
+        return await self.__hash_pool.run(_hash_secret, password.get_secret_value())
 
-    def verify_password(self, plain_password: SecretStr, hashed_password: SecretStr):
-        return self.__pwd_content.verify(
-            plain_password.get_secret_value(), hashed_password.get_secret_value()
+    async def verify_password(
+        self, plain_password: SecretStr, hashed_password: SecretStr | str
+    ) -> bool:
+        if isinstance(hashed_password, SecretStr):
+            hashed_password = hashed_password.get_secret_value()
+        return await self.__hash_pool.run(
+            _verify_secret, plain_password.get_secret_value(), hashed_password
         )
 
     def create_access_token(self, subject: str):
@@ -36,10 +65,110 @@ class SecurityService:
         return jwt.encode(payload, self.__secret_key, self.__algorithm)
 
     def decode_token(self, token: str):
+        """Verify the token, reusing claims of tokens already verified.
+
+        Returns a copy, so a caller changing it cannot alter what later
+        requests with the same token see.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self.__token_cache.get(key)
+        if claims is not None:
+            return dict(claims)
         try:
-            return jwt.decode(token, self.__secret_key, [self.__algorithm])
+            claims = jwt.decode(token, self.__secret_key, [self.__algorithm])
         except JWTError:
             raise InvalidTokenError()
+        # Never keep verified claims past the token's own expiry
+        expires_at = claims.get("exp")
+        if isinstance(expires_at, int | float):
+            self.__token_cache.set(key, claims, ttl_seconds=expires_at - time.time())
+        return dict(claims)
+
+
+_password_hash_pool = None
+
+
+def get_password_hash_pool():
+    global _password_hash_pool
+    if _password_hash_pool is None:
+        _password_hash_pool = WorkerPool(
+            "password_hash",
+            settings.PASSWORD_HASH_EXECUTOR,
+            settings.PASSWORD_HASH_WORKERS,
+            settings.PASSWORD_HASH_MAX_QUEUE,
+        )
+    return _password_hash_pool
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TTLCache(
+            "tokens",
+            settings.TOKEN_CACHE_MAX_SIZE,
+            settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+    return _token_cache
+
+
+class LoginThrottle:
+    """Caps login attempts per client IP and per email before bcrypt runs.
+
+    Every attempt costs a token from both buckets, so a credential-stuffing
+    burst is rejected without a database lookup or a password verify. The
+    client IP is the connection's peer unless it is a proxy listed in
+    SERVER_FORWARDED_ALLOW_IPS, in which case it is taken from
+    X-Forwarded-For; a header from an untrusted peer is ignored, as anyone
+    could then pick a fresh address per attempt.
+    """
+
+    def __init__(
+        self,
+        by_ip: TokenBucketLimiter | None,
+        by_email: TokenBucketLimiter | None,
+    ):
+        self._by_ip = by_ip
+        self._by_email = by_email
+
+    def check(self, client_ip: str, email: str):
+        for limiter, key in ((self._by_ip, client_ip), (self._by_email, email)):
+            if limiter is None:
+                continue
+            retry_after = limiter.acquire(key)
+            if retry_after:
+                raise TooManyRequestsError(retry_after)
+
+
+_login_throttle = None
+
+
+def _login_limiter(name: str, burst: int, per_minute: float):
+    if burst == 0:
+        return None
+    return TokenBucketLimiter(
+        name, burst, per_minute / 60, settings.LOGIN_RATE_LIMIT_MAX_KEYS
+    )
+
+
+def get_login_throttle():
+    global _login_throttle
+    if _login_throttle is None:
+        _login_throttle = LoginThrottle(
+            _login_limiter(
+                "login_ip",
+                settings.LOGIN_RATE_LIMIT_IP_BURST,
+                settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+            ),
+            _login_limiter(
+                "login_email",
+                settings.LOGIN_RATE_LIMIT_EMAIL_BURST,
+                settings.LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE,
+            ),
+        )
+    return _login_throttle
 
 
 _security_service = None
@@ -50,3 +179,12 @@ def get_security_service():
     if _security_service is None:
         _security_service = SecurityService()
     return _security_service
+
+
+def _reset_after_fork():
+    # Pool threads do not survive a fork and caches belong to the parent
+    global _password_hash_pool, _token_cache, _login_throttle, _security_service
+    _password_hash_pool = _token_cache = _login_throttle = _security_service = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal
+
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import registry
+
+_queue_depth = registry.gauge(
+    "worker_pool_queue_depth", "Jobs waiting for a free worker", ("pool",)
+)
+_in_flight = registry.gauge(
+    "worker_pool_in_flight", "Jobs queued or running in the pool", ("pool",)
+)
+_wait_seconds = registry.histogram(
+    "worker_pool_wait_seconds",
+    "Time a job waited before a worker picked it up",
+    ("pool",),
+)
+_run_seconds = registry.histogram(
+    "worker_pool_run_seconds", "Time a worker spent running a job", ("pool",)
+)
+_rejected = registry.counter(
+    "worker_pool_rejected", "Jobs rejected because the pool was saturated", ("pool",)
+)
+
+
+def _timed_call(fn: Callable, *args):
+    # Runs inside the worker; time.monotonic is system-wide so timestamps taken
+    # in a child process are comparable with the ones taken on the event loop
+    started = time.monotonic()
+    result = fn(*args)
+    return started, time.monotonic(), result
+
+
+class WorkerPool:
+    """Bounded thread or process pool for CPU-bound work awaited from async code.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more may
+    wait for a worker; anything beyond that is rejected immediately with
+    ``ServiceOverloadedError`` instead of piling up behind the event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: Literal["thread", "process"],
+        max_workers: int,
+        max_queue: int,
+    ):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        _queue_depth.set_function(lambda: self.queue_depth, pool=name)
+        _in_flight.set_function(lambda: self.in_flight, pool=name)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` on a worker, failing fast when the pool is saturated"""
+        if not self._acquire():
+            _rejected.inc(pool=self.name)
+            raise ServiceOverloadedError()
+
+        submitted = time.monotonic()
+        try:
+            future = self._get_executor().submit(_timed_call, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Release the slot only once the worker is done, even if the awaiting
+        # request is cancelled, so the bound reflects the real backlog
+        future.add_done_callback(self._release)
+
+        started, finished, result = await asyncio.wrap_future(future)
+        _wait_seconds.observe(started - submitted, pool=self.name)
+        _run_seconds.observe(finished - started, pool=self.name)
+        return result
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,247 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.core.logging_config import logger
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One index the app relies on.
+
+    Critical indexes enforce correctness (uniqueness that upserts and
+    duplicate detection depend on) and are built before the app serves;
+    the rest only speed queries up and are built in the background.
+    ``expire_after_seconds`` makes a TTL index: Mongo deletes documents that
+    long after the date in its single key field.
+    """
+
+    collection: str
+    keys: tuple[tuple[str, int], ...]
+    name: str
+    unique: bool = False
+    partial_filter: dict | None = None
+    critical: bool = False
+    expire_after_seconds: int | None = None
+
+    def to_model(self) -> IndexModel:
+        options = {"name": self.name, "unique": self.unique}
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return IndexModel(list(self.keys), **options)
+
+    def same_definition(self, existing: dict) -> bool:
+        return (
+            list(existing["key"].items()) == list(self.keys)
+            and existing.get("unique", False) == self.unique
+            and existing.get("partialFilterExpression") == self.partial_filter
+            and existing.get("expireAfterSeconds") == self.expire_after_seconds
+        )
+
+
+# Names match what create_index generated before the registry existed, so
+# existing deployments see their indexes as already built
+INDEXES = (
+    IndexSpec("users", (("email", ASCENDING),), "email_1", unique=True, critical=True),
+    IndexSpec(
+        "transactions",
+        (("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)),
+        "user_date_id",
+    ),
+    IndexSpec(
+        "transactions",
+        (("import_hash", ASCENDING),),
+        "import_hash_1",
+        unique=True,
+        partial_filter={"import_hash": {"$exists": True}},
+        critical=True,
+    ),
+    IndexSpec(
+        "transactions",
+        (("account_id", ASCENDING), ("date", ASCENDING)),
+        "account_date",
+        partial_filter={"account_id": {"$exists": True}},
+    ),
+    IndexSpec(
+        "transactions",
+        (("recurring_id", ASCENDING), ("occurrence", ASCENDING)),
+        "recurring_occurrence",
+        unique=True,
+        partial_filter={"recurring_id": {"$exists": True}},
+        critical=True,
+    ),
+    IndexSpec(
+        "transactions",
+        (("user_id", ASCENDING), ("updated_at", ASCENDING)),
+        "user_updated",
+    ),
+    IndexSpec(
+        "category_rollups",
+        (("user_id", ASCENDING), ("month", ASCENDING), ("category", ASCENDING)),
+        "user_id_1_month_1_category_1",
+        unique=True,
+        critical=True,
+    ),
+    IndexSpec("accounts", (("user_id", ASCENDING),), "user_id_1"),
+    IndexSpec(
+        "budgets",
+        (("user_id", ASCENDING), ("category", ASCENDING)),
+        "user_category",
+        unique=True,
+        critical=True,
+    ),
+    IndexSpec(
+        "category_rules",
+        (("user_id", ASCENDING), ("field", ASCENDING), ("pattern", ASCENDING)),
+        "user_field_pattern",
+        unique=True,
+        critical=True,
+    ),
+    IndexSpec(
+        "category_rules",
+        (("user_id", ASCENDING), ("created_at", ASCENDING)),
+        "user_created",
+    ),
+    IndexSpec(
+        "refresh_tokens",
+        (("user_id", ASCENDING),),
+        "user_id_1",
+    ),
+    IndexSpec(
+        "refresh_tokens",
+        (("expires_at", ASCENDING),),
+        "expires_at_ttl",
+        expire_after_seconds=0,
+    ),
+    IndexSpec(
+        "budget_alerts",
+        (
+            ("budget_id", ASCENDING),
+            ("month", ASCENDING),
+            ("kind", ASCENDING),
+            ("threshold", ASCENDING),
+        ),
+        "budget_month_kind_threshold",
+        unique=True,
+        critical=True,
+    ),
+    IndexSpec(
+        "budget_alerts",
+        (("user_id", ASCENDING), ("month", DESCENDING), ("created_at", DESCENDING)),
+        "user_month_created",
+    ),
+    IndexSpec(
+        "recurring_transactions",
+        (("next_due", ASCENDING),),
+        "next_due_1",
+    ),
+    IndexSpec(
+        "recurring_transactions",
+        (("user_id", ASCENDING), ("created_at", ASCENDING)),
+        "user_created",
+    ),
+    IndexSpec(
+        "fx_rates",
+        (("currency", ASCENDING), ("date", ASCENDING)),
+        "currency_date",
+        unique=True,
+        critical=True,
+    ),
+    IndexSpec(
+        "account_snapshots",
+        (("account_id", ASCENDING), ("period_start", DESCENDING)),
+        "account_id_1_period_start_-1",
+        unique=True,
+        critical=True,
+    ),
+)
+
+
+def _elapsed_ms(start: float) -> str:
+    return f"{(time.perf_counter() - start) * 1000:.0f}ms"
+
+
+async def _missing_indexes(
+    db: AsyncIOMotorDatabase, specs: tuple[IndexSpec, ...]
+) -> list[IndexSpec]:
+    collections = sorted({spec.collection for spec in specs})
+    listed = await asyncio.gather(
+        *(db[name].list_indexes().to_list(None) for name in collections)
+    )
+    existing = dict(zip(collections, listed))
+
+    missing = []
+    for spec in specs:
+        indexes = existing[spec.collection]
+        if any(spec.same_definition(index) for index in indexes):
+            continue
+        if any(index["name"] == spec.name for index in indexes):
+            # Rebuilding means dropping the old one first; left to a human
+            logger.warning(
+                f"Index {spec.collection}.{spec.name} exists with another "
+                "definition; drop it to have it rebuilt"
+            )
+            continue
+        missing.append(spec)
+    return missing
+
+
+async def _build(db: AsyncIOMotorDatabase, specs: list[IndexSpec]):
+    """Build indexes in parallel, one createIndexes round trip per collection"""
+    by_collection: dict[str, list[IndexSpec]] = {}
+    for spec in specs:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    async def build_collection(name: str, collection_specs: list[IndexSpec]):
+        start = time.perf_counter()
+        await db[name].create_indexes([spec.to_model() for spec in collection_specs])
+        names = ", ".join(spec.name for spec in collection_specs)
+        logger.info(f"Index created: {name} {names} in {_elapsed_ms(start)}")
+
+    await asyncio.gather(
+        *(build_collection(name, group) for name, group in by_collection.items())
+    )
+
+
+async def _build_in_background(db: AsyncIOMotorDatabase, specs: list[IndexSpec]):
+    start = time.perf_counter()
+    try:
+        await _build(db, specs)
+    except Exception as exc:
+        # Queries still work without them, only slower
+        logger.error(f"Background index build failed: {exc}")
+        return
+    logger.info(f"Background index builds finished in {_elapsed_ms(start)}")
+
+
+async def ensure_indexes(
+    db: AsyncIOMotorDatabase, specs: tuple[IndexSpec, ...] = INDEXES
+) -> asyncio.Task | None:
+    """Build the declared indexes that are missing.
+
+    Critical ones are awaited; the rest are built by the returned task while
+    the app starts serving. Returns None when nothing is left to build.
+    """
+    start = time.perf_counter()
+    missing = await _missing_indexes(db, specs)
+    logger.info(
+        f"Indexes listed: {len(specs)} declared, {len(missing)} missing "
+        f"in {_elapsed_ms(start)}"
+    )
+    critical = [spec for spec in missing if spec.critical]
+    if critical:
+        start = time.perf_counter()
+        await _build(db, critical)
+        logger.info(f"Critical indexes built in {_elapsed_ms(start)}")
+
+    deferred = [spec for spec in missing if not spec.critical]
+    if not deferred:
+        return None
+    return asyncio.create_task(
+        _build_in_background(db, deferred), name="background-index-build"
+    )
@@ -0,0 +1,108 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from app.core.metrics import registry
+
+# Collection methods that cost one round trip per call
+_ASYNC_OPERATIONS = frozenset(
+    {
+        "insert_one",
+        "insert_many",
+        "find_one",
+        "find_one_and_update",
+        "find_one_and_replace",
+        "find_one_and_delete",
+        "update_one",
+        "update_many",
+        "replace_one",
+        "delete_one",
+        "delete_many",
+        "bulk_write",
+        "count_documents",
+        "estimated_document_count",
+        "distinct",
+        "create_index",
+        "create_indexes",
+        "drop_index",
+        "index_information",
+    }
+)
+# Methods returning a cursor; counted once when the cursor is created
+_CURSOR_OPERATIONS = frozenset({"find", "aggregate", "list_indexes"})
+
+_operations = registry.counter(
+    "mongo_operations",
+    "MongoDB operations issued by the application",
+    ("collection", "operation"),
+)
+
+_current_counter: ContextVar["DBOperationCounter | None"] = ContextVar(
+    "db_operation_counter", default=None
+)
+
+
+class DBOperationCounter:
+    """Counts Mongo operations issued while it is the active counter"""
+
+    def __init__(self, parent: "DBOperationCounter | None" = None):
+        self.total = 0
+        self.by_operation: dict[str, int] = {}
+        self._parent = parent
+
+    def record(self, operation: str):
+        self.total += 1
+        self.by_operation[operation] = self.by_operation.get(operation, 0) + 1
+        if self._parent is not None:
+            self._parent.record(operation)
+
+
+@contextmanager
+def track_db_operations() -> Iterator[DBOperationCounter]:
+    """Count Mongo operations issued in this context, e.g. during one request.
+
+    Scopes nest: operations are also added to any enclosing counter, so a test
+    can wrap a client call and still see what the per-request scope counted.
+    """
+    counter = DBOperationCounter(_current_counter.get())
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def _record(collection: str, operation: str):
+    _operations.inc(collection=collection, operation=operation)
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.record(operation)
+
+
+class CountedCollection:
+    """Proxy over a Motor collection that records every operation it issues"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._name = collection.name
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._collection, name)
+        if name in _ASYNC_OPERATIONS:
+
+            @wraps(attr)
+            async def counted(*args, **kwargs):
+                _record(self._name, name)
+                return await attr(*args, **kwargs)
+
+            return counted
+        if name in _CURSOR_OPERATIONS:
+
+            @wraps(attr)
+            def counted_cursor(*args, **kwargs):
+                _record(self._name, name)
+                return attr(*args, **kwargs)
+
+            return counted_cursor
+        return attr
@@ -0,0 +1,47 @@
+import os
+import socket
+from datetime import timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.db.mongodb import MongoDBClient
+from app.util.clock import utc_now
+
+
+class Lease:
+    """An expiring, exclusive claim on a named task in the ``leases`` collection.
+
+    The holder renews it by acquiring again before ``ttl`` runs out; if it
+    dies, any other process can take the lease over once it has expired.
+    Expiry is judged by each process's own clock, so ``ttl`` should be well
+    above the clock skew between hosts.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient, name: str, ttl: float):
+        self._collection = mongo_client.get_collection("leases")
+        self.name = name
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{ObjectId()}"
+        self._ttl = timedelta(seconds=ttl)
+
+    async def acquire(self) -> bool:
+        """Take or renew the lease; False while another process holds it"""
+        now = utc_now()
+        try:
+            await self._collection.find_one_and_update(
+                {
+                    "_id": self.name,
+                    "$or": [{"owner": self.owner}, {"expires_at": {"$lte": now}}],
+                },
+                {"$set": {"owner": self.owner, "expires_at": now + self._ttl}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The filter missed a live lease, so the upsert collided with it
+            return False
+        return True
+
+    async def release(self):
+        await self._collection.delete_one({"_id": self.name, "owner": self.owner})
@@ -1,8 +1,32 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
 
 from app.core.config import settings
 from app.core.exceptions import DatabaseConnectionError
 from app.core.logging_config import logger
+from app.db.indexes import ensure_indexes
+from app.db.instrumentation import CountedCollection
+from app.db.monitoring import CommandMetricsListener, PoolMetricsListener, PoolStats
+
+
+def _client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+    }
+    if settings.MONGO_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
 
 
 class MongoDBClient:
@@ -13,28 +37,102 @@ class MongoDBClient:
         self._db: AsyncIOMotorDatabase | None = None
         self._uri = uri or settings.MONGO_URI
         self._db_name = db_name or settings.DB_NAME
+        self._pool_listener = PoolMetricsListener()
+        # Non-critical index builds still running after connect returned
+        self._index_build: asyncio.Task | None = None
+        # Whether writes are grouped in transactions, settled by connect
+        self._transactions = False
         self._initialized = True
 
     async def connect(self):
         if self._client is None:
-            self._client = AsyncIOMotorClient(self._uri)
+            self._client = AsyncIOMotorClient(
+                self._uri,
+                tz_aware=True,
+                event_listeners=[CommandMetricsListener(), self._pool_listener],
+                **_client_options(),
+            )
             self._db = self._client[self._db_name]
-            # Create unique index on email to prevent race conditions
             logger.info(f"Connected: MongoDB (db={self._db_name})")
-            await self._db["users"].create_index("email", unique=True)
-            logger.info("Index created: email")
+            await self.warm_up(settings.MONGO_MIN_POOL_SIZE)
+            self._transactions = settings.MONGO_TRANSACTIONS_ENABLED
+            if self._transactions is None:
+                self._transactions = await self._supports_transactions()
+            logger.info(
+                f"Multi-document transactions: {'on' if self._transactions else 'off'}"
+            )
+            self._index_build = await ensure_indexes(self._db)
+
+    async def warm_up(self, connections: int):
+        """Open ``connections`` pooled connections before the first request.
+
+        The driver only fills the pool up to minPoolSize in the background;
+        concurrent pings make sure the first requests do not pay for the TCP
+        and auth handshakes, and fail startup early if Mongo is unreachable.
+        """
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(
+                *(self._db.command("ping") for _ in range(max(connections, 1)))
+            )
+        except PyMongoError as exc:
+            logger.error(f"MongoDB warm-up failed: {exc}")
+            raise DatabaseConnectionError() from exc
+        logger.info(
+            f"Pool warmed: open={self.pool_stats().open} "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+    async def _supports_transactions(self) -> bool:
+        # A standalone mongod rejects transactions; replica set members
+        # report their set name and mongos identifies itself in msg
+        hello = await self._db.command("hello")
+        return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+    async def ping(self) -> float:
+        """Round trip of a ping through the pool, in seconds"""
+        if self._db is None:
+            raise DatabaseConnectionError()
+        start = time.perf_counter()
+        await self._db.command("ping")
+        return time.perf_counter() - start
+
+    def pool_stats(self) -> PoolStats:
+        return self._pool_listener.stats()
 
     async def close(self):
+        if self._index_build is not None and not self._index_build.done():
+            self._index_build.cancel()
+            logger.warning("Background index build cancelled at shutdown")
+        self._index_build = None
         if self._client:
             self._client.close()
             self._db = None
             self._client = None
             logger.info("Disconnected: MongoDB")
 
+    @asynccontextmanager
+    async def transaction(self):
+        """Run the enclosed writes as one multi-document transaction.
+
+        Yields the session each operation must be given. Transactions need a
+        replica set; against a standalone server, or with
+        MONGO_TRANSACTIONS_ENABLED off, this yields None and the writes apply
+        one by one.
+        """
+        if not self._transactions:
+            yield None
+            return
+        if self._client is None:
+            raise DatabaseConnectionError()
+        async with await self._client.start_session() as session:
+            async with session.start_transaction():
+                yield session
+
     def get_collection(self, name: str):
         if not isinstance(self._db, AsyncIOMotorDatabase):
             raise DatabaseConnectionError()
-        return self._db[name]
+        return CountedCollection(self._db[name])
 
 
 _mongodb_client = None
@@ -45,3 +143,13 @@ def get_mongodb_client():
     if _mongodb_client is None:
         _mongodb_client = MongoDBClient()
     return _mongodb_client
+
+
+def _reset_after_fork():
+    # A driver client must never cross a fork: the child would share the
+    # parent's sockets. Drop it unclosed and let the worker connect its own
+    global _mongodb_client
+    _mongodb_client = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,122 @@
+import threading
+from dataclasses import dataclass
+
+from pymongo import monitoring
+
+from app.core.metrics import registry
+
+_command_duration = registry.histogram(
+    "mongo_command_duration_seconds",
+    "Round trip of each command sent to MongoDB",
+    ("command", "status"),
+)
+_checkout_wait = registry.histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+_checkout_failures = registry.counter(
+    "mongo_pool_checkout_failures",
+    "Connection checkouts that failed, by reason",
+    ("reason",),
+)
+_pool_cleared = registry.counter(
+    "mongo_pool_cleared", "Times the pool was cleared after a network error"
+)
+_connections_open = registry.gauge(
+    "mongo_pool_connections_open", "Connections currently open to MongoDB"
+)
+_connections_in_use = registry.gauge(
+    "mongo_pool_connections_in_use", "Connections currently checked out"
+)
+_checkouts_waiting = registry.gauge(
+    "mongo_pool_checkouts_waiting", "Operations waiting for a free connection"
+)
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records the latency of every command the driver sends"""
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        _command_duration.observe(
+            event.duration_micros / 1_000_000, command=event.command_name, status="ok"
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        _command_duration.observe(
+            event.duration_micros / 1_000_000,
+            command=event.command_name,
+            status="failed",
+        )
+
+
+@dataclass
+class PoolStats:
+    open: int = 0
+    in_use: int = 0
+    waiting: int = 0
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Tracks pool occupancy and checkout waits across all servers.
+
+    The driver calls listeners from its own threads, so the counts are kept
+    under a lock and read through ``stats()``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = PoolStats()
+        _connections_open.set_function(lambda: self._stats.open)
+        _connections_in_use.set_function(lambda: self._stats.in_use)
+        _checkouts_waiting.set_function(lambda: self._stats.waiting)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(self._stats.open, self._stats.in_use, self._stats.waiting)
+
+    def _add(self, **deltas: int):
+        with self._lock:
+            for field, delta in deltas.items():
+                setattr(self._stats, field, getattr(self._stats, field) + delta)
+
+    def connection_created(self, event):
+        self._add(open=1)
+
+    def connection_closed(self, event):
+        self._add(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent):
+        self._add(waiting=-1, in_use=1)
+        if event.duration is not None:
+            _checkout_wait.observe(event.duration)
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ):
+        self._add(waiting=-1)
+        _checkout_failures.inc(reason=event.reason)
+
+    def connection_checked_in(self, event):
+        self._add(in_use=-1)
+
+    def pool_cleared(self, event):
+        _pool_cleared.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
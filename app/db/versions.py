@@ -0,0 +1,40 @@
+from collections.abc import Iterable
+from typing import Any
+
+from app.db.mongodb import MongoDBClient
+
+
+class Versions:
+    """Change counters per owner for data that is read far more than written.
+
+    One document per owner in the ``versions`` collection holds a counter per
+    named resource (``{"_id": owner, "budgets": 3, ...}``). Writers bump the
+    counter after their write, so a reader that reads the counter first and
+    the data second can only pair data with an older counter, never newer.
+    That makes the counter safe to derive cache keys and ETags from, in every
+    worker, for the price of a point read.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient, name: str):
+        self._collection = mongo_client.get_collection("versions")
+        self.name = name
+
+    async def bump(self, owner: Any):
+        await self._collection.update_one(
+            {"_id": owner}, {"$inc": {self.name: 1}}, upsert=True
+        )
+
+    async def get(self, owner: Any) -> int:
+        versions = await self.get_many([owner])
+        return versions[owner]
+
+    async def get_many(self, owners: Iterable[Any]) -> dict[Any, int]:
+        """Counters by owner; 0 for owners that never wrote"""
+        owners = list(owners)
+        found = {
+            document["_id"]: document.get(self.name, 0)
+            async for document in self._collection.find(
+                {"_id": {"$in": owners}}, {self.name: 1}
+            )
+        }
+        return {owner: found.get(owner, 0) for owner in owners}
@@ -0,0 +1,46 @@
+"""Evaluate every budget against its month's spending and raise alerts.
+
+Usage: ``python -m app.jobs.evaluate_budgets [--month YYYY-MM]``
+
+Defaults to the current month. Safe to run as often as needed: an alert is
+only raised the first time a threshold is crossed in a month.
+"""
+
+import argparse
+import asyncio
+import re
+
+from app.db.mongodb import get_mongodb_client
+from app.models.report_model import MONTH_PATTERN
+from app.services.budget_evaluation import BudgetEvaluator
+from app.services.rollup_service import month_key
+from app.util.clock import utc_now
+
+
+async def evaluate(month: str | None = None) -> int:
+    mongo_client = get_mongodb_client()
+    await mongo_client.connect()
+    try:
+        summary = await BudgetEvaluator(mongo_client).evaluate(
+            month or month_key(utc_now())
+        )
+        return summary.alerts
+    finally:
+        await mongo_client.close()
+
+
+def _month(value: str) -> str:
+    if not re.match(MONTH_PATTERN, value):
+        raise argparse.ArgumentTypeError("expected YYYY-MM")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--month", type=_month, help="Month to evaluate, YYYY-MM")
+    args = parser.parse_args()
+    asyncio.run(evaluate(args.month))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Replace the global category rules with the ones in a CSV file.
+
+Usage: ``python -m app.jobs.load_category_rules --file rules.csv``
+
+The file has a header and ``pattern,category[,field]`` rows, field being
+``merchant``, ``description`` or ``any`` (the default). Global rules apply to
+every user's imports after the user's own rules. The previous global rules
+are replaced as a whole, and running workers recompile before their next
+import.
+"""
+
+import argparse
+import asyncio
+import csv
+
+from pydantic import ValidationError as PydanticValidationError
+
+from app.core.logging_config import logger
+from app.db.mongodb import get_mongodb_client
+from app.models.category_rule_model import CategoryRuleCreate
+from app.services.categorizer import GLOBAL_RULES, rule_versions
+from app.util.clock import utc_now
+
+
+def read_rules_file(path: str) -> list[dict]:
+    rules: dict[tuple[str, str], dict] = {}
+    with open(path, newline="") as file:
+        for line, row in enumerate(csv.DictReader(file), 2):
+            try:
+                rule = CategoryRuleCreate.model_validate(
+                    {key: value for key, value in row.items() if value}
+                )
+            except PydanticValidationError as exc:
+                raise SystemExit(f"{path}:{line}: {exc.errors()[0]['msg']}")
+            # A later row for the same pattern and field replaces an earlier one
+            rules[rule.pattern, rule.field] = rule.model_dump()
+    return list(rules.values())
+
+
+async def load(path: str) -> int:
+    rules = read_rules_file(path)
+    now = utc_now()
+    for rule in rules:
+        rule.update(user_id=None, created_at=now, updated_at=now)
+    mongo_client = get_mongodb_client()
+    await mongo_client.connect()
+    try:
+        collection = mongo_client.get_collection("category_rules")
+        deleted = await collection.delete_many({"user_id": None})
+        if rules:
+            await collection.insert_many(rules)
+        await rule_versions(mongo_client).bump(GLOBAL_RULES)
+        logger.info(
+            f"Global category rules loaded from {path}: rules={len(rules)} "
+            f"replaced={deleted.deleted_count}"
+        )
+        return len(rules)
+    finally:
+        await mongo_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--file", required=True, help="CSV file of pattern,category[,field]"
+    )
+    args = parser.parse_args()
+    asyncio.run(load(args.file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Load exchange rates from a CSV file into the fx_rates collection.
+
+Usage: ``python -m app.jobs.load_fx_rates --file rates.csv``
+
+The file has a header and ``date,currency,rate`` rows, the rate being units of
+the home currency per unit of ``currency``. Rows are upserted on (currency,
+date), so a corrected file can simply be loaded again. Running workers pick
+the new rates up at their next refresh, without a restart.
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+
+from pymongo import UpdateOne
+
+from app.core.logging_config import logger
+from app.db.mongodb import get_mongodb_client
+from app.services.fx_service import read_rates_file
+
+_BATCH_SIZE = 10_000
+
+
+async def load(path: str) -> int:
+    rows = read_rates_file(path)
+    mongo_client = get_mongodb_client()
+    await mongo_client.connect()
+    try:
+        collection = mongo_client.get_collection("fx_rates")
+        written = 0
+        for start in range(0, len(rows), _BATCH_SIZE):
+            result = await collection.bulk_write(
+                [
+                    UpdateOne(
+                        {
+                            "currency": currency,
+                            "date": datetime.fromordinal(day).replace(tzinfo=UTC),
+                        },
+                        {"$set": {"rate": rate}},
+                        upsert=True,
+                    )
+                    for currency, day, rate in rows[start : start + _BATCH_SIZE]
+                ],
+                ordered=False,
+            )
+            written += result.upserted_count + result.modified_count
+        logger.info(f"FX rates loaded from {path}: rows={len(rows)} written={written}")
+        return written
+    finally:
+        await mongo_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", required=True, help="CSV file of date,currency,rate")
+    args = parser.parse_args()
+    asyncio.run(load(args.file))
+
+
+if __name__ == "__main__":
+    main()
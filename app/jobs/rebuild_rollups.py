@@ -0,0 +1,223 @@
+"""Recompute category rollups from raw transactions and check they match.
+
+Usage: ``python -m app.jobs.rebuild_rollups [--user-id ID] [--verify-only]
+[--offline]``
+
+Safe against a live app on a replica set: a user's rollups and
+transactions are read in one transaction, and each rewrite is conditional
+on the stored totals it was compared against, so a concurrent ``$inc``
+makes it miss rather than be overwritten; the read-back check reports what
+was left. A standalone server has no transactions, so there the job only
+verifies, unless ``--offline`` says the app is stopped.
+"""
+
+import argparse
+import asyncio
+from datetime import date
+
+import numpy as np
+from bson import ObjectId
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.services.account_service import AccountService
+from app.services.fx_service import day_number, get_fx_rates
+from app.services.rollup_service import ROLLUP_TOLERANCE
+
+
+def _rollup_pipeline(user_id: ObjectId) -> list[dict]:
+    unconverted = {"$eq": [{"$ifNull": ["$home_amount", None]}, None]}
+
+    def amount_of(kind: str, converted: bool):
+        # Rollups hold the home amount stored with each transaction; only
+        # transactions written before it was stored are converted here
+        amount = (
+            {"$cond": [unconverted, 0, "$home_amount"]}
+            if converted
+            else {"$cond": [unconverted, "$amount", 0]}
+        )
+        return {"$sum": {"$cond": [{"$eq": ["$type", kind]}, amount, 0]}}
+
+    # Grouped per day and account rather than per month: rates are daily, so
+    # converting the day totals is exact and far cheaper than per transaction
+    return [
+        {"$match": {"user_id": user_id}},
+        {
+            "$group": {
+                "_id": {
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+                    "category": "$category",
+                    "account_id": "$account_id",
+                },
+                "income": amount_of("income", False),
+                "expense": amount_of("expense", False),
+                "home_income": amount_of("income", True),
+                "home_expense": amount_of("expense", True),
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+
+
+async def _home_totals(
+    mongo_client: MongoDBClient, groups: list[dict]
+) -> dict[tuple[str, str], dict]:
+    """Fold day groups into monthly totals in the home currency"""
+    home = settings.FX_HOME_CURRENCY
+    account_ids = {g["_id"].get("account_id") for g in groups} - {None}
+    currencies = await AccountService(mongo_client).currencies(account_ids)
+    income = np.fromiter((g["income"] for g in groups), float, len(groups))
+    expense = np.fromiter((g["expense"] for g in groups), float, len(groups))
+    if any(currency != home for currency in currencies.values()):
+        table = await get_fx_rates().table()
+        group_currencies = [
+            currencies.get(g["_id"].get("account_id"), home) for g in groups
+        ]
+        days = [day_number(date.fromisoformat(g["_id"]["day"])) for g in groups]
+        income = table.to_home(income, group_currencies, days)
+        expense = table.to_home(expense, group_currencies, days)
+
+    expected: dict[tuple[str, str], dict] = {}
+    for group, group_income, group_expense in zip(
+        groups, income.tolist(), expense.tolist()
+    ):
+        key = (group["_id"]["day"][:7], group["_id"]["category"])
+        totals = expected.setdefault(key, {"income": 0.0, "expense": 0.0, "count": 0})
+        totals["income"] += group_income + group["home_income"]
+        totals["expense"] += group_expense + group["home_expense"]
+        totals["count"] += group["count"]
+    return expected
+
+
+def _matches(expected: dict, stored: dict | None) -> bool:
+    if stored is None:
+        return False
+    return (
+        expected["count"] == stored.get("count")
+        and abs(expected["income"] - stored.get("income", 0)) <= ROLLUP_TOLERANCE
+        and abs(expected["expense"] - stored.get("expense", 0)) <= ROLLUP_TOLERANCE
+    )
+
+
+def _as_read(rollup: dict) -> dict:
+    """Filter matching a rollup only while it holds the totals read"""
+    return {
+        "_id": rollup["_id"],
+        "income": rollup.get("income"),
+        "expense": rollup.get("expense"),
+        "count": rollup.get("count"),
+    }
+
+
+async def rebuild_user(
+    mongo_client: MongoDBClient,
+    user_id: ObjectId,
+    verify_only: bool = False,
+    offline: bool = False,
+) -> int:
+    """Return how many rollups disagreed with the transactions of the user"""
+    transactions = mongo_client.get_collection("transactions")
+    rollups = mongo_client.get_collection("category_rollups")
+
+    async with mongo_client.transaction() as session:
+        # Rollups first: without a transaction, a write landing between the
+        # two reads then fails the guards below instead of being overwritten
+        stored = {
+            (rollup["month"], rollup["category"]): rollup
+            async for rollup in rollups.find({"user_id": user_id}, session=session)
+        }
+        groups = await transactions.aggregate(
+            _rollup_pipeline(user_id), session=session
+        ).to_list(None)
+        expected = await _home_totals(mongo_client, groups)
+
+        operations = []
+        for (month, category), totals in expected.items():
+            rollup = stored.get((month, category))
+            if _matches(totals, rollup):
+                continue
+            key = {"user_id": user_id, "month": month, "category": category}
+            if rollup is None:
+                operations.append(UpdateOne(key, {"$setOnInsert": totals}, upsert=True))
+            else:
+                operations.append(ReplaceOne(_as_read(rollup), key | totals))
+        for key, rollup in stored.items():
+            if key not in expected and rollup.get("count", 0) != 0:
+                operations.append(DeleteOne(_as_read(rollup)))
+
+        if operations:
+            logger.warning(f"Rollup drift: user={user_id} mismatched={len(operations)}")
+        if operations and not verify_only:
+            if session is None and not offline:
+                logger.warning(
+                    f"Rollups not rebuilt without transactions, rerun with "
+                    f"--offline while the app is stopped: user={user_id}"
+                )
+            else:
+                await rollups.bulk_write(operations, ordered=False, session=session)
+    return len(operations)
+
+
+async def _check_user(
+    mongo_client: MongoDBClient, user_id: ObjectId, verify_only: bool, offline: bool
+) -> int:
+    try:
+        return await rebuild_user(mongo_client, user_id, verify_only, offline)
+    except PyMongoError as exc:
+        # A write conflict with the app; the next run checks the user again
+        logger.warning(
+            f"User changed while rebuilding, skipped: user={user_id} {exc!r}"
+        )
+        return 1
+
+
+async def rebuild(
+    user_id: str | None = None, verify_only: bool = False, offline: bool = False
+) -> int:
+    mongo_client = get_mongodb_client()
+    await mongo_client.connect()
+    try:
+        transactions = mongo_client.get_collection("transactions")
+        if user_id is not None:
+            user_ids = [ObjectId(user_id)]
+        else:
+            user_ids = await transactions.distinct("user_id")
+
+        mismatched = 0
+        for owner in user_ids:
+            mismatched += await _check_user(mongo_client, owner, verify_only, offline)
+        if mismatched and not verify_only:
+            # Read back what was written to prove the rollups now match
+            remaining = 0
+            for owner in user_ids:
+                remaining += await _check_user(mongo_client, owner, True, offline)
+            if remaining:
+                logger.error(f"Rollups still mismatched after rebuild: {remaining}")
+            mismatched = remaining
+        logger.info(f"Rollup check finished: users={len(user_ids)} drift={mismatched}")
+        return mismatched
+    finally:
+        await mongo_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", help="Only rebuild this user")
+    parser.add_argument(
+        "--verify-only", action="store_true", help="Report drift without fixing it"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="The app is stopped: rebuild even without transactions",
+    )
+    args = parser.parse_args()
+    mismatched = asyncio.run(rebuild(args.user_id, args.verify_only, args.offline))
+    raise SystemExit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
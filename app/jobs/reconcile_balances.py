@@ -0,0 +1,209 @@
+"""Recompute account balances and monthly snapshots from raw transactions.
+
+Usage: ``python -m app.jobs.reconcile_balances [--account-id ID] [--fix]
+[--offline]``
+
+Snapshots, the net change of each month, are rewritten where they differ;
+the stored balance is only corrected with ``--fix``, otherwise the drift is
+just recorded on the account. Writes keep snapshots current, so this is only
+needed after a crash between writes or once to convert snapshots from
+before they held monthly net changes.
+
+Safe against a live app on a replica set: each account is read in one
+transaction and every write is conditional on the values read, so a
+concurrent transaction write aborts the check of that account instead of
+being overwritten. A standalone server has no transactions and its reads
+can straddle a write, so there the job only reports, unless ``--offline``
+says the app is stopped.
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+
+from bson import ObjectId
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.core.logging_config import logger
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.services.rollup_service import ROLLUP_TOLERANCE
+from app.util.clock import utc_now
+
+
+def _monthly_pipeline(account_id: ObjectId) -> list[dict]:
+    signed = {
+        "$cond": [
+            {"$eq": ["$type", "income"]},
+            "$amount",
+            {"$multiply": [-1, "$amount"]},
+        ]
+    }
+    return [
+        {"$match": {"account_id": account_id}},
+        {
+            "$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m", "date": "$date"}},
+                "total": {"$sum": signed},
+            }
+        },
+    ]
+
+
+class BalanceChangedError(Exception):
+    """The account was written while it was being reconciled"""
+
+
+def _snapshot_fixes(
+    account_id: ObjectId, monthly: dict[datetime, float], stored: dict[datetime, dict]
+) -> list:
+    """Writes turning the stored snapshots into the recomputed ones, each
+    conditional on the snapshot read so a concurrent $inc is not lost"""
+    operations = []
+    for period_start, snapshot in stored.items():
+        if period_start not in monthly:
+            operations.append(
+                DeleteOne({"_id": snapshot["_id"], "net": snapshot.get("net")})
+            )
+    for period_start, total in monthly.items():
+        snapshot = stored.get(period_start)
+        if snapshot is None:
+            operations.append(
+                UpdateOne(
+                    {"account_id": account_id, "period_start": period_start},
+                    {"$setOnInsert": {"net": total}},
+                    upsert=True,
+                )
+            )
+        elif (
+            snapshot.get("net") is None
+            or abs(snapshot["net"] - total) > ROLLUP_TOLERANCE
+        ):
+            operations.append(
+                ReplaceOne(
+                    {"_id": snapshot["_id"], "net": snapshot.get("net")},
+                    {
+                        "account_id": account_id,
+                        "period_start": period_start,
+                        "net": total,
+                    },
+                )
+            )
+    return operations
+
+
+async def reconcile_account(
+    mongo_client: MongoDBClient,
+    account_id: ObjectId,
+    fix: bool = False,
+    offline: bool = False,
+) -> float:
+    """Return the drift between the stored and the recomputed balance that
+    is left in place, so 0 once fixed"""
+    transactions = mongo_client.get_collection("transactions")
+    snapshots = mongo_client.get_collection("account_snapshots")
+    accounts = mongo_client.get_collection("accounts")
+
+    async with mongo_client.transaction() as session:
+        # One snapshot read: the balance and the ledger it is checked
+        # against cannot straddle a write
+        account = await accounts.find_one({"_id": account_id}, session=session)
+        if account is None:
+            return 0.0
+        monthly = {
+            datetime.strptime(group["_id"], "%Y-%m").replace(tzinfo=UTC): group["total"]
+            async for group in transactions.aggregate(
+                _monthly_pipeline(account_id), session=session
+            )
+        }
+        stored = {
+            snapshot["period_start"]: snapshot
+            async for snapshot in snapshots.find(
+                {"account_id": account_id}, session=session
+            )
+        }
+        writable = session is not None or offline
+
+        balance = account.get("opening_balance", 0.0) + sum(monthly.values())
+        drift = account.get("balance", 0.0) - balance
+        if abs(drift) <= ROLLUP_TOLERANCE:
+            drift = 0.0
+        update: dict = {"$set": {"balance_drift": drift, "reconciled_at": utc_now()}}
+        if drift and fix and writable:
+            logger.warning(f"Balance drift fixed: account={account_id} drift={drift}")
+            update["$set"].update(balance=balance, balance_drift=0.0)
+            drift = 0.0
+        elif drift and fix:
+            logger.warning(
+                f"Balance drift not fixed without transactions, rerun with "
+                f"--offline while the app is stopped: account={account_id} "
+                f"drift={drift}"
+            )
+        elif drift:
+            logger.warning(f"Balance drift: account={account_id} drift={drift}")
+        # Only if the balance is still the one checked
+        result = await accounts.update_one(
+            {"_id": account_id, "balance": account.get("balance")},
+            update,
+            session=session,
+        )
+        if result.matched_count == 0:
+            raise BalanceChangedError(account_id)
+
+        operations = _snapshot_fixes(account_id, monthly, stored) if writable else []
+        if operations:
+            await snapshots.bulk_write(operations, ordered=False, session=session)
+            logger.info(
+                f"Snapshots rewritten: account={account_id} count={len(operations)}"
+            )
+    return drift
+
+
+async def reconcile(
+    account_id: str | None = None, fix: bool = False, offline: bool = False
+) -> int:
+    mongo_client = get_mongodb_client()
+    await mongo_client.connect()
+    try:
+        accounts = mongo_client.get_collection("accounts")
+        query = {"_id": ObjectId(account_id)} if account_id is not None else {}
+        checked = drifted = skipped = 0
+        async for account in accounts.find(query, {"_id": 1}):
+            checked += 1
+            try:
+                if await reconcile_account(mongo_client, account["_id"], fix, offline):
+                    drifted += 1
+            except (BalanceChangedError, PyMongoError) as exc:
+                # A write conflict or a moved balance; the next run checks it
+                skipped += 1
+                logger.warning(
+                    f"Account changed while reconciling, skipped: "
+                    f"account={account['_id']} {exc!r}"
+                )
+        logger.info(
+            f"Balance check finished: accounts={checked} drift={drifted} "
+            f"skipped={skipped}"
+        )
+        return drifted + skipped
+    finally:
+        await mongo_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--account-id", help="Only reconcile this account")
+    parser.add_argument(
+        "--fix", action="store_true", help="Correct drifted balances in place"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="The app is stopped: write corrections even without transactions",
+    )
+    args = parser.parse_args()
+    drifted = asyncio.run(reconcile(args.account_id, args.fix, args.offline))
+    raise SystemExit(1 if drifted else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,58 @@
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from app.api.dependencies import RequestIDMiddleware
+from app.api.routes_health import router as health_router
+from app.api.routes_metrics import router as metrics_router
+from app.api.v1.routes_accounts import router as account_router
+from app.api.v1.routes_budgets import router as budget_router
+from app.api.v1.routes_category_rules import router as category_rule_router
+from app.api.v1.routes_recurring import router as recurring_router
+from app.api.v1.routes_reports import router as report_router
+from app.api.v1.routes_transactions import router as transaction_router
 from app.api.v1.routes_users import router as user_router
 from app.core.config import settings
 from app.core.exception_handlers import register_exception_handler
 from app.core.logging_config import logger
+from app.core.security import get_password_hash_pool
 from app.db.mongodb import get_mongodb_client
+from app.services.recurring_scheduler import get_recurring_scheduler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup code here
+    start = time.perf_counter()
     mongo_client = get_mongodb_client()
     await mongo_client.connect()
     app.state.mongo_client = mongo_client
+    # Started in every worker; the one holding the lease does the work
+    scheduler = get_recurring_scheduler()
+    if settings.RECURRING_SCHEDULER_ENABLED:
+        scheduler.start()
+    logger.info(f"Startup finished in {(time.perf_counter() - start) * 1000:.0f}ms")
     try:
         yield
     finally:
         # Shutdown code here
+        await scheduler.stop()
         await mongo_client.close()
+        get_password_hash_pool().shutdown()
 
 
 def create_app():
     app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
     app.include_router(user_router, prefix="/api/v1")
+    app.include_router(account_router, prefix="/api/v1")
+    app.include_router(transaction_router, prefix="/api/v1")
+    app.include_router(report_router, prefix="/api/v1")
+    app.include_router(budget_router, prefix="/api/v1")
+    app.include_router(category_rule_router, prefix="/api/v1")
+    app.include_router(recurring_router, prefix="/api/v1")
+    app.include_router(metrics_router)
+    app.include_router(health_router)
     register_exception_handler(app)
     app.add_middleware(RequestIDMiddleware)
     logger.info(f"{settings.APP_NAME} started in {settings.ENVIRONMENT.upper()} mode")
@@ -0,0 +1,88 @@
+from datetime import datetime
+from enum import Enum
+from typing import Annotated
+
+from pydantic import ConfigDict, Field, field_validator
+
+from app.models.objectid_model import PyObjectID
+from app.models.user_model import BaseModelConfig
+
+
+class AccountType(str, Enum):
+    CHECKING = "checking"
+    SAVINGS = "savings"
+    CREDIT_CARD = "credit_card"
+    CASH = "cash"
+    INVESTMENT = "investment"
+
+
+class AccountBase(BaseModelConfig):
+    name: Annotated[
+        str,
+        Field(
+            ...,
+            min_length=1,
+            max_length=50,
+            description="Account name",
+            examples=["Main checking"],
+        ),
+    ]
+    type: Annotated[AccountType, Field(AccountType.CHECKING, description="Kind")]
+    currency: Annotated[
+        str,
+        Field("USD", pattern=r"^[A-Za-z]{3}$", description="ISO 4217 currency code"),
+    ]
+
+    @field_validator("currency")
+    @classmethod
+    def normalise_currency(cls, v: str):
+        return v.upper()
+
+
+class AccountCreate(AccountBase):
+    opening_balance: Annotated[
+        float, Field(0.0, description="Balance before the first transaction")
+    ]
+
+
+class AccountUpdate(BaseModelConfig):
+    name: Annotated[
+        str | None,
+        Field(None, min_length=1, max_length=50, description="Updated name"),
+    ]
+
+
+class AccountResponse(AccountBase):
+    id: Annotated[
+        PyObjectID, Field(..., alias="_id", description="MongoDB document ID")
+    ]
+    user_id: Annotated[PyObjectID, Field(..., description="Owner of the account")]
+    opening_balance: Annotated[float, Field(0.0, description="Opening balance")]
+    balance: Annotated[float, Field(0.0, description="Current balance")]
+    balance_drift: Annotated[
+        float | None,
+        Field(None, description="Difference found by the last reconciliation"),
+    ]
+    reconciled_at: Annotated[
+        datetime | None, Field(None, description="Last reconciliation (ISO format)")
+    ]
+    created_at: Annotated[
+        datetime | None, Field(None, description="Creation date (ISO format)")
+    ]
+    updated_at: Annotated[
+        datetime | None, Field(None, description="Last updated timestamp (ISO format)")
+    ]
+
+    model_config = ConfigDict(
+        extra="ignore", from_attributes=True, validate_by_name=True
+    )
+
+
+class AccountBalance(BaseModelConfig):
+    account_id: Annotated[PyObjectID, Field(..., description="Account")]
+    at: Annotated[datetime, Field(..., description="Point in time of the balance")]
+    balance: Annotated[float, Field(..., description="Balance at that time")]
+    currency: Annotated[str, Field(..., description="Currency of the balance")]
+    home_balance: Annotated[
+        float, Field(..., description="Balance in the home currency at that time")
+    ]
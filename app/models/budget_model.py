@@ -0,0 +1,87 @@
+from datetime import datetime
+from enum import Enum
+from typing import Annotated
+
+from pydantic import ConfigDict, Field, field_validator
+
+from app.models.objectid_model import PyObjectID
+from app.models.transaction_model import _normalise_category
+from app.models.user_model import BaseModelConfig
+
+
+class BudgetBase(BaseModelConfig):
+    category: Annotated[
+        str,
+        Field(
+            ...,
+            min_length=1,
+            max_length=50,
+            description="Spending category the budget caps",
+            examples=["groceries"],
+        ),
+    ]
+    limit: Annotated[
+        float, Field(..., gt=0, description="Monthly spending limit", examples=[400])
+    ]
+
+    @field_validator("category")
+    @classmethod
+    def normalise_category(cls, v: str):
+        return _normalise_category(v)
+
+
+class BudgetCreate(BudgetBase):
+    pass
+
+
+class BudgetUpdate(BaseModelConfig):
+    limit: Annotated[float, Field(..., gt=0, description="New monthly limit")]
+
+
+class BudgetResponse(BudgetBase):
+    id: Annotated[
+        PyObjectID, Field(..., alias="_id", description="MongoDB document ID")
+    ]
+    user_id: Annotated[PyObjectID, Field(..., description="Owner of the budget")]
+    created_at: Annotated[
+        datetime | None, Field(None, description="Creation date (ISO format)")
+    ]
+    updated_at: Annotated[
+        datetime | None, Field(None, description="Last updated timestamp (ISO format)")
+    ]
+
+    model_config = ConfigDict(
+        extra="ignore", from_attributes=True, validate_by_name=True
+    )
+
+
+class BudgetAlertKind(str, Enum):
+    # Spending so far crossed a threshold of the limit
+    THRESHOLD = "threshold"
+    # Spending is on pace to exceed the limit by the end of the month
+    PROJECTED = "projected"
+
+
+class BudgetAlertResponse(BaseModelConfig):
+    id: Annotated[
+        PyObjectID, Field(..., alias="_id", description="MongoDB document ID")
+    ]
+    budget_id: Annotated[PyObjectID, Field(..., description="Budget that alerted")]
+    category: Annotated[str, Field(..., description="Budget category")]
+    month: Annotated[str, Field(..., description="Month as YYYY-MM")]
+    kind: Annotated[BudgetAlertKind, Field(..., description="What triggered it")]
+    threshold: Annotated[
+        float, Field(..., description="Share of the limit that was crossed")
+    ]
+    spent: Annotated[float, Field(..., description="Spending when it triggered")]
+    limit: Annotated[float, Field(..., description="Limit when it triggered")]
+    projected_spend: Annotated[
+        float, Field(..., description="Month-end spending projected at the time")
+    ]
+    created_at: Annotated[
+        datetime | None, Field(None, description="When the alert was raised")
+    ]
+
+    model_config = ConfigDict(
+        extra="ignore", from_attributes=True, validate_by_name=True
+    )
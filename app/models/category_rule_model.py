@@ -0,0 +1,80 @@
+from datetime import datetime
+from enum import Enum
+from typing import Annotated
+
+from pydantic import ConfigDict, Field, field_validator
+
+from app.models.objectid_model import PyObjectID
+from app.models.transaction_model import _normalise_category
+from app.models.user_model import BaseModelConfig
+
+
+class RuleField(str, Enum):
+    MERCHANT = "merchant"
+    DESCRIPTION = "description"
+    ANY = "any"
+
+
+def normalise_pattern(value: str) -> str:
+    # Lowercase with single spaces, as statement text is before matching
+    return " ".join(value.lower().split())
+
+
+class CategoryRuleBase(BaseModelConfig):
+    pattern: Annotated[
+        str,
+        Field(
+            ...,
+            min_length=1,
+            max_length=100,
+            description="Text the merchant or description must contain, any case",
+            examples=["whole foods"],
+        ),
+    ]
+    category: Annotated[
+        str,
+        Field(
+            ...,
+            min_length=1,
+            max_length=50,
+            description="Category given to matching transactions",
+            examples=["groceries"],
+        ),
+    ]
+    field: Annotated[
+        RuleField, Field(RuleField.ANY, description="Which text the pattern is in")
+    ]
+
+    @field_validator("pattern")
+    @classmethod
+    def check_pattern(cls, v: str):
+        v = normalise_pattern(v)
+        if not v:
+            raise ValueError("pattern must not be blank")
+        return v
+
+    @field_validator("category")
+    @classmethod
+    def normalise_category(cls, v: str):
+        return _normalise_category(v)
+
+
+class CategoryRuleCreate(CategoryRuleBase):
+    pass
+
+
+class CategoryRuleResponse(CategoryRuleBase):
+    id: Annotated[
+        PyObjectID, Field(..., alias="_id", description="MongoDB document ID")
+    ]
+    user_id: Annotated[PyObjectID, Field(..., description="Owner of the rule")]
+    created_at: Annotated[
+        datetime | None, Field(None, description="Creation date (ISO format)")
+    ]
+    updated_at: Annotated[
+        datetime | None, Field(None, description="Last updated timestamp (ISO format)")
+    ]
+
+    model_config = ConfigDict(
+        extra="ignore", from_attributes=True, validate_by_name=True
+    )
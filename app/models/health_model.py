@@ -0,0 +1,25 @@
+from typing import Annotated, Literal
+
+from pydantic import Field
+
+from app.models.user_model import BaseModelConfig
+
+
+class MongoHealth(BaseModelConfig):
+    reachable: Annotated[bool, Field(..., description="Ping answered in time")]
+    ping_ms: Annotated[float | None, Field(None, description="Ping round trip")]
+    connections_open: Annotated[int, Field(0, description="Open connections")]
+    connections_in_use: Annotated[int, Field(0, description="Checked-out connections")]
+    checkouts_waiting: Annotated[
+        int, Field(0, description="Operations waiting for a connection")
+    ]
+    max_pool_size: Annotated[int, Field(..., description="Configured pool limit")]
+    saturated: Annotated[
+        bool, Field(False, description="Every connection busy with others queued")
+    ]
+    error: Annotated[str | None, Field(None, description="Why the check failed")]
+
+
+class ReadinessReport(BaseModelConfig):
+    status: Annotated[Literal["ready", "unavailable"], Field(...)]
+    mongo: Annotated[MongoHealth, Field(...)]
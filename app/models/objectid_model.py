@@ -7,9 +7,20 @@ class PyObjectID(ObjectId):
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type, handler: GetCoreSchemaHandler):
         # Define how Pydantic should validate this type
-        return core_schema.no_info_after_validator_function(
+        from_str = core_schema.no_info_after_validator_function(
             cls.validate, core_schema.str_schema()
         )
+        return core_schema.json_or_python_schema(
+            json_schema=from_str,
+            # Documents read from Mongo already carry ObjectId instances
+            python_schema=core_schema.union_schema(
+                [core_schema.is_instance_schema(ObjectId), from_str]
+            ),
+            # Python-mode dumps keep the ObjectId so they can be written to Mongo
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                str, when_used="json"
+            ),
+        )
 
     @classmethod
     def validate(cls, value):
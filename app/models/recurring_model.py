@@ -0,0 +1,67 @@
+from datetime import datetime
+from enum import Enum
+from typing import Annotated
+
+from pydantic import ConfigDict, Field, field_validator, model_validator
+
+from app.models.objectid_model import PyObjectID
+from app.models.transaction_model import TransactionDetails
+from app.util.clock import as_utc
+
+
+class RecurrenceFrequency(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+
+class RecurringTransactionBase(TransactionDetails):
+    frequency: Annotated[
+        RecurrenceFrequency, Field(..., description="How often it repeats")
+    ]
+    interval: Annotated[
+        int,
+        Field(1, ge=1, le=366, description="Repeat every N periods", examples=[1]),
+    ]
+    start_date: Annotated[datetime, Field(..., description="First due date")]
+    end_date: Annotated[
+        datetime | None, Field(None, description="No occurrences after this date")
+    ]
+
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def normalise_dates(cls, v: datetime | None):
+        return as_utc(v)
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+
+class RecurringTransactionCreate(RecurringTransactionBase):
+    pass
+
+
+class RecurringTransactionResponse(RecurringTransactionBase):
+    id: Annotated[
+        PyObjectID, Field(..., alias="_id", description="MongoDB document ID")
+    ]
+    user_id: Annotated[PyObjectID, Field(..., description="Owner of the item")]
+    next_due: Annotated[
+        datetime | None,
+        Field(None, description="Next occurrence, null once the item has ended"),
+    ]
+    next_index: Annotated[int, Field(0, description="Occurrences materialized so far")]
+    created_at: Annotated[
+        datetime | None, Field(None, description="Creation date (ISO format)")
+    ]
+    updated_at: Annotated[
+        datetime | None, Field(None, description="Last updated timestamp (ISO format)")
+    ]
+
+    model_config = ConfigDict(
+        extra="ignore", from_attributes=True, validate_by_name=True
+    )
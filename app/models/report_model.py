@@ -0,0 +1,32 @@
+from typing import Annotated
+
+from pydantic import Field
+
+from app.models.user_model import BaseModelConfig
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+class CategorySpending(BaseModelConfig):
+    category: Annotated[str, Field(..., description="Spending category")]
+    income: Annotated[float, Field(0.0, description="Money in for the category")]
+    expense: Annotated[float, Field(0.0, description="Money out for the category")]
+    count: Annotated[int, Field(0, description="Number of transactions")]
+
+
+class CategoryReport(BaseModelConfig):
+    month: Annotated[str, Field(..., description="Month as YYYY-MM")]
+    currency: Annotated[str, Field(..., description="Home currency of the amounts")]
+    total_income: Annotated[float, Field(0.0, description="Money in for the month")]
+    total_expense: Annotated[float, Field(0.0, description="Money out for the month")]
+    categories: Annotated[
+        list[CategorySpending], Field(default_factory=list, description="Breakdown")
+    ]
+
+
+class MonthlyTotals(BaseModelConfig):
+    month: Annotated[str, Field(..., description="Month as YYYY-MM")]
+    income: Annotated[float, Field(0.0, description="Money in")]
+    expense: Annotated[float, Field(0.0, description="Money out")]
+    net: Annotated[float, Field(0.0, description="Income minus expense")]
+    count: Annotated[int, Field(0, description="Number of transactions")]
@@ -1,10 +1,16 @@
-from typing import Annotated, Any
+from typing import Annotated
 
 from pydantic import BaseModel, Field
 
 
-class SuccessResponse(BaseModel):
+class SuccessResponse[T](BaseModel):
+    """Response envelope, parametrized per route (``SuccessResponse[UserResponse]``)
+
+    Routes return it through ``build_success_response``, which serializes it
+    once; the parametrized form only documents the payload in OpenAPI.
+    """
+
     success: Annotated[bool, Field(True, description="Indicate request success")]
     message: Annotated[str | None, Field(None, description="Informational message")]
-    data: Annotated[Any, Field(None, description="Response data payload")]
+    data: Annotated[T | None, Field(None, description="Response data payload")]
     request_id: Annotated[str | None, Field(None, description="Unique request ID")]
@@ -0,0 +1,250 @@
+from datetime import datetime
+from enum import Enum
+from typing import Annotated
+
+from pydantic import ConfigDict, Field, field_validator, model_validator
+
+from app.models.objectid_model import PyObjectID
+from app.models.user_model import BaseModelConfig
+from app.util.clock import as_utc
+
+
+class TransactionType(str, Enum):
+    INCOME = "income"
+    EXPENSE = "expense"
+
+
+class StatementFormat(str, Enum):
+    CSV = "csv"
+    OFX = "ofx"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def _normalise_category(value: str | None):
+    return value.strip().lower() if value is not None else value
+
+
+class TransactionDetails(BaseModelConfig):
+    """What a transaction is, apart from when it happened"""
+
+    amount: Annotated[
+        float, Field(..., gt=0, description="Transaction amount", examples=[42.5])
+    ]
+    type: Annotated[TransactionType, Field(..., description="Income or expense")]
+    category: Annotated[
+        str,
+        Field(
+            "uncategorized",
+            min_length=1,
+            max_length=50,
+            description="Spending category",
+            examples=["groceries"],
+        ),
+    ]
+    description: Annotated[
+        str | None, Field(None, max_length=200, description="Free text description")
+    ]
+    merchant: Annotated[
+        str | None,
+        Field(None, max_length=100, description="Merchant name", examples=["Amazon"]),
+    ]
+    account_id: Annotated[
+        PyObjectID | None, Field(None, description="Account the money moved in")
+    ]
+
+    @field_validator("category")
+    @classmethod
+    def normalise_category(cls, v: str):
+        return _normalise_category(v)
+
+
+class TransactionBase(TransactionDetails):
+    date: Annotated[datetime, Field(..., description="When the transaction happened")]
+
+    @field_validator("date")
+    @classmethod
+    def normalise_date(cls, v: datetime):
+        return as_utc(v)
+
+
+class TransactionCreate(TransactionBase):
+    pass
+
+
+class TransactionUpdate(BaseModelConfig):
+    """Fields to change; an explicit null clears an optional one"""
+
+    amount: Annotated[float | None, Field(None, gt=0, description="Updated amount")]
+    type: Annotated[TransactionType | None, Field(None, description="Updated type")]
+    category: Annotated[
+        str | None,
+        Field(None, min_length=1, max_length=50, description="Updated category"),
+    ]
+    description: Annotated[
+        str | None, Field(None, max_length=200, description="Updated description")
+    ]
+    merchant: Annotated[
+        str | None, Field(None, max_length=100, description="Updated merchant")
+    ]
+    date: Annotated[datetime | None, Field(None, description="Updated date")]
+    account_id: Annotated[PyObjectID | None, Field(None, description="Move account")]
+
+    @field_validator("date")
+    @classmethod
+    def normalise_date(cls, v: datetime | None):
+        return as_utc(v)
+
+    @field_validator("category")
+    @classmethod
+    def normalise_category(cls, v: str | None):
+        # Clearing the category puts the transaction back in the default one
+        return _normalise_category(v) if v is not None else "uncategorized"
+
+    @field_validator("amount", "type", "date")
+    @classmethod
+    def reject_null(cls, v):
+        # Only runs for fields sent; these cannot be cleared
+        if v is None:
+            raise ValueError("must not be null")
+        return v
+
+
+class TransactionResponse(TransactionBase):
+    id: Annotated[
+        PyObjectID, Field(..., alias="_id", description="MongoDB document ID")
+    ]
+    user_id: Annotated[PyObjectID, Field(..., description="Owner of the transaction")]
+    created_at: Annotated[
+        datetime | None, Field(None, description="Creation date (ISO format)")
+    ]
+    updated_at: Annotated[
+        datetime | None, Field(None, description="Last updated timestamp (ISO format)")
+    ]
+
+    # Stored documents carry bookkeeping fields that are not part of the API
+    model_config = ConfigDict(
+        extra="ignore", from_attributes=True, validate_by_name=True
+    )
+
+
+class TransactionPage(BaseModelConfig):
+    items: Annotated[
+        list[TransactionResponse], Field(..., description="Transactions on this page")
+    ]
+    next_cursor: Annotated[
+        str | None,
+        Field(None, description="Opaque cursor for the next page, null on the last"),
+    ]
+
+
+class TransactionSearchHit(TransactionResponse):
+    score: Annotated[float, Field(..., description="Relevance to the query")]
+
+
+class TransactionSearchPage(BaseModelConfig):
+    items: Annotated[
+        list[TransactionSearchHit], Field(..., description="Best matches first")
+    ]
+    next_cursor: Annotated[
+        str | None,
+        Field(None, description="Opaque cursor for the next page, null on the last"),
+    ]
+
+
+class TransactionImportRow(BaseModelConfig):
+    """A statement line parsed from an uploaded CSV or OFX file"""
+
+    date: Annotated[datetime, Field(..., description="When the transaction happened")]
+    amount: Annotated[
+        float, Field(..., description="Signed amount, negative for money going out")
+    ]
+    type: Annotated[
+        TransactionType | None, Field(None, description="Derived from sign if absent")
+    ]
+    category: Annotated[
+        str | None,
+        Field("uncategorized", max_length=50, description="Spending category"),
+    ]
+    description: Annotated[str | None, Field(None, max_length=200)]
+    merchant: Annotated[str | None, Field(None, max_length=100)]
+    external_id: Annotated[
+        str | None, Field(None, max_length=100, description="Bank id (OFX FITID)")
+    ]
+
+    # Statement files routinely carry columns we do not store
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    @field_validator(
+        "type", "category", "description", "merchant", "external_id", mode="before"
+    )
+    @classmethod
+    def blank_as_missing(cls, v):
+        return None if isinstance(v, str) and not v.strip() else v
+
+    @field_validator("type", mode="before")
+    @classmethod
+    def normalise_type(cls, v):
+        if isinstance(v, str):
+            v = v.strip().lower()
+            return {"credit": "income", "debit": "expense"}.get(v, v)
+        return v
+
+    @field_validator("date")
+    @classmethod
+    def normalise_date(cls, v: datetime):
+        return as_utc(v)
+
+    @field_validator("category")
+    @classmethod
+    def normalise_category(cls, v: str | None):
+        return _normalise_category(v) if v is not None else "uncategorized"
+
+    @model_validator(mode="after")
+    def apply_sign(self):
+        if self.amount == 0:
+            raise ValueError("amount must not be zero")
+        if self.type is None:
+            self.type = (
+                TransactionType.INCOME if self.amount > 0 else TransactionType.EXPENSE
+            )
+        self.amount = abs(self.amount)
+        return self
+
+
+class ImportRowError(BaseModelConfig):
+    row: Annotated[int, Field(..., description="1-based data row in the file")]
+    message: Annotated[str, Field(..., description="Why the row was rejected")]
+
+
+class ImportBatchResult(BaseModelConfig):
+    batch: Annotated[int, Field(..., description="1-based batch number")]
+    rows: Annotated[int, Field(..., description="Valid rows sent in this batch")]
+    inserted: Annotated[int, Field(..., description="Rows written")]
+    duplicates: Annotated[int, Field(..., description="Rows already imported")]
+    failed: Annotated[int, Field(..., description="Rows the database rejected")]
+
+
+class ImportSummary(BaseModelConfig):
+    total_rows: Annotated[int, Field(0, description="Data rows read from the file")]
+    inserted: Annotated[int, Field(0, description="Transactions created")]
+    duplicates: Annotated[int, Field(0, description="Rows skipped as duplicates")]
+    invalid: Annotated[int, Field(0, description="Rows rejected by validation")]
+    categorized: Annotated[
+        int, Field(0, description="Transactions created with a category from rules")
+    ]
+    completed: Annotated[
+        bool, Field(True, description="False if parsing stopped before the end")
+    ]
+    batches: Annotated[
+        list[ImportBatchResult], Field(default_factory=list, description="Progress")
+    ]
+    errors: Annotated[
+        list[ImportRowError], Field(default_factory=list, description="Row errors")
+    ]
+    errors_truncated: Annotated[
+        bool, Field(False, description="True if more errors occurred than listed")
+    ]
@@ -93,11 +93,29 @@ class UserResponse(BaseModelConfig):
     ]
 
     model_config = ConfigDict(
-        extra="forbid", from_attributes=True, str_strip_whitespace=True
+        extra="forbid",
+        from_attributes=True,
+        str_strip_whitespace=True,
+        validate_by_name=True,
     )
 
 
 class TokenResponse(BaseModelConfig):
     access_token: Annotated[str, Field(..., description="JWT access token")]
+    refresh_token: Annotated[
+        str,
+        Field(
+            ...,
+            description="Single-use token exchanged for new tokens at "
+            "/users/token/refresh",
+        ),
+    ]
     token_type: Annotated[str, Field("bearer", description="Token type")]
     user: Annotated[UserResponse, Field(..., description="User details")]
+
+
+class RefreshTokenRequest(BaseModelConfig):
+    refresh_token: Annotated[
+        str,
+        Field(..., max_length=128, description="Refresh token from the last login"),
+    ]
@@ -0,0 +1,67 @@
+"""Serve the API, from one worker process or several.
+
+Run with ``python -m app.serve [--workers N]``; SERVER_WORKERS defaults to
+one. With more, a supervisor binds the socket
+and spawns the workers, each a fresh interpreter that imports the app and
+opens its own Mongo pool, caches, hashing pool and log queue in its lifespan;
+nothing process-bound is created before the workers start. Dead workers are
+replaced. On SIGTERM or SIGINT every worker stops accepting connections,
+gives in-flight requests up to SHUTDOWN_GRACE_SECONDS to finish, then runs the
+lifespan shutdown that closes its Mongo client.
+
+Servers that fork workers from a parent that already imported the app (such
+as gunicorn with ``--preload``) are covered too: the modules holding clients,
+pools, caches, metric locks and the log listener reset them after a fork.
+
+Each worker keeps its own in-memory state, nothing of which is shared:
+
+- the user cache: an update or delete evicts the user only in the worker
+  that made it, so others serve the old profile, ETag included, and keep
+  authenticating a deleted user for up to USER_CACHE_TTL_SECONDS;
+- the login throttle: the effective limits are the configured ones times
+  the number of workers;
+- search indexes, each bounded by SEARCH_INDEX_MAX_DOCUMENTS;
+- /metrics and /health/ready, which describe whichever worker answers.
+
+Run several workers only where that is acceptable, for instance with
+USER_CACHE_TTL_SECONDS lowered and the login limits divided accordingly.
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.SERVER_WORKERS,
+        help="Worker processes (see the module docs before using more than one)",
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Read by every spawned worker when it loads its settings
+        os.environ["LOG_FILE_PER_PROCESS"] = "true"
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        timeout_graceful_shutdown=settings.SHUTDOWN_GRACE_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+from collections.abc import Iterable
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import Depends
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+from app.core.config import settings
+from app.core.exceptions import ExchangeRateNotFoundError, ResourceNotFoundError
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.account_model import (
+    AccountBalance,
+    AccountCreate,
+    AccountResponse,
+    AccountUpdate,
+)
+from app.models.transaction_model import TransactionType
+from app.services.fx_service import get_fx_rates
+from app.util.cache import TTLCache
+from app.util.clock import as_utc, month_start, utc_now
+
+# An account's currency never changes, so it is safe to keep for long
+_currencies = TTLCache("account_currency", max_size=100_000, ttl_seconds=86_400)
+
+
+def signed_amount(transaction: dict) -> float:
+    """Effect of a transaction on its account balance"""
+    if transaction["type"] == TransactionType.INCOME:
+        return transaction["amount"]
+    return -transaction["amount"]
+
+
+class AccountService:
+    """Accounts with a stored balance kept in step with their transactions.
+
+    Balances are moved with ``$inc`` in the same Mongo transaction that writes
+    the transaction itself. The same write upserts the net change of the
+    transaction's month in ``account_snapshots``, so a point-in-time balance
+    reads one small document per earlier month and the transactions of a
+    single month, however long the history.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._collection = mongo_client.get_collection("accounts")
+        self._snapshots = mongo_client.get_collection("account_snapshots")
+        self._transactions = mongo_client.get_collection("transactions")
+
+    async def create(self, user_id: str, account_data: AccountCreate):
+        if account_data.currency != settings.FX_HOME_CURRENCY:
+            # Its transactions could not be converted for reports otherwise
+            if account_data.currency not in await get_fx_rates().table():
+                raise ExchangeRateNotFoundError(account_data.currency)
+        account = account_data.model_dump()
+        account["user_id"] = ObjectId(user_id)
+        account["balance"] = account["opening_balance"]
+        account["created_at"] = account["updated_at"] = utc_now()
+        await self._collection.insert_one(account)
+        return self._build_account_response(account)
+
+    async def get_by_id(self, user_id: str, id: str) -> AccountResponse:
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Account")
+        account = await self._collection.find_one(
+            {"_id": ObjectId(id), "user_id": ObjectId(user_id)}
+        )
+        if not account:
+            raise ResourceNotFoundError("Account")
+        return self._build_account_response(account)
+
+    async def list_by_user(self, user_id: str) -> list[AccountResponse]:
+        accounts = (
+            await self._collection.find({"user_id": ObjectId(user_id)})
+            .sort("created_at", ASCENDING)
+            .to_list(None)
+        )
+        return [self._build_account_response(account) for account in accounts]
+
+    async def update(self, user_id: str, id: str, updates: AccountUpdate):
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Account")
+        update_data = updates.model_dump(exclude_unset=True, exclude_none=True)
+        update_data["updated_at"] = utc_now()
+        account = await self._collection.find_one_and_update(
+            {"_id": ObjectId(id), "user_id": ObjectId(user_id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not account:
+            raise ResourceNotFoundError("Account")
+        return self._build_account_response(account)
+
+    async def ensure_owned(self, user_id: ObjectId, account_id: ObjectId):
+        account = await self._collection.find_one(
+            {"_id": account_id, "user_id": user_id}, {"_id": 1}
+        )
+        if not account:
+            raise ResourceNotFoundError("Account")
+
+    async def currencies(
+        self, account_ids: Iterable[ObjectId], session=None
+    ) -> dict[ObjectId, str]:
+        """Currency of each existing account, in one query for those not cached"""
+        found, missing = {}, []
+        for account_id in account_ids:
+            currency = _currencies.get(account_id)
+            if currency is None:
+                missing.append(account_id)
+            else:
+                found[account_id] = currency
+        if missing:
+            async for account in self._collection.find(
+                {"_id": {"$in": missing}}, {"currency": 1}, session=session
+            ):
+                found[account["_id"]] = account["currency"]
+                _currencies.set(account["_id"], account["currency"])
+        return found
+
+    async def apply(
+        self, user_id: ObjectId, changes: Iterable[tuple[dict, int]], session=None
+    ):
+        """Move account balances and monthly snapshots for transaction changes.
+
+        ``changes`` are ``(transaction, sign)`` pairs as for the rollups.
+        Raises ResourceNotFoundError if an account is not the user's, which
+        aborts the surrounding Mongo transaction.
+        """
+        balances: dict[ObjectId, float] = {}
+        snapshots: dict[tuple[ObjectId, datetime], float] = {}
+        for transaction, sign in changes:
+            account_id = transaction.get("account_id")
+            if account_id is None:
+                continue
+            delta = sign * signed_amount(transaction)
+            balances[account_id] = balances.get(account_id, 0.0) + delta
+            key = (account_id, month_start(transaction["date"]))
+            snapshots[key] = snapshots.get(key, 0.0) + delta
+
+        for account_id, delta in balances.items():
+            result = await self._collection.update_one(
+                {"_id": account_id, "user_id": user_id},
+                {"$inc": {"balance": delta}},
+                session=session,
+            )
+            if result.matched_count == 0:
+                raise ResourceNotFoundError("Account")
+        # Upserted with $inc, so the first write of a month creates its
+        # snapshot and concurrent writers never overwrite each other
+        updates = [
+            UpdateOne(
+                {"account_id": account_id, "period_start": period_start},
+                {"$inc": {"net": delta}},
+                upsert=True,
+            )
+            for (account_id, period_start), delta in snapshots.items()
+            if delta
+        ]
+        if updates:
+            await self._snapshots.bulk_write(updates, ordered=False, session=session)
+
+    async def balance_at(self, user_id: str, id: str, at: datetime) -> AccountBalance:
+        """Balance at ``at``: the net change of every earlier month plus the
+        activity of the month ``at`` falls in"""
+        account = await self.get_by_id(user_id, id)
+        at = as_utc(at)
+        period_start = month_start(at)
+        balance = account.opening_balance
+        async for group in self._snapshots.aggregate(
+            [
+                {
+                    "$match": {
+                        "account_id": account.id,
+                        "period_start": {"$lt": period_start},
+                    }
+                },
+                {"$group": {"_id": None, "net": {"$sum": "$net"}}},
+            ]
+        ):
+            balance += group["net"]
+        window = {"$gte": period_start, "$lte": at}
+        async for group in self._transactions.aggregate(
+            [
+                {"$match": {"account_id": account.id, "date": window}},
+                {
+                    "$group": {
+                        "_id": "$type",
+                        "total": {"$sum": "$amount"},
+                    }
+                },
+            ]
+        ):
+            sign = 1 if group["_id"] == TransactionType.INCOME else -1
+            balance += sign * group["total"]
+        home_balance = balance
+        if account.currency != settings.FX_HOME_CURRENCY:
+            table = await get_fx_rates().table()
+            home_balance = balance * table.rate(account.currency, at)
+        return AccountBalance(
+            account_id=account.id,
+            at=at,
+            balance=balance,
+            currency=account.currency,
+            home_balance=home_balance,
+        )
+
+    def _build_account_response(self, account: dict):
+        return AccountResponse.model_validate(account)
+
+
+def get_account_service(mongo_client: MongoDBClient = Depends(get_mongodb_client)):
+    return AccountService(mongo_client)
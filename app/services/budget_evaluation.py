@@ -0,0 +1,208 @@
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.db.mongodb import MongoDBClient
+from app.models.budget_model import BudgetAlertKind
+from app.util.clock import next_month_start, utc_now
+
+_BUDGET_PROJECTION = {"user_id": 1, "category": 1, "limit": 1}
+_ROLLUP_PROJECTION = {"_id": 0, "user_id": 1, "category": 1, "expense": 1}
+_DUPLICATE_KEY = 11000
+
+
+@dataclass
+class ChunkEvaluation:
+    ratio: np.ndarray
+    projected: np.ndarray
+    # How many thresholds spending so far has crossed (0 for none)
+    level: np.ndarray
+    projected_over: np.ndarray
+
+
+def evaluate_chunk(
+    spent: np.ndarray, limits: np.ndarray, elapsed: float, thresholds: np.ndarray
+) -> ChunkEvaluation:
+    """Evaluate a chunk of budget lines at once.
+
+    ``elapsed`` is the share of the month that has passed; spending is
+    projected to month end linearly. ``thresholds`` must be sorted.
+    """
+    ratio = spent / limits
+    projected = spent / elapsed
+    return ChunkEvaluation(
+        ratio=ratio,
+        projected=projected,
+        level=np.searchsorted(thresholds, ratio, side="right"),
+        projected_over=(projected >= limits) & (spent < limits),
+    )
+
+
+def elapsed_share(month_start: datetime, now: datetime) -> float:
+    """Share of the month elapsed at ``now``, at least one day's worth"""
+    month_end = next_month_start(month_start)
+    length = month_end - month_start
+    elapsed = min(max(now - month_start, timedelta(days=1)), length)
+    return elapsed / length
+
+
+@dataclass
+class BudgetEvaluationSummary:
+    budgets: int = 0
+    chunks: int = 0
+    alerts: int = 0
+
+
+class BudgetEvaluator:
+    """Evaluates every budget for a month and raises alerts in bulk.
+
+    Budgets are streamed in ``chunk_size`` pieces ordered by user, so a chunk
+    needs one rollup query for its users and memory stays bounded by the
+    chunk, not by the number of budgets. Alerts are upserted on
+    (budget, month, kind, threshold): re-running the job never duplicates
+    them and each threshold alerts once per month.
+    """
+
+    def __init__(
+        self,
+        mongo_client: MongoDBClient,
+        thresholds: list[float] | None = None,
+        chunk_size: int | None = None,
+    ):
+        self._budgets = mongo_client.get_collection("budgets")
+        self._rollups = mongo_client.get_collection("category_rollups")
+        self._alerts = mongo_client.get_collection("budget_alerts")
+        self._thresholds = np.array(
+            sorted(thresholds or settings.BUDGET_ALERT_THRESHOLDS), dtype=float
+        )
+        self._chunk_size = chunk_size or settings.BUDGET_EVALUATION_CHUNK_SIZE
+
+    async def evaluate(
+        self, month: str, now: datetime | None = None
+    ) -> BudgetEvaluationSummary:
+        now = now or utc_now()
+        elapsed = elapsed_share(
+            datetime.strptime(month, "%Y-%m").replace(tzinfo=UTC), now
+        )
+        summary = BudgetEvaluationSummary()
+        start = time.perf_counter()
+        cursor = (
+            self._budgets.find({}, _BUDGET_PROJECTION)
+            .sort([("user_id", ASCENDING), ("category", ASCENDING)])
+            .batch_size(self._chunk_size)
+        )
+        chunk: list[dict] = []
+        try:
+            async for budget in cursor:
+                chunk.append(budget)
+                if len(chunk) == self._chunk_size:
+                    await self._evaluate(summary, month, chunk, elapsed, now)
+                    chunk = []
+            if chunk:
+                await self._evaluate(summary, month, chunk, elapsed, now)
+        finally:
+            await cursor.close()
+        logger.info(
+            f"Budgets evaluated: month={month} budgets={summary.budgets} "
+            f"alerts={summary.alerts} in {time.perf_counter() - start:.1f}s"
+        )
+        return summary
+
+    async def _evaluate(
+        self,
+        summary: BudgetEvaluationSummary,
+        month: str,
+        chunk: list[dict],
+        elapsed: float,
+        now: datetime,
+    ):
+        users = list(dict.fromkeys(budget["user_id"] for budget in chunk))
+        totals = {
+            (rollup["user_id"], rollup["category"]): rollup["expense"]
+            async for rollup in self._rollups.find(
+                {"month": month, "user_id": {"$in": users}}, _ROLLUP_PROJECTION
+            )
+        }
+        spent = np.fromiter(
+            (totals.get((b["user_id"], b["category"]), 0.0) for b in chunk),
+            dtype=float,
+            count=len(chunk),
+        )
+        limits = np.fromiter((b["limit"] for b in chunk), dtype=float, count=len(chunk))
+        evaluation = evaluate_chunk(spent, limits, elapsed, self._thresholds)
+
+        operations = list(
+            self._alert_operations(month, chunk, spent, limits, evaluation, now)
+        )
+        summary.budgets += len(chunk)
+        summary.chunks += 1
+        if not operations:
+            return
+        try:
+            result = await self._alerts.bulk_write(operations, ordered=False)
+            summary.alerts += result.upserted_count
+        except BulkWriteError as exc:
+            # A concurrent run inserted the same alert first
+            if any(
+                error["code"] != _DUPLICATE_KEY for error in exc.details["writeErrors"]
+            ):
+                raise
+            summary.alerts += exc.details["nUpserted"]
+        logger.debug(
+            f"Budget chunk {summary.chunks}: budgets={len(chunk)} "
+            f"alert_writes={len(operations)}"
+        )
+
+    def _alert_operations(
+        self,
+        month: str,
+        chunk: list[dict],
+        spent: np.ndarray,
+        limits: np.ndarray,
+        evaluation: ChunkEvaluation,
+        now: datetime,
+    ) -> Iterator[UpdateOne]:
+        # Only the flagged lines leave the arrays; the highest crossed
+        # threshold is reported when spending jumps past several at once
+        crossed = np.flatnonzero(evaluation.level)
+        thresholds = self._thresholds[evaluation.level[crossed] - 1]
+        over = np.flatnonzero(evaluation.projected_over)
+        flagged = [
+            (BudgetAlertKind.THRESHOLD, crossed, thresholds),
+            (BudgetAlertKind.PROJECTED, over, np.ones(len(over))),
+        ]
+        for kind, indexes, levels in flagged:
+            for i, threshold, used, limit, projected in zip(
+                indexes.tolist(),
+                levels.tolist(),
+                spent[indexes].tolist(),
+                limits[indexes].tolist(),
+                evaluation.projected[indexes].tolist(),
+            ):
+                budget = chunk[i]
+                yield UpdateOne(
+                    {
+                        "budget_id": budget["_id"],
+                        "month": month,
+                        "kind": kind.value,
+                        "threshold": threshold,
+                    },
+                    {
+                        "$setOnInsert": {
+                            "user_id": budget["user_id"],
+                            "category": budget["category"],
+                            "spent": used,
+                            "limit": limit,
+                            "projected_spend": projected,
+                            "created_at": now,
+                        }
+                    },
+                    upsert=True,
+                )
@@ -0,0 +1,92 @@
+from bson import ObjectId
+from fastapi import Depends
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.exceptions import DuplicateResourceError, ResourceNotFoundError
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.db.versions import Versions
+from app.models.budget_model import (
+    BudgetAlertResponse,
+    BudgetCreate,
+    BudgetResponse,
+    BudgetUpdate,
+)
+from app.util.clock import utc_now
+
+
+class BudgetService:
+    """Monthly spending limits per category and the alerts raised on them.
+
+    Alerts are written by the budget evaluation job, not by requests. Every
+    budget write bumps the user's ``budgets`` version.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._collection = mongo_client.get_collection("budgets")
+        self._versions = Versions(mongo_client, "budgets")
+        self._alerts = mongo_client.get_collection("budget_alerts")
+
+    async def create(self, user_id: str, budget_data: BudgetCreate):
+        budget = budget_data.model_dump()
+        budget["user_id"] = ObjectId(user_id)
+        budget["created_at"] = budget["updated_at"] = utc_now()
+        # The unique index on (user_id, category) rejects a second budget
+        try:
+            await self._collection.insert_one(budget)
+        except DuplicateKeyError:
+            raise DuplicateResourceError("Budget for this category")
+        await self._versions.bump(budget["user_id"])
+        return BudgetResponse(**budget)
+
+    async def version(self, user_id: str) -> int:
+        """Changes whenever the user's budgets do; read it before the budgets"""
+        return await self._versions.get(ObjectId(user_id))
+
+    async def list_by_user(self, user_id: str) -> list[BudgetResponse]:
+        budgets = (
+            await self._collection.find({"user_id": ObjectId(user_id)})
+            .sort("category", ASCENDING)
+            .to_list(None)
+        )
+        return [BudgetResponse(**budget) for budget in budgets]
+
+    async def update(self, user_id: str, id: str, updates: BudgetUpdate):
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Budget")
+        budget = await self._collection.find_one_and_update(
+            {"_id": ObjectId(id), "user_id": ObjectId(user_id)},
+            {"$set": {"limit": updates.limit, "updated_at": utc_now()}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not budget:
+            raise ResourceNotFoundError("Budget")
+        await self._versions.bump(budget["user_id"])
+        return BudgetResponse(**budget)
+
+    async def delete(self, user_id: str, id: str):
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Budget")
+        result = await self._collection.delete_one(
+            {"_id": ObjectId(id), "user_id": ObjectId(user_id)}
+        )
+        if result.deleted_count == 0:
+            raise ResourceNotFoundError("Budget")
+        await self._versions.bump(ObjectId(user_id))
+
+    async def list_alerts(
+        self, user_id: str, month: str | None = None
+    ) -> list[BudgetAlertResponse]:
+        query: dict = {"user_id": ObjectId(user_id)}
+        if month is not None:
+            query["month"] = month
+        alerts = (
+            await self._alerts.find(query)
+            .sort([("month", DESCENDING), ("created_at", DESCENDING)])
+            .to_list(None)
+        )
+        return [BudgetAlertResponse(**alert) for alert in alerts]
+
+
+def get_budget_service(mongo_client: MongoDBClient = Depends(get_mongodb_client)):
+    return BudgetService(mongo_client)
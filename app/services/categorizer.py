@@ -0,0 +1,209 @@
+import os
+import time
+from collections import deque
+from collections.abc import Iterable
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.db.versions import Versions
+from app.models.category_rule_model import RuleField
+from app.util.cache import TTLCache
+
+UNCATEGORIZED = "uncategorized"
+# Owner of the version of the rules that apply to every user
+GLOBAL_RULES = "global"
+_RULE_PROJECTION = {"_id": 0, "pattern": 1, "category": 1, "field": 1, "user_id": 1}
+
+
+class _Automaton:
+    """Aho-Corasick matcher over many patterns at once.
+
+    Patterns share a trie, and each state's failure link points at the
+    longest proper suffix of its text that is also in the trie. A scan
+    takes one transition per character, however many patterns there are.
+    Every state carries the best priority among the patterns ending there
+    or on its failure chain, so a scan only has to keep the highest seen.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, int]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._best = [0]
+        for pattern, priority in patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._best.append(0)
+                state = next_state
+            self._best[state] = max(self._best[state], priority)
+
+        self._fail = [0] * len(self._goto)
+        # Breadth first, so a state's failure target is always done before it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._best[next_state] = max(
+                    self._best[next_state], self._best[self._fail[next_state]]
+                )
+
+    def __len__(self):
+        return len(self._goto)
+
+    def best(self, text: str) -> int:
+        """Highest priority of the patterns found in ``text``, 0 if none"""
+        goto, fail, best = self._goto, self._fail, self._best
+        state = found = 0
+        for char in text:
+            while True:
+                next_state = goto[state].get(char)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            if best[state] > found:
+                found = best[state]
+        return found
+
+
+class Categorizer:
+    """A user's category rules compiled into one matcher per text field.
+
+    A rule matches when its pattern occurs, in any case, in the merchant or
+    description it targets. When several match, the user's own rules win
+    over global ones, then the longest pattern, then the oldest rule.
+    """
+
+    def __init__(self, rules: list[dict]):
+        ranked = sorted(
+            enumerate(rules),
+            key=lambda item: (
+                item[1].get("user_id") is None,
+                -len(item[1]["pattern"]),
+                item[0],
+            ),
+        )
+        # Priority 0 means no match, so the best rule gets len(rules)
+        self._categories = [UNCATEGORIZED] + [
+            rule["category"] for _, rule in reversed(ranked)
+        ]
+        merchant, description = [], []
+        for priority, (_, rule) in enumerate(reversed(ranked), 1):
+            field = rule.get("field", RuleField.ANY)
+            if field != RuleField.DESCRIPTION:
+                merchant.append((rule["pattern"], priority))
+            if field != RuleField.MERCHANT:
+                description.append((rule["pattern"], priority))
+        self._merchant = _Automaton(merchant)
+        self._description = _Automaton(description)
+        self.rules = len(rules)
+
+    def match(self, merchant: str | None, description: str | None) -> str | None:
+        priority = 0
+        if merchant:
+            priority = self._merchant.best(" ".join(merchant.lower().split()))
+        if description:
+            priority = max(
+                priority,
+                self._description.best(" ".join(description.lower().split())),
+            )
+        return self._categories[priority] if priority else None
+
+    def categorize(self, transactions: list[dict]) -> list[int]:
+        """Set the category of uncategorized transactions a rule matches;
+        the positions of those it changed"""
+        changed = []
+        if not self.rules:
+            return changed
+        for position, transaction in enumerate(transactions):
+            if transaction.get("category", UNCATEGORIZED) != UNCATEGORIZED:
+                continue
+            category = self.match(
+                transaction.get("merchant"), transaction.get("description")
+            )
+            if category is not None:
+                transaction["category"] = category
+                changed.append(position)
+        return changed
+
+
+class CategoryRules:
+    """Compiled categorizers per user, rebuilt when their rules change.
+
+    Every rule write bumps the ``category_rules`` version, the user's or
+    the GLOBAL_RULES one. A cached categorizer is reused while both versions
+    it was built from are current, so an edit made through any worker is
+    seen by the next import everywhere, at the cost of one small read.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._mongo_client = mongo_client
+        self._versions = rule_versions(mongo_client)
+        self._cache = TTLCache(
+            "category_rules",
+            settings.CATEGORY_RULES_CACHE_MAX_SIZE,
+            settings.CATEGORY_RULES_CACHE_TTL_SECONDS,
+        )
+
+    async def categorizer(self, user_id: ObjectId) -> Categorizer:
+        versions = await self._versions.get_many([user_id, GLOBAL_RULES])
+        key = (versions[user_id], versions[GLOBAL_RULES])
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        start = time.perf_counter()
+        rules = (
+            await self._rules.find(
+                {"user_id": {"$in": [user_id, None]}}, _RULE_PROJECTION
+            )
+            .sort("created_at", 1)
+            .to_list(None)
+        )
+        categorizer = Categorizer(rules)
+        self._cache.set(user_id, (key, categorizer))
+        logger.debug(
+            f"Category rules compiled: user={user_id} rules={len(rules)} "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return categorizer
+
+    @property
+    def _rules(self):
+        return self._mongo_client.get_collection("category_rules")
+
+
+def rule_versions(mongo_client: MongoDBClient) -> Versions:
+    """Bumped, per user or for GLOBAL_RULES, on every category rule write"""
+    return Versions(mongo_client, "category_rules")
+
+
+_category_rules = None
+
+
+def get_category_rules():
+    global _category_rules
+    if _category_rules is None:
+        _category_rules = CategoryRules(get_mongodb_client())
+    return _category_rules
+
+
+def _reset_after_fork():
+    global _category_rules
+    _category_rules = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
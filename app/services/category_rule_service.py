@@ -0,0 +1,93 @@
+from bson import ObjectId
+from fastapi import Depends
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.exceptions import (
+    DuplicateResourceError,
+    ResourceNotFoundError,
+    ValidationError,
+)
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.category_rule_model import CategoryRuleCreate, CategoryRuleResponse
+from app.services.categorizer import rule_versions
+from app.util.clock import utc_now
+
+
+class CategoryRuleService:
+    """A user's rules for categorizing imported transactions.
+
+    Every write bumps the user's rule version, which makes each worker
+    recompile the user's categorizer before its next import.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._versions = rule_versions(mongo_client)
+        self._collection = mongo_client.get_collection("category_rules")
+        self._max_rules = settings.CATEGORY_RULES_MAX_PER_USER
+
+    async def create(self, user_id: str, rule_data: CategoryRuleCreate):
+        owner = ObjectId(user_id)
+        if await self._collection.count_documents({"user_id": owner}) >= (
+            self._max_rules
+        ):
+            raise ValidationError(
+                {"details": f"At most {self._max_rules} category rules per user"}
+            )
+        rule = rule_data.model_dump()
+        rule["user_id"] = owner
+        rule["created_at"] = rule["updated_at"] = utc_now()
+        # The unique index on (user_id, field, pattern) rejects a second rule
+        try:
+            await self._collection.insert_one(rule)
+        except DuplicateKeyError:
+            raise DuplicateResourceError("Rule for this pattern")
+        await self._versions.bump(owner)
+        return CategoryRuleResponse(**rule)
+
+    async def version(self, user_id: str) -> int:
+        """Changes whenever the user's rules do; read it before the rules"""
+        return await self._versions.get(ObjectId(user_id))
+
+    async def list_by_user(self, user_id: str) -> list[CategoryRuleResponse]:
+        rules = (
+            await self._collection.find({"user_id": ObjectId(user_id)})
+            .sort("created_at", ASCENDING)
+            .to_list(None)
+        )
+        return [CategoryRuleResponse(**rule) for rule in rules]
+
+    async def update(self, user_id: str, id: str, rule_data: CategoryRuleCreate):
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Category rule")
+        owner = ObjectId(user_id)
+        try:
+            rule = await self._collection.find_one_and_update(
+                {"_id": ObjectId(id), "user_id": owner},
+                {"$set": rule_data.model_dump() | {"updated_at": utc_now()}},
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            raise DuplicateResourceError("Rule for this pattern")
+        if not rule:
+            raise ResourceNotFoundError("Category rule")
+        await self._versions.bump(owner)
+        return CategoryRuleResponse(**rule)
+
+    async def delete(self, user_id: str, id: str):
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Category rule")
+        owner = ObjectId(user_id)
+        result = await self._collection.delete_one(
+            {"_id": ObjectId(id), "user_id": owner}
+        )
+        if result.deleted_count == 0:
+            raise ResourceNotFoundError("Category rule")
+        await self._versions.bump(owner)
+
+
+def get_category_rule_service(
+    mongo_client: MongoDBClient = Depends(get_mongodb_client),
+):
+    return CategoryRuleService(mongo_client)
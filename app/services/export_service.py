@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import Depends
+from pymongo import ASCENDING
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.transaction_model import ExportFormat
+
+EXPORT_FIELDS = (
+    "id",
+    "date",
+    "type",
+    "amount",
+    "category",
+    "description",
+    "merchant",
+    "account_id",
+)
+_PROJECTION = {field: 1 for field in EXPORT_FIELDS if field != "id"}
+# Oldest first; the (user_id, date desc, _id desc) index is walked backwards
+_EXPORT_SORT = [("date", ASCENDING), ("_id", ASCENDING)]
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _export_row(transaction: dict) -> dict:
+    account_id = transaction.get("account_id")
+    return {
+        "id": str(transaction["_id"]),
+        "date": transaction["date"].isoformat(),
+        "type": transaction["type"],
+        "amount": transaction["amount"],
+        "category": transaction["category"],
+        "description": transaction.get("description"),
+        "merchant": transaction.get("merchant"),
+        "account_id": str(account_id) if account_id is not None else None,
+    }
+
+
+async def encode_export(
+    transactions: AsyncIterable[dict],
+    format: ExportFormat = ExportFormat.CSV,
+    compress: bool = False,
+    chunk_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Encode documents as CSV or NDJSON, yielding chunks of ``chunk_size``.
+
+    Only one chunk of encoded text is held at a time, so memory does not grow
+    with the number of documents. With ``compress`` the chunks form a single
+    gzip stream.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+    buffer = io.StringIO()
+    writer = None
+    if format == ExportFormat.CSV:
+        writer = csv.DictWriter(buffer, EXPORT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    async for transaction in transactions:
+        row = _export_row(transaction)
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, separators=(",", ":")))
+            buffer.write("\n")
+        if buffer.tell() >= chunk_size:
+            data = drain()
+            # Deflate may hold small inputs back; only send what it emitted
+            if data:
+                yield data
+
+    data = drain()
+    if compressor:
+        data += compressor.flush()
+    if data:
+        yield data
+
+
+class TransactionExportService:
+    """Streams a user's full transaction history straight off a Mongo cursor"""
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._collection = mongo_client.get_collection("transactions")
+        self._batch_size = settings.EXPORT_BATCH_SIZE
+
+    async def export(
+        self,
+        user_id: str,
+        format: ExportFormat = ExportFormat.CSV,
+        compress: bool = False,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        query: dict = {"user_id": ObjectId(user_id)}
+        date_range = {}
+        if start_date is not None:
+            date_range["$gte"] = start_date
+        if end_date is not None:
+            date_range["$lt"] = end_date
+        if date_range:
+            query["date"] = date_range
+
+        cursor = (
+            self._collection.find(query, _PROJECTION)
+            .sort(_EXPORT_SORT)
+            .batch_size(self._batch_size)
+        )
+        exported = 0
+
+        async def counted():
+            nonlocal exported
+            async for transaction in cursor:
+                exported += 1
+                yield transaction
+
+        try:
+            async for chunk in encode_export(counted(), format, compress):
+                yield chunk
+        finally:
+            # Also reached when the client disconnects mid-download
+            await cursor.close()
+            logger.info(
+                f"Export finished: user={user_id} format={format.value} rows={exported}"
+            )
+
+
+def get_export_service(mongo_client: MongoDBClient = Depends(get_mongodb_client)):
+    return TransactionExportService(mongo_client)
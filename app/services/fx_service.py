@@ -0,0 +1,204 @@
+import asyncio
+import csv
+import os
+import time
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date, datetime
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.exceptions import ExchangeRateNotFoundError
+from app.core.logging_config import logger
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+
+# Retry delay after a failed refresh while the previous table keeps serving
+_REFRESH_RETRY_SECONDS = 60.0
+
+
+def day_number(value: date | datetime) -> int:
+    """Proleptic ordinal of the day (always positive), in UTC for datetimes"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(UTC)
+        value = value.date()
+    return value.toordinal()
+
+
+class FxRateTable:
+    """Exchange rates to the home currency, indexed by currency and date.
+
+    Every rate is one sorted int64 key, ``currency code << 32 | day number``,
+    next to a float64 rate, so the whole table is two flat arrays and any
+    lookup is a binary search. A date takes the rate in effect on it: the
+    latest one on or before, or the earliest known for dates before that.
+    The home currency converts at 1.
+    """
+
+    def __init__(self, home: str, rows: Iterable[tuple[str, int, float]]):
+        self.home = home
+        currencies, days, rates = [], [], []
+        for currency, day, rate in rows:
+            currencies.append(currency)
+            days.append(day)
+            rates.append(rate)
+        self._codes = {
+            currency: code for code, currency in enumerate(sorted({home, *currencies}))
+        }
+        codes = np.fromiter(
+            (self._codes[c] for c in currencies), dtype=np.int64, count=len(currencies)
+        )
+        keys = (codes << 32) | np.asarray(days, dtype=np.int64)
+        rates = np.asarray(rates, dtype=np.float64)
+        # The home currency gets a single rate of 1 from the start of time
+        home_key = np.int64(self._codes[home]) << 32
+        keys = np.append(keys[codes != self._codes[home]], home_key)
+        rates = np.append(rates[codes != self._codes[home]], 1.0)
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._rates = keys[order], rates[order]
+        # Index of each currency's earliest rate, by code
+        self._first = np.searchsorted(
+            self._keys, np.arange(len(self._codes), dtype=np.int64) << 32
+        )
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, currency: str):
+        return currency in self._codes
+
+    @property
+    def currencies(self) -> list[str]:
+        return list(self._codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self._keys.nbytes + self._rates.nbytes
+
+    def rate(self, currency: str, on: date | datetime) -> float:
+        """Home currency units per unit of ``currency`` on a date"""
+        code = self._code(currency)
+        position = np.searchsorted(self._keys, (code << 32) | day_number(on), "right")
+        return float(self._rates[max(position - 1, self._first[code])])
+
+    def to_home(
+        self,
+        amounts: Sequence[float] | np.ndarray,
+        currencies: Sequence[str] | np.ndarray,
+        days: Sequence[int] | np.ndarray,
+    ) -> np.ndarray:
+        """Convert amounts dated by day number to the home currency in one pass"""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if isinstance(currencies, np.ndarray):
+            currencies = currencies.tolist()
+        # A dict lookup per amount is several times faster than np.unique
+        # on an array of strings
+        try:
+            codes = np.fromiter(
+                map(self._codes.__getitem__, currencies), np.int64, len(currencies)
+            )
+        except KeyError as exc:
+            raise ExchangeRateNotFoundError(exc.args[0]) from None
+        keys = (codes << 32) | np.asarray(days, dtype=np.int64)
+        positions = np.searchsorted(self._keys, keys, side="right") - 1
+        positions = np.maximum(positions, self._first[codes])
+        return amounts * self._rates[positions]
+
+    def _code(self, currency: str) -> int:
+        code = self._codes.get(currency)
+        if code is None:
+            raise ExchangeRateNotFoundError(currency)
+        return code
+
+
+def read_rates_file(path: str) -> list[tuple[str, int, float]]:
+    """Rows of a ``date,currency,rate`` CSV file with a header line"""
+    with open(path, newline="") as file:
+        return [
+            (
+                row["currency"].strip().upper(),
+                day_number(date.fromisoformat(row["date"].strip())),
+                float(row["rate"]),
+            )
+            for row in csv.DictReader(file)
+        ]
+
+
+class FxRates:
+    """The current rate table, reloaded every ``refresh_seconds``.
+
+    Rates come from ``FX_RATES_FILE`` when set, otherwise from the
+    ``fx_rates`` collection. A refresh builds a new table and swaps it in,
+    so callers holding the old one finish with consistent rates; if it
+    fails, the old table keeps serving and the load is retried shortly.
+    """
+
+    def __init__(
+        self,
+        mongo_client: MongoDBClient,
+        path: str | None = None,
+        refresh_seconds: float | None = None,
+    ):
+        self._mongo_client = mongo_client
+        self._path = path if path is not None else settings.FX_RATES_FILE
+        self._refresh_seconds = refresh_seconds or settings.FX_REFRESH_SECONDS
+        self._table: FxRateTable | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def table(self) -> FxRateTable:
+        if self._table is None or time.monotonic() >= self._expires_at:
+            async with self._lock:
+                # Whoever waited on the lock finds the table already fresh
+                if self._table is None or time.monotonic() >= self._expires_at:
+                    await self.refresh()
+        return self._table
+
+    async def refresh(self):
+        start = time.perf_counter()
+        try:
+            rows = await self._load_rows()
+            table = FxRateTable(settings.FX_HOME_CURRENCY, rows)
+        except Exception as exc:
+            if self._table is None:
+                raise
+            logger.error(f"FX rates refresh failed, keeping previous rates: {exc}")
+            self._expires_at = time.monotonic() + _REFRESH_RETRY_SECONDS
+            return
+        self._table = table
+        self._expires_at = time.monotonic() + self._refresh_seconds
+        logger.info(
+            f"FX rates loaded: rates={len(table)} "
+            f"currencies={len(table.currencies)} "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+    async def _load_rows(self) -> list[tuple[str, int, float]]:
+        if self._path:
+            return await asyncio.to_thread(read_rates_file, self._path)
+        collection = self._mongo_client.get_collection("fx_rates")
+        return [
+            (rate["currency"], day_number(rate["date"]), rate["rate"])
+            async for rate in collection.find(
+                {}, {"_id": 0, "currency": 1, "date": 1, "rate": 1}
+            )
+        ]
+
+
+_fx_rates = None
+
+
+def get_fx_rates():
+    global _fx_rates
+    if _fx_rates is None:
+        _fx_rates = FxRates(get_mongodb_client())
+    return _fx_rates
+
+
+def _reset_after_fork():
+    # The refresh lock belongs to the parent's event loop
+    global _fx_rates
+    _fx_rates = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,232 @@
+import hashlib
+from collections import Counter
+from collections.abc import AsyncIterator
+
+from bson import ObjectId
+from fastapi import Depends
+from pydantic import ValidationError as PydanticValidationError
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.exceptions import ResourceNotFoundError
+from app.core.logging_config import logger
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.transaction_model import (
+    ImportBatchResult,
+    ImportRowError,
+    ImportSummary,
+    StatementFormat,
+    TransactionImportRow,
+)
+from app.services.account_service import AccountService
+from app.services.categorizer import Categorizer, CategoryRules, get_category_rules
+from app.services.rollup_service import RollupService
+from app.util.clock import utc_now
+from app.util.statement_parser import (
+    StatementParseError,
+    iter_csv_rows,
+    iter_ofx_rows,
+)
+
+_DUPLICATE_KEY = 11000
+
+
+def _import_hash(
+    user_id: ObjectId, row: TransactionImportRow, occurrence: int = 0
+) -> str:
+    # Bank ids are stable across re-downloads; otherwise hash the line content.
+    # Genuinely identical rows (two coffees on one day) differ only in their
+    # occurrence within the statement, which a re-download repeats; the first
+    # keeps the plain content hash so earlier imports still match.
+    if row.external_id:
+        key = f"{user_id}|id|{row.external_id}"
+    else:
+        key = "|".join(
+            [
+                str(user_id),
+                row.date.isoformat(),
+                f"{row.amount:.2f}",
+                row.type.value,
+                row.description or "",
+                row.merchant or "",
+            ]
+        )
+        if occurrence:
+            key = f"{key}|{occurrence}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _describe(exc: PydanticValidationError) -> str:
+    error = exc.errors()[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+class StatementImportService:
+    """Streams bank statements into the transactions collection in batches.
+
+    Rows without a category get one from the user's and the global category
+    rules, applied a batch at a time just before it is written.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient, rules: CategoryRules):
+        self._collection = mongo_client.get_collection("transactions")
+        self._rules = rules
+        self._rollups = RollupService(mongo_client)
+        self._accounts = AccountService(mongo_client)
+        self._batch_size = settings.IMPORT_BATCH_SIZE
+        self._max_errors = settings.IMPORT_MAX_REPORTED_ERRORS
+        self._max_record_length = settings.IMPORT_MAX_RECORD_LENGTH
+
+    async def import_statement(
+        self,
+        user_id: str,
+        chunks: AsyncIterator[bytes],
+        format: StatementFormat = StatementFormat.CSV,
+        account_id: str | None = None,
+    ) -> ImportSummary:
+        """Parse, validate and insert a statement without holding it in memory.
+
+        At most one batch of rows is buffered, besides a count per distinct
+        row content of the current day used to tell identical rows apart.
+        Statements list rows by date, so the count restarts when the day
+        changes; in one that returns to an earlier day, a repeat of a row
+        from that day's first run is taken for a duplicate. Rows already
+        imported are skipped by the unique index on ``import_hash`` rather
+        than looked up.
+        """
+        owner = ObjectId(user_id)
+        account = None
+        if account_id is not None:
+            if not ObjectId.is_valid(account_id):
+                raise ResourceNotFoundError("Account")
+            account = ObjectId(account_id)
+            await self._accounts.ensure_owned(owner, account)
+        categorizer = await self._rules.categorizer(owner)
+        if format == StatementFormat.OFX:
+            rows = iter_ofx_rows(chunks, self._max_record_length)
+        else:
+            rows = iter_csv_rows(chunks, self._max_record_length)
+        summary = ImportSummary()
+        # Rows seen so far today per content hash, to number identical rows
+        occurrences: Counter[str] = Counter()
+        day = None
+        batch: list[dict] = []
+        batch_rows: list[int] = []
+        try:
+            async for row_number, row in rows:
+                summary.total_rows += 1
+                try:
+                    parsed = TransactionImportRow.model_validate(row)
+                except PydanticValidationError as exc:
+                    summary.invalid += 1
+                    self._add_error(summary, row_number, _describe(exc))
+                    continue
+                import_hash = _import_hash(owner, parsed)
+                if not parsed.external_id:
+                    if parsed.date.date() != day:
+                        occurrences.clear()
+                        day = parsed.date.date()
+                    occurrence = occurrences[import_hash]
+                    occurrences[import_hash] += 1
+                    if occurrence:
+                        import_hash = _import_hash(owner, parsed, occurrence)
+                batch.append(self._build_document(owner, parsed, account, import_hash))
+                batch_rows.append(row_number)
+                if len(batch) >= self._batch_size:
+                    await self._flush(summary, owner, categorizer, batch, batch_rows)
+                    batch, batch_rows = [], []
+        except StatementParseError as exc:
+            summary.completed = False
+            self._add_error(summary, summary.total_rows + 1, str(exc))
+        if batch:
+            await self._flush(summary, owner, categorizer, batch, batch_rows)
+        logger.info(
+            f"Import finished: user={user_id} rows={summary.total_rows} "
+            f"inserted={summary.inserted} duplicates={summary.duplicates} "
+            f"invalid={summary.invalid} categorized={summary.categorized}"
+        )
+        return summary
+
+    def _build_document(
+        self,
+        owner: ObjectId,
+        row: TransactionImportRow,
+        account: ObjectId | None,
+        import_hash: str,
+    ) -> dict:
+        transaction = row.model_dump(exclude={"external_id"})
+        transaction["user_id"] = owner
+        if account is not None:
+            transaction["account_id"] = account
+        transaction["import_hash"] = import_hash
+        if row.external_id:
+            transaction["external_id"] = row.external_id
+        return transaction
+
+    async def _flush(
+        self,
+        summary: ImportSummary,
+        owner: ObjectId,
+        categorizer: Categorizer,
+        batch: list[dict],
+        rows: list[int],
+    ):
+        categorized = categorizer.categorize(batch)
+        await self._rollups.convert(batch)
+        # Stamped just before the write, not as rows are parsed, so search
+        # indexes catching up by updated_at see the batch
+        now = utc_now()
+        for transaction in batch:
+            transaction["created_at"] = transaction["updated_at"] = now
+        failed: dict[int, dict] = {}
+        try:
+            # Unordered so one duplicate does not stop the rest of the batch
+            await self._collection.insert_many(batch, ordered=False)
+        except BulkWriteError as exc:
+            failed = {error["index"]: error for error in exc.details["writeErrors"]}
+
+        # Duplicates abort a Mongo transaction, so a batch is not wrapped in
+        # one; the reconciliation job catches a balance left behind by a crash.
+        # Rollups and balances get one write per batch, folded by key.
+        inserted = [
+            (transaction, 1)
+            for index, transaction in enumerate(batch)
+            if index not in failed
+        ]
+        await self._rollups.apply(inserted)
+        await self._accounts.apply(owner, inserted)
+
+        duplicates = 0
+        for index, error in failed.items():
+            if error.get("code") == _DUPLICATE_KEY:
+                duplicates += 1
+            else:
+                self._add_error(
+                    summary, rows[index], error.get("errmsg", "Write failed")
+                )
+        result = ImportBatchResult(
+            batch=len(summary.batches) + 1,
+            rows=len(batch),
+            inserted=len(batch) - len(failed),
+            duplicates=duplicates,
+            failed=len(failed) - duplicates,
+        )
+        summary.batches.append(result)
+        summary.inserted += result.inserted
+        summary.duplicates += result.duplicates
+        summary.categorized += sum(1 for index in categorized if index not in failed)
+        logger.debug(
+            f"Import batch {result.batch}: inserted={result.inserted} "
+            f"duplicates={result.duplicates} failed={result.failed}"
+        )
+
+    def _add_error(self, summary: ImportSummary, row: int, message: str):
+        if len(summary.errors) < self._max_errors:
+            summary.errors.append(ImportRowError(row=row, message=message))
+        else:
+            summary.errors_truncated = True
+
+
+def get_import_service(mongo_client: MongoDBClient = Depends(get_mongodb_client)):
+    return StatementImportService(mongo_client, get_category_rules())
@@ -0,0 +1,328 @@
+import asyncio
+import heapq
+import os
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.exceptions import ExchangeRateNotFoundError, ResourceNotFoundError
+from app.core.logging_config import logger
+from app.core.metrics import registry
+from app.db.lease import Lease
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.transaction_model import TransactionDetails
+from app.services.account_service import AccountService
+from app.services.recurring_service import occurrence_date
+from app.services.rollup_service import RollupService
+from app.util.clock import utc_now
+
+_DUPLICATE_KEY = 11000
+_LEASE_NAME = "recurring_scheduler"
+_TRANSACTION_FIELDS = tuple(TransactionDetails.model_fields)
+
+_materialized = registry.counter(
+    "recurring_transactions_materialized",
+    "Transactions created from recurring items",
+)
+
+
+class RecurringScheduler:
+    """Materializes recurring items into transactions on their due dates.
+
+    Every worker runs one, but only the holder of the ``recurring_scheduler``
+    lease does any work. The leader keeps a min-heap of ``(next_due, id)`` for
+    items due within the next ``refresh_seconds``, reloaded from the
+    ``next_due`` index once per window, and sleeps until the earliest entry
+    instead of polling. Due occurrences are inserted ``batch_size`` at a time.
+
+    Occurrence ``n`` of an item is written with ``(recurring_id, occurrence)``
+    under a unique index, so a leader that crashed or lost its lease part way
+    through is simply repeated: the duplicates are dropped and balances and
+    rollups only move for what was actually inserted. As with statement
+    imports, a crash between the insert and those updates is left to the
+    reconciliation jobs. The lease is renewed between batches, and a leader
+    that cannot renew it stops at once.
+
+    An item whose occurrences cannot be converted to the home currency, or
+    whose insert fails, is skipped: it is not advanced and leaves the heap
+    until the next load, so the rest of the batch and the items after it
+    carry on.
+    """
+
+    def __init__(
+        self,
+        mongo_client: MongoDBClient,
+        batch_size: int | None = None,
+        refresh_seconds: float | None = None,
+        lease_seconds: float | None = None,
+        max_loaded: int | None = None,
+    ):
+        self._mongo_client = mongo_client
+        self._batch_size = batch_size or settings.RECURRING_BATCH_SIZE
+        self._refresh = timedelta(
+            seconds=refresh_seconds or settings.RECURRING_REFRESH_SECONDS
+        )
+        self._lease_seconds = lease_seconds or settings.RECURRING_LEASE_SECONDS
+        self._max_loaded = max_loaded or settings.RECURRING_MAX_LOADED
+        self._heap: list[tuple[datetime, ObjectId]] = []
+        # Items due up to here are in the heap; None until the first load
+        self._horizon: datetime | None = None
+        self._reload_at: datetime | None = None
+        self._truncated = False
+        self._lease: Lease | None = None
+        self._leader = False
+        self._renewed_at = 0.0
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._recurring = self._mongo_client.get_collection("recurring_transactions")
+        self._transactions = self._mongo_client.get_collection("transactions")
+        self._rollups = RollupService(self._mongo_client)
+        self._accounts = AccountService(self._mongo_client)
+        self._lease = Lease(self._mongo_client, _LEASE_NAME, self._lease_seconds)
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="recurring-scheduler")
+
+    async def stop(self):
+        """Let the current batch finish, then hand the lease back"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        if self._leader:
+            self._leader = False
+            try:
+                await self._lease.release()
+            except Exception as exc:
+                # It expires on its own; the next leader just waits longer
+                logger.warning(f"Recurring scheduler lease not released: {exc}")
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                delay = await self.tick(utc_now())
+            except Exception as exc:
+                logger.error(f"Recurring scheduler pass failed: {exc}")
+                self._horizon = None
+                delay = self._lease_seconds / 3
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+            except TimeoutError:
+                pass
+
+    async def tick(self, now: datetime) -> float:
+        """Renew the lease and materialize what is due; seconds until next pass"""
+        # Renewed at least three times per lease so one slow pass cannot lose it
+        renew_in = self._lease_seconds / 3
+        if not await self._renew():
+            return renew_in
+        if not self._leader:
+            logger.info(f"Recurring scheduler lease acquired by {self._lease.owner}")
+            self._leader = True
+
+        if (
+            self._horizon is None
+            or now >= self._reload_at
+            or (self._truncated and not self._heap)
+        ):
+            await self._load(now)
+        await self._materialize_due(now)
+
+        wake = self._reload_at
+        if self._heap:
+            wake = min(wake, self._heap[0][0])
+        return min(max((wake - utc_now()).total_seconds(), 0.0), renew_in)
+
+    async def _renew(self) -> bool:
+        """Take or renew the lease; on losing it, forget the loaded items"""
+        if await self._lease.acquire():
+            self._renewed_at = time.monotonic()
+            return True
+        if self._leader:
+            logger.warning("Recurring scheduler lease lost")
+        self._leader = False
+        self._heap.clear()
+        self._horizon = None
+        return False
+
+    async def _load(self, now: datetime):
+        horizon = now + self._refresh
+        loaded = [
+            (item["next_due"], item["_id"])
+            async for item in self._recurring.find(
+                {"next_due": {"$lte": horizon}}, {"next_due": 1}
+            )
+            .sort("next_due", ASCENDING)
+            .limit(self._max_loaded)
+        ]
+        # Sorted, so the heap is valid as is. If the window held more than
+        # fits, the heap covers up to its last entry and is reloaded once empty
+        self._heap = loaded
+        self._truncated = len(loaded) == self._max_loaded
+        self._horizon = loaded[-1][0] if self._truncated else horizon
+        self._reload_at = horizon
+        logger.debug(f"Recurring scheduler loaded {len(loaded)} items")
+
+    async def _materialize_due(self, now: datetime):
+        while self._heap and self._heap[0][0] <= now and not self._stopping.is_set():
+            ids = []
+            while (
+                self._heap and self._heap[0][0] <= now and len(ids) < self._batch_size
+            ):
+                ids.append(heapq.heappop(self._heap)[1])
+            await self._materialize(ids, now)
+            # A long catch-up must not outlive the lease: another worker
+            # would take it over and insert the same occurrences meanwhile
+            renew = time.monotonic() - self._renewed_at >= self._lease_seconds / 3
+            if renew and not await self._renew():
+                return
+
+    async def _materialize(self, ids: list[ObjectId], now: datetime):
+        # Re-read: an item may have been deleted or advanced by a previous
+        # leader since it was loaded
+        items = await self._recurring.find(
+            {"_id": {"$in": ids}, "next_due": {"$lte": now}}
+        ).to_list(None)
+        transactions: list[dict] = []
+        advances: dict[ObjectId, UpdateOne] = {}
+        requeued: list[tuple[datetime, ObjectId]] = []
+        for item in items:
+            index, due = item["next_index"], item["next_due"]
+            while (
+                due is not None and due <= now and len(transactions) < self._batch_size
+            ):
+                transactions.append(self._build_transaction(item, index, due))
+                index += 1
+                due = occurrence_date(item, index)
+            if index > item["next_index"]:
+                # Conditional, so a stale leader can never move an item back
+                advances[item["_id"]] = UpdateOne(
+                    {"_id": item["_id"], "next_index": item["next_index"]},
+                    {"$set": {"next_index": index, "next_due": due, "updated_at": now}},
+                )
+            if due is not None and due <= self._horizon:
+                requeued.append((due, item["_id"]))
+
+        transactions, failed = await self._convert(transactions)
+        inserted, insert_failed = await self._insert(transactions)
+        failed |= insert_failed
+        await self._rollups.apply((transaction, 1) for transaction in inserted)
+        by_user: dict[ObjectId, list[tuple[dict, int]]] = {}
+        for transaction in inserted:
+            by_user.setdefault(transaction["user_id"], []).append((transaction, 1))
+        for user_id, changes in by_user.items():
+            try:
+                await self._accounts.apply(user_id, changes)
+            except ResourceNotFoundError:
+                logger.warning(f"Recurring transaction account gone: user={user_id}")
+
+        # Failed items stay where they are and are retried after the next load
+        operations = [op for id, op in advances.items() if id not in failed]
+        if operations:
+            await self._recurring.bulk_write(operations, ordered=False)
+        for entry in requeued:
+            if entry[1] not in failed:
+                # Items still behind come round again in the next batch
+                heapq.heappush(self._heap, entry)
+        _materialized.inc(len(inserted))
+        logger.debug(
+            f"Recurring batch: items={len(items)} inserted={len(inserted)} "
+            f"skipped={len(transactions) - len(inserted)}"
+        )
+
+    async def _convert(
+        self, transactions: list[dict]
+    ) -> tuple[list[dict], set[ObjectId]]:
+        """Convert to the home currency; returns what converted and items that
+        lack a rate"""
+        try:
+            await self._rollups.convert(transactions)
+        except ExchangeRateNotFoundError:
+            pass
+        else:
+            return transactions, set()
+
+        # One missing rate fails the whole batch, so retry item by item
+        by_item: dict[ObjectId, list[dict]] = {}
+        for transaction in transactions:
+            by_item.setdefault(transaction["recurring_id"], []).append(transaction)
+        converted, failed = [], set()
+        for item_id, occurrences in by_item.items():
+            try:
+                await self._rollups.convert(occurrences)
+            except ExchangeRateNotFoundError as exc:
+                failed.add(item_id)
+                logger.error(
+                    f"Recurring transaction not converted: item={item_id} {exc.message}"
+                )
+            else:
+                converted.extend(occurrences)
+        return converted, failed
+
+    async def _insert(
+        self, transactions: list[dict]
+    ) -> tuple[list[dict], set[ObjectId]]:
+        """Insert unordered; returns what was written and items that errored"""
+        if not transactions:
+            return [], set()
+        # Stamped per batch rather than with the tick's clock, which a long
+        # catch-up run leaves far behind; search indexes read by updated_at
+        now = utc_now()
+        for transaction in transactions:
+            transaction["created_at"] = transaction["updated_at"] = now
+        try:
+            await self._transactions.insert_many(transactions, ordered=False)
+        except BulkWriteError as exc:
+            errors = exc.details["writeErrors"]
+        else:
+            return transactions, set()
+
+        failed = set()
+        for error in errors:
+            if error.get("code") != _DUPLICATE_KEY:
+                transaction = transactions[error["index"]]
+                failed.add(transaction["recurring_id"])
+                logger.error(
+                    f"Recurring transaction insert failed: "
+                    f"item={transaction['recurring_id']} {error.get('errmsg')}"
+                )
+        rejected = {error["index"] for error in errors}
+        inserted = [t for i, t in enumerate(transactions) if i not in rejected]
+        return inserted, failed
+
+    def _build_transaction(self, item: dict, index: int, due: datetime) -> dict:
+        transaction = {
+            field: item[field] for field in _TRANSACTION_FIELDS if field in item
+        }
+        transaction["user_id"] = item["user_id"]
+        transaction["date"] = due
+        transaction["recurring_id"] = item["_id"]
+        transaction["occurrence"] = index
+        return transaction
+
+
+_recurring_scheduler = None
+
+
+def get_recurring_scheduler():
+    global _recurring_scheduler
+    if _recurring_scheduler is None:
+        _recurring_scheduler = RecurringScheduler(get_mongodb_client())
+    return _recurring_scheduler
+
+
+def _reset_after_fork():
+    # The task and its event belong to the parent's event loop
+    global _recurring_scheduler
+    _recurring_scheduler = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi import Depends
+from pymongo import ASCENDING
+
+from app.core.exceptions import ResourceNotFoundError
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.recurring_model import (
+    RecurrenceFrequency,
+    RecurringTransactionCreate,
+    RecurringTransactionResponse,
+)
+from app.services.account_service import AccountService
+from app.util.clock import add_months, utc_now
+
+
+def occurrence_date(item: dict, index: int) -> datetime | None:
+    """Due date of the ``index``-th occurrence, None past the end date.
+
+    Computed from the start date rather than the previous occurrence, so a
+    monthly item starting on the 31st falls on the 30th in April and is back
+    on the 31st in May.
+    """
+    steps = item["interval"] * index
+    match item["frequency"]:
+        case RecurrenceFrequency.DAILY:
+            due = item["start_date"] + timedelta(days=steps)
+        case RecurrenceFrequency.WEEKLY:
+            due = item["start_date"] + timedelta(weeks=steps)
+        case RecurrenceFrequency.MONTHLY:
+            due = add_months(item["start_date"], steps)
+        case RecurrenceFrequency.YEARLY:
+            due = add_months(item["start_date"], 12 * steps)
+    end_date = item.get("end_date")
+    if end_date is not None and due > end_date:
+        return None
+    return due
+
+
+class RecurringTransactionService:
+    """Recurring items such as rent, salary and subscriptions.
+
+    Requests only manage the definitions; the recurring scheduler turns due
+    occurrences into transactions. ``next_due`` and ``next_index`` track the
+    first occurrence not materialized yet.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._collection = mongo_client.get_collection("recurring_transactions")
+        self._accounts = AccountService(mongo_client)
+
+    async def create(self, user_id: str, item_data: RecurringTransactionCreate):
+        owner = ObjectId(user_id)
+        item = item_data.model_dump()
+        if item["account_id"] is None:
+            del item["account_id"]
+        else:
+            # Checked here so the scheduler never books onto a foreign account
+            await self._accounts.ensure_owned(owner, item["account_id"])
+        item["user_id"] = owner
+        item["next_index"] = 0
+        item["next_due"] = occurrence_date(item, 0)
+        item["created_at"] = item["updated_at"] = utc_now()
+        await self._collection.insert_one(item)
+        return RecurringTransactionResponse(**item)
+
+    async def list_by_user(self, user_id: str) -> list[RecurringTransactionResponse]:
+        items = (
+            await self._collection.find({"user_id": ObjectId(user_id)})
+            .sort("created_at", ASCENDING)
+            .to_list(None)
+        )
+        return [RecurringTransactionResponse(**item) for item in items]
+
+    async def get_by_id(self, user_id: str, id: str) -> RecurringTransactionResponse:
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Recurring transaction")
+        item = await self._collection.find_one(
+            {"_id": ObjectId(id), "user_id": ObjectId(user_id)}
+        )
+        if not item:
+            raise ResourceNotFoundError("Recurring transaction")
+        return RecurringTransactionResponse(**item)
+
+    async def delete(self, user_id: str, id: str):
+        """Stop the item; transactions it already created are kept"""
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Recurring transaction")
+        result = await self._collection.delete_one(
+            {"_id": ObjectId(id), "user_id": ObjectId(user_id)}
+        )
+        if result.deleted_count == 0:
+            raise ResourceNotFoundError("Recurring transaction")
+
+
+def get_recurring_service(mongo_client: MongoDBClient = Depends(get_mongodb_client)):
+    return RecurringTransactionService(mongo_client)
@@ -0,0 +1,249 @@
+import hashlib
+import secrets
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.exceptions import InvalidTokenError
+from app.core.logging_config import logger
+from app.core.metrics import registry
+from app.db.mongodb import MongoDBClient
+from app.util.clock import as_utc, utc_now
+
+# Replaced tokens remembered per family for reuse detection; a family
+# refreshed hourly for a month stays within it
+_USED_HASHES_KEPT = 1000
+
+_rotations = registry.counter(
+    "refresh_token_rotations", "Refresh tokens exchanged for new ones"
+)
+_rejections = registry.counter(
+    "refresh_token_rejections", "Refresh tokens refused, by reason", ("reason",)
+)
+_revoked = registry.gauge(
+    "refresh_revocations", "Revoked refresh token families held in memory"
+)
+
+
+def _new_token(family: ObjectId) -> str:
+    return f"{family}.{secrets.token_urlsafe(32)}"
+
+
+def _digest(token: str) -> bytes:
+    # The secret is 256 random bits, so unlike a password it cannot be guessed
+    # from its hash and bcrypt would only add CPU
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _family(token: str) -> ObjectId:
+    family, _, secret = token.partition(".")
+    if not secret or not ObjectId.is_valid(family):
+        _rejections.inc(reason="malformed")
+        raise InvalidTokenError("Invalid refresh token")
+    return ObjectId(family)
+
+
+class RevocationSet:
+    """Revoked refresh token families, checked before any database read.
+
+    Families are kept as their 12 id bytes for as long as a token can live,
+    so entries expire in the order they were added and are pruned from the
+    front. Past ``max_size`` the oldest go first; Mongo still refuses a
+    family forgotten early, one read later. Not thread safe.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._expiries: OrderedDict[bytes, float] = OrderedDict()
+        _revoked.set_function(lambda: len(self._expiries))
+
+    def __len__(self):
+        return len(self._expiries)
+
+    def __contains__(self, family: ObjectId) -> bool:
+        expires_at = self._expiries.get(family.binary)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def add(self, family: ObjectId):
+        if self.max_size <= 0:
+            return
+        now = time.monotonic()
+        self._expiries[family.binary] = now + self.ttl_seconds
+        self._expiries.move_to_end(family.binary)
+        while self._expiries:
+            key, expires_at = next(iter(self._expiries.items()))
+            if expires_at > now and len(self._expiries) <= self.max_size:
+                break
+            del self._expiries[key]
+
+
+class RefreshTokenService:
+    """Issues and rotates refresh tokens, one family per login.
+
+    A token is ``<family id>.<secret>`` and only its SHA-256 digest is
+    stored. The family document holds the digest of its one live token and
+    of the tokens it replaced: exchanging the live token swaps in a new one
+    with a single conditional update, while presenting a replaced one means
+    the token leaked and revokes the whole family. The token replaced last
+    is only refused for ``REFRESH_REUSE_GRACE_SECONDS`` after its rotation,
+    since a client refreshing from two tabs at once presents it a second
+    time without anything having leaked. Revoked families are
+    added to the ``RevocationSet``, so retries with their tokens are refused
+    without touching Mongo.
+    """
+
+    def __init__(
+        self, mongo_client: MongoDBClient, revocations: RevocationSet | None = None
+    ):
+        self._collection = mongo_client.get_collection("refresh_tokens")
+        self._revocations = (
+            revocations if revocations is not None else get_refresh_revocations()
+        )
+        self._lifetime = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        self._reuse_grace = timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS)
+
+    async def issue(self, user_id: str) -> str:
+        """Start a new family for a user who just proved their password"""
+        family = ObjectId()
+        token = _new_token(family)
+        now = utc_now()
+        await self._collection.insert_one(
+            {
+                "_id": family,
+                "user_id": ObjectId(user_id),
+                "token_hash": _digest(token),
+                "used_hashes": [],
+                "created_at": now,
+                "expires_at": now + self._lifetime,
+                "revoked_at": None,
+            }
+        )
+        return token
+
+    async def rotate(self, token: str) -> tuple[str, str]:
+        """Exchange the live token of a family for the user id and a new token"""
+        family = _family(token)
+        if family in self._revocations:
+            _rejections.inc(reason="revoked_in_memory")
+            raise InvalidTokenError("Refresh token revoked")
+        digest = _digest(token)
+        new_token = _new_token(family)
+        now = utc_now()
+        family_doc = await self._collection.find_one_and_update(
+            {
+                "_id": family,
+                "token_hash": digest,
+                "revoked_at": None,
+                "expires_at": {"$gt": now},
+            },
+            {
+                "$set": {
+                    "token_hash": _digest(new_token),
+                    "previous_hash": digest,
+                    "expires_at": now + self._lifetime,
+                    "rotated_at": now,
+                },
+                "$push": {
+                    "used_hashes": {"$each": [digest], "$slice": -_USED_HASHES_KEPT}
+                },
+            },
+            projection={"user_id": 1},
+        )
+        if family_doc is None:
+            await self._refuse(family, digest)
+        _rotations.inc()
+        return str(family_doc["user_id"]), new_token
+
+    async def revoke(self, token: str):
+        """Revoke the family of a live or replaced token, as logging out does"""
+        family = _family(token)
+        if family in self._revocations:
+            return
+        family_doc = await self._collection.find_one(
+            {"_id": family}, {"token_hash": 1, "used_hashes": 1}
+        )
+        if not _issued(family_doc, _digest(token)):
+            _rejections.inc(reason="unknown")
+            raise InvalidTokenError("Invalid refresh token")
+        await self._revoke_families([family])
+
+    async def revoke_user(self, user_id: str):
+        """Revoke every family of a user, e.g. after a password change"""
+        families = await self._collection.distinct(
+            "_id", {"user_id": ObjectId(user_id), "revoked_at": None}
+        )
+        await self._revoke_families(families)
+
+    async def _refuse(self, family: ObjectId, digest: bytes):
+        family_doc = await self._collection.find_one(
+            {"_id": family},
+            {
+                "user_id": 1,
+                "token_hash": 1,
+                "used_hashes": 1,
+                "previous_hash": 1,
+                "rotated_at": 1,
+                "revoked_at": 1,
+            },
+        )
+        if not _issued(family_doc, digest):
+            reason = "unknown"
+        elif family_doc["revoked_at"] is not None:
+            # Revoked by another worker; remembered here from now on
+            self._revocations.add(family)
+            reason = "revoked"
+        elif (
+            digest == family_doc.get("previous_hash")
+            and utc_now() - as_utc(family_doc["rotated_at"]) <= self._reuse_grace
+        ):
+            # Lost a race with a refresh of the same token; the family lives
+            reason = "concurrent"
+        elif digest != family_doc["token_hash"]:
+            logger.warning(
+                f"Refresh token reused, family revoked: "
+                f"user={family_doc['user_id']} family={family}"
+            )
+            await self._revoke_families([family])
+            reason = "reused"
+        else:
+            reason = "expired"
+        _rejections.inc(reason=reason)
+        if reason in ("revoked", "reused"):
+            raise InvalidTokenError("Refresh token revoked")
+        if reason == "concurrent":
+            raise InvalidTokenError("Refresh token already rotated")
+        raise InvalidTokenError("Invalid or expired refresh token")
+
+    async def _revoke_families(self, families: list[ObjectId]):
+        if not families:
+            return
+        await self._collection.update_many(
+            {"_id": {"$in": families}, "revoked_at": None},
+            {"$set": {"revoked_at": utc_now()}},
+        )
+        for family in families:
+            self._revocations.add(family)
+
+
+def _issued(family_doc: dict | None, digest: bytes) -> bool:
+    """Whether the digest is of a token the family ever held"""
+    return family_doc is not None and (
+        digest == family_doc["token_hash"] or digest in family_doc["used_hashes"]
+    )
+
+
+_refresh_revocations = None
+
+
+def get_refresh_revocations():
+    global _refresh_revocations
+    if _refresh_revocations is None:
+        _refresh_revocations = RevocationSet(
+            settings.REFRESH_REVOCATIONS_MAX_SIZE,
+            settings.REFRESH_TOKEN_EXPIRE_DAYS * 86_400,
+        )
+    return _refresh_revocations
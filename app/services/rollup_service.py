@@ -0,0 +1,163 @@
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+
+import numpy as np
+from bson import ObjectId
+from fastapi import Depends
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.report_model import CategoryReport, CategorySpending, MonthlyTotals
+from app.models.transaction_model import TransactionType
+from app.services.account_service import AccountService
+from app.services.fx_service import day_number, get_fx_rates
+
+# Rollup amounts are float sums; differences below this are rounding noise
+ROLLUP_TOLERANCE = 0.005
+
+
+def month_key(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return value.strftime("%Y-%m")
+
+
+def rollup_deltas(
+    changes: Iterable[tuple[dict, int]], amounts: Sequence[float] | None = None
+) -> dict[tuple[ObjectId, str, str], list[float]]:
+    """Fold ``(transaction, sign)`` pairs into net changes per rollup key.
+
+    A sign of +1 adds the transaction to its month and category, -1 removes
+    it; an edit is the old document with -1 plus the new one with +1.
+    ``amounts`` replaces the transactions' own amounts, position by position.
+    """
+    deltas: dict[tuple[ObjectId, str, str], list[float]] = {}
+    for index, (transaction, sign) in enumerate(changes):
+        amount = transaction["amount"] if amounts is None else amounts[index]
+        key = (
+            transaction["user_id"],
+            month_key(transaction["date"]),
+            transaction["category"],
+        )
+        delta = deltas.setdefault(key, [0.0, 0.0, 0])
+        if transaction["type"] == TransactionType.INCOME:
+            delta[0] += sign * amount
+        else:
+            delta[1] += sign * amount
+        delta[2] += sign
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+class RollupService:
+    """Monthly per-category totals maintained incrementally with ``$inc``.
+
+    Totals are in the home currency. Writers call ``convert`` before storing
+    a transaction, which records its amount converted at the rate of its
+    date; rollups add and remove that stored ``home_amount``, so a delete
+    takes out exactly what the create put in even if rates were loaded in
+    between.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._collection = mongo_client.get_collection("category_rollups")
+        self._accounts = AccountService(mongo_client)
+
+    async def apply(self, changes: Iterable[tuple[dict, int]], session=None):
+        """Apply transaction changes to the rollups in one bulk round trip"""
+        changes = list(changes)
+        # Written before home amounts were stored: converted at today's rates
+        unconverted = [t for t, _ in changes if "home_amount" not in t]
+        if unconverted:
+            await self.convert(unconverted, session)
+        deltas = rollup_deltas(changes, [t["home_amount"] for t, _ in changes])
+        if not deltas:
+            return
+        await self._collection.bulk_write(
+            [
+                UpdateOne(
+                    {"user_id": user_id, "month": month, "category": category},
+                    {"$inc": {"income": income, "expense": expense, "count": count}},
+                    upsert=True,
+                )
+                for (user_id, month, category), (
+                    income,
+                    expense,
+                    count,
+                ) in deltas.items()
+            ],
+            ordered=False,
+            session=session,
+        )
+
+    async def convert(self, transactions: Sequence[dict], session=None):
+        """Set ``fx_rate`` and ``home_amount`` on transactions about to be
+        written, converting a whole batch at once"""
+        rates = await self._rates(transactions, session)
+        for transaction, rate in zip(transactions, rates):
+            transaction["fx_rate"] = rate
+            transaction["home_amount"] = transaction["amount"] * rate
+
+    async def _rates(self, transactions: Sequence[dict], session=None) -> list[float]:
+        """Home currency units per unit of each transaction's account currency"""
+        home = settings.FX_HOME_CURRENCY
+        account_ids = {
+            transaction["account_id"]
+            for transaction in transactions
+            if transaction.get("account_id") is not None
+        }
+        currencies = await self._accounts.currencies(account_ids, session)
+        if all(currency == home for currency in currencies.values()):
+            return [1.0] * len(transactions)
+        table = await get_fx_rates().table()
+        return table.to_home(
+            np.ones(len(transactions)),
+            [currencies.get(t.get("account_id"), home) for t in transactions],
+            [day_number(transaction["date"]) for transaction in transactions],
+        ).tolist()
+
+    async def spending_by_category(self, user_id: str, month: str) -> CategoryReport:
+        rollups = await self._collection.find(
+            {"user_id": ObjectId(user_id), "month": month, "count": {"$gt": 0}},
+            {"_id": 0, "category": 1, "income": 1, "expense": 1, "count": 1},
+        ).to_list(None)
+        categories = sorted(
+            (CategorySpending(**rollup) for rollup in rollups),
+            key=lambda c: c.expense,
+            reverse=True,
+        )
+        return CategoryReport(
+            month=month,
+            currency=settings.FX_HOME_CURRENCY,
+            total_income=sum(c.income for c in categories),
+            total_expense=sum(c.expense for c in categories),
+            categories=categories,
+        )
+
+    async def monthly_totals(
+        self, user_id: str, start_month: str, end_month: str
+    ) -> list[MonthlyTotals]:
+        """Month-over-month totals from at most months x categories rollups"""
+        rollups = await self._collection.find(
+            {
+                "user_id": ObjectId(user_id),
+                "month": {"$gte": start_month, "$lte": end_month},
+                "count": {"$gt": 0},
+            },
+            {"_id": 0, "month": 1, "income": 1, "expense": 1, "count": 1},
+        ).to_list(None)
+        months: dict[str, MonthlyTotals] = {}
+        for rollup in rollups:
+            totals = months.setdefault(
+                rollup["month"], MonthlyTotals(month=rollup["month"])
+            )
+            totals.income += rollup["income"]
+            totals.expense += rollup["expense"]
+            totals.count += rollup["count"]
+        for totals in months.values():
+            totals.net = totals.income - totals.expense
+        return [months[month] for month in sorted(months)]
+
+
+def get_rollup_service(mongo_client: MongoDBClient = Depends(get_mongodb_client)):
+    return RollupService(mongo_client)
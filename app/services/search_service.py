@@ -0,0 +1,107 @@
+from bson import ObjectId
+from fastapi import Depends
+
+from app.core.exceptions import ValidationError
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.transaction_model import TransactionSearchHit, TransactionSearchPage
+from app.services.search_index import (
+    SearchFilters,
+    SearchIndexes,
+    get_search_indexes,
+    tokenize,
+)
+from app.util.pagination import decode_cursor, encode_cursor
+
+# Pages are re-ranked at most this many times when hits turn out deleted
+_MAX_ATTEMPTS = 3
+
+
+class TransactionSearchService:
+    """Ranked search over a user's transaction descriptions and merchants.
+
+    Every query word matches as a prefix, so "amaz" finds "Amazon"; a
+    transaction must match all words and the optional amount and date
+    filters. Ranking and paging run on the in-process index; only the page
+    itself is read from Mongo.
+
+    The cursor pins the index generation and the slot count the first page
+    was scored over, so later pages rank with the same token weights and
+    the keyset neither skips nor repeats hits as writes are caught up. A
+    cursor from an index since rebuilt (or held by another worker) is
+    refused, and the search has to start again.
+    """
+
+    def __init__(self, mongo_client: MongoDBClient, indexes: SearchIndexes):
+        self._collection = mongo_client.get_collection("transactions")
+        self._indexes = indexes
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        filters: SearchFilters,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> TransactionSearchPage:
+        owner = ObjectId(user_id)
+        after = generation = None
+        if cursor is not None:
+            score, date, id, generation, scope = self._decode_cursor(cursor)
+            after = score, date, id
+        words = tokenize(query)
+        if not words:
+            return TransactionSearchPage(items=[])
+        index = await self._indexes.get(owner)
+        if generation is None:
+            scope = index.size
+        elif generation != index.generation:
+            raise ValidationError(
+                {"details": "Search results have changed, start the search again"}
+            )
+
+        for _ in range(_MAX_ATTEMPTS):
+            hits = index.search(words, filters, limit + 1, after, scope)
+            page = hits[:limit]
+            documents = {
+                transaction["_id"]: transaction
+                async for transaction in self._collection.find(
+                    {"_id": {"$in": [id for id, _, _ in page]}, "user_id": owner}
+                )
+            }
+            missing = [id for id, _, _ in page if id not in documents]
+            if not missing:
+                break
+            # Deleted through another worker since the index caught up
+            for id in missing:
+                index.remove(id)
+        page = [hit for hit in page if hit[0] in documents]
+
+        next_cursor = None
+        if len(hits) > limit and page:
+            last_id, last_score, last_date = page[-1]
+            next_cursor = encode_cursor(
+                last_score, last_date, last_id, index.generation, scope
+            )
+        return TransactionSearchPage(
+            items=[
+                TransactionSearchHit(**documents[id], score=score)
+                for id, score, _ in page
+            ],
+            next_cursor=next_cursor,
+        )
+
+    def _decode_cursor(self, cursor: str) -> tuple[float, int, ObjectId, ObjectId, int]:
+        score, date, id, generation, scope = decode_cursor(cursor, 5)
+        if (
+            not isinstance(score, int | float)
+            or not isinstance(date, int)
+            or not isinstance(id, ObjectId)
+            or not isinstance(generation, ObjectId)
+            or not isinstance(scope, int)
+        ):
+            raise ValidationError({"details": "Invalid pagination cursor"})
+        return score, date, id, generation, scope
+
+
+def get_search_service(mongo_client: MongoDBClient = Depends(get_mongodb_client)):
+    return TransactionSearchService(mongo_client, get_search_indexes())
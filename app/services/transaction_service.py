@@ -0,0 +1,176 @@
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import Depends
+from pymongo import DESCENDING, ReturnDocument
+
+from app.core.exceptions import ResourceNotFoundError
+from app.db.mongodb import MongoDBClient, get_mongodb_client
+from app.models.transaction_model import (
+    TransactionCreate,
+    TransactionPage,
+    TransactionResponse,
+    TransactionUpdate,
+)
+from app.services.account_service import AccountService
+from app.services.rollup_service import RollupService
+from app.services.search_index import get_search_indexes
+from app.util.clock import utc_now
+from app.util.pagination import decode_cursor, encode_cursor
+
+# Matches the (user_id, date desc, _id desc) index so every page is an index walk
+_LIST_SORT = [("date", DESCENDING), ("_id", DESCENDING)]
+# Edits of these change the amount in the home currency
+_CONVERTED_FIELDS = {"amount", "date", "account_id"}
+
+
+class TransactionService:
+    """Business logic layer for transaction operations."""
+
+    def __init__(self, mongo_client: MongoDBClient):
+        self._mongo_client = mongo_client
+        self._collection = mongo_client.get_collection("transactions")
+        self._rollups = RollupService(mongo_client)
+        self._accounts = AccountService(mongo_client)
+
+    async def create(
+        self, user_id: str, transaction_data: TransactionCreate
+    ) -> TransactionResponse:
+        owner = ObjectId(user_id)
+        transaction = transaction_data.model_dump()
+        if transaction["account_id"] is None:
+            # Left out so the partial (account_id, date) index stays small
+            del transaction["account_id"]
+        transaction["user_id"] = owner
+        transaction["created_at"] = transaction["updated_at"] = utc_now()
+        async with self._mongo_client.transaction() as session:
+            # Balance first: a foreign account aborts before anything is written
+            await self._accounts.apply(owner, [(transaction, 1)], session)
+            await self._rollups.convert([transaction], session)
+            await self._collection.insert_one(transaction, session=session)
+            await self._rollups.apply([(transaction, 1)], session)
+        return self._build_transaction_response(transaction)
+
+    async def get_by_id(self, user_id: str, id: str) -> TransactionResponse:
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Transaction")
+        transaction = await self._collection.find_one(
+            {"_id": ObjectId(id), "user_id": ObjectId(user_id)}
+        )
+        if not transaction:
+            raise ResourceNotFoundError("Transaction")
+        return self._build_transaction_response(transaction)
+
+    async def list_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: str | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        category: str | None = None,
+    ) -> TransactionPage:
+        """Return one page, newest first, continuing after ``cursor``.
+
+        Keyset pagination: the cursor carries the (date, _id) of the last item
+        so the next page is a range scan on the index, whatever its depth.
+        """
+        query: dict = {"user_id": ObjectId(user_id)}
+        date_range = {}
+        if start_date is not None:
+            date_range["$gte"] = start_date
+        if end_date is not None:
+            date_range["$lt"] = end_date
+        if date_range:
+            query["date"] = date_range
+        if category is not None:
+            query["category"] = category.strip().lower()
+        if cursor is not None:
+            last_date, last_id = decode_cursor(cursor, 2)
+            query["$or"] = [
+                {"date": {"$lt": last_date}},
+                {"date": last_date, "_id": {"$lt": last_id}},
+            ]
+
+        transactions = (
+            await self._collection.find(query)
+            .sort(_LIST_SORT)
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            last = transactions[-1]
+            next_cursor = encode_cursor(last["date"], last["_id"])
+        return TransactionPage(
+            items=[self._build_transaction_response(t) for t in transactions],
+            next_cursor=next_cursor,
+        )
+
+    async def update(
+        self, user_id: str, id: str, updates: TransactionUpdate
+    ) -> TransactionResponse:
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Transaction")
+        owner = ObjectId(user_id)
+        # Fields sent as null are cleared; the model refuses null where a
+        # transaction cannot do without a value
+        update_data = updates.model_dump(exclude_unset=True)
+        update_data["updated_at"] = utc_now()
+        if update_data.get("account_id") is not None:
+            await self._accounts.ensure_owned(owner, update_data["account_id"])
+        async with self._mongo_client.transaction() as session:
+            # The previous version is needed to move its amount out of the
+            # rollups and balances; the new one is it with the $set applied
+            previous = await self._collection.find_one_and_update(
+                {"_id": ObjectId(id), "user_id": owner},
+                {"$set": update_data},
+                return_document=ReturnDocument.BEFORE,
+                session=session,
+            )
+            if not previous:
+                raise ResourceNotFoundError("Transaction")
+            transaction = {**previous, **update_data}
+            if _CONVERTED_FIELDS.intersection(update_data):
+                await self._rollups.convert([transaction], session)
+                await self._collection.update_one(
+                    {"_id": previous["_id"]},
+                    {
+                        "$set": {
+                            "fx_rate": transaction["fx_rate"],
+                            "home_amount": transaction["home_amount"],
+                        }
+                    },
+                    session=session,
+                )
+            changes = [(previous, -1), (transaction, 1)]
+            await self._accounts.apply(owner, changes, session)
+            await self._rollups.apply(changes, session)
+        return self._build_transaction_response(transaction)
+
+    async def delete(self, user_id: str, id: str):
+        if not ObjectId.is_valid(id):
+            raise ResourceNotFoundError("Transaction")
+        owner = ObjectId(user_id)
+        async with self._mongo_client.transaction() as session:
+            transaction = await self._collection.find_one_and_delete(
+                {"_id": ObjectId(id), "user_id": owner}, session=session
+            )
+            if not transaction:
+                raise ResourceNotFoundError("Transaction")
+            await self._accounts.apply(owner, [(transaction, -1)], session)
+            await self._rollups.apply([(transaction, -1)], session)
+        # Creates and edits reach the search index through updated_at;
+        # a delete leaves nothing behind to find, so it is applied here
+        get_search_indexes().discard(owner, transaction["_id"])
+        return True
+
+    def _build_transaction_response(self, transaction: dict):
+        return TransactionResponse.model_validate(transaction)
+
+
+def get_transaction_service(
+    mongo_client: MongoDBClient = Depends(get_mongodb_client),
+):
+    return TransactionService(mongo_client)
@@ -1,91 +1,234 @@
-from datetime import UTC, datetime
+import functools
+import os
+from collections.abc import Iterable
 
 from bson import ObjectId
 from fastapi import Depends
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
+from app.core.config import settings
 from app.core.exceptions import (
     DuplicateResourceError,
     InvalidCredentialsError,
+    InvalidTokenError,
     UserNotFoundError,
 )
 from app.core.security import SecurityService, get_security_service
 from app.db.mongodb import MongoDBClient, get_mongodb_client
-from app.models.user_model import UserCreate, UserLogin, UserResponse, UserUpdate
+from app.models.user_model import (
+    RefreshTokenRequest,
+    TokenResponse,
+    UserCreate,
+    UserLogin,
+    UserResponse,
+    UserUpdate,
+)
+from app.services.refresh_token_service import RefreshTokenService
+from app.util.cache import TTLCache
+from app.util.clock import utc_now
+from app.util.loader import BatchLoader
+
+# Fields never sent back to the client are dropped by Mongo itself
+_PROFILE_PROJECTION = {"password": 0}
 
 
 class UserService:
     """Business logic layer for user operations."""
 
-    def __init__(self, mongo_client: MongoDBClient, security_service: SecurityService):
+    def __init__(
+        self,
+        mongo_client: MongoDBClient,
+        security_service: SecurityService,
+        user_cache: TTLCache | None = None,
+        refresh_tokens: RefreshTokenService | None = None,
+    ):
+        self._mongo_client = mongo_client
         self._collection = mongo_client.get_collection("users")
         self._security = security_service
+        self._cache = user_cache if user_cache is not None else get_user_cache()
+        self._refresh_tokens = (
+            refresh_tokens
+            if refresh_tokens is not None
+            else RefreshTokenService(mongo_client)
+        )
 
     async def create(self, user_data: UserCreate) -> UserResponse:
-        existing_user = await self.get_by_email(user_data.email)
-        if existing_user:
-            raise DuplicateResourceError("email")
-
         user_dict = user_data.model_dump()
-        user_dict["password"] = self._security.hash_password(user_data.password)
-        user_dict["created_at"] = datetime.now(UTC)
-        user_dict["updated_at"] = datetime.now(UTC)
+        user_dict["password"] = await self._security.hash_password(user_data.password)
+        user_dict["created_at"] = user_dict["updated_at"] = utc_now()
 
-        result = await self._collection.insert_one(user_dict)
-        user = await self.get_by_id(result.inserted_id)
-        return self._build_user_response(user)
+        # The unique index on email rejects duplicates, no lookup needed first
+        try:
+            await self._collection.insert_one(user_dict)
+        except DuplicateKeyError:
+            raise DuplicateResourceError("email")
+        return self._build_user_response(user_dict)
 
-    async def get_by_id(self, id: str):
+    async def get_by_id(self, id: str, projection: dict | None = None):
+        """Load a user through the user loader, so concurrent lookups share
+        one query"""
         if not ObjectId.is_valid(id):
             raise UserNotFoundError()
-        user = await self._collection.find_one({"_id": ObjectId(id)})
+        loader = get_user_loader(self._mongo_client, projection)
+        user = await loader.load(ObjectId(id))
         if not user:
             raise UserNotFoundError()
-        return user
+        # Concurrent callers got the same document
+        return dict(user)
+
+    async def get_many(
+        self, ids: Iterable[str], projection: dict | None = None
+    ) -> dict[str, dict]:
+        """Users by id, in batched ``$in`` queries; unknown ids are left out"""
+        users = await get_user_loader(self._mongo_client, projection).load_many(
+            ObjectId(id) for id in ids if ObjectId.is_valid(id)
+        )
+        return {str(id): dict(user) for id, user in users.items()}
+
+    async def get_profile(self, id: str) -> UserResponse:
+        """Return the public profile of a user, served from the user cache"""
+        profile = self._cache.get(id)
+        if profile is not None:
+            return profile
+        generation = self._cache.generation
+        user = await self.get_by_id(id, _PROFILE_PROJECTION)
+        profile = self._build_user_response(user)
+        self._cache.set(id, profile, generation=generation)
+        return profile
 
     async def get_by_email(self, email: str):
         return await self._collection.find_one({"email": email})
 
     async def update(self, id: str, updates: UserUpdate):
-        await self.get_by_id(id)
+        if not ObjectId.is_valid(id):
+            raise UserNotFoundError()
         update_data = updates.model_dump(exclude_unset=True)
         if "password" in update_data and updates.password is not None:
-            update_data["password"] = self._security.hash_password(updates.password)
-        update_data["updated_at"] = datetime.now(UTC)
-        await self._collection.update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        updated_user = await self.get_by_id(id)
+            update_data["password"] = await self._security.hash_password(
+                updates.password
+            )
+        update_data["updated_at"] = utc_now()
+        updated_user = await self._collection.find_one_and_update(
+            {"_id": ObjectId(id)},
+            {"$set": update_data},
+            projection=_PROFILE_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._cache.invalidate(id)
+        if not updated_user:
+            raise UserNotFoundError()
+        if "password" in update_data:
+            # Sessions started with the old password end at their next refresh
+            await self._refresh_tokens.revoke_user(id)
         return self._build_user_response(updated_user)
 
     async def delete(self, id: str):
         if not ObjectId.is_valid(id):
             raise UserNotFoundError()
         result = await self._collection.delete_one({"_id": ObjectId(id)})
+        self._cache.invalidate(id)
         if result.deleted_count == 0:
             raise UserNotFoundError()
+        await self._refresh_tokens.revoke_user(id)
         return True
 
     async def authenticate_user(self, user_data: UserLogin):
         user = await self.get_by_email(user_data.email)
-        if not user or not self._security.verify_password(
+        if not user or not await self._security.verify_password(
             user_data.password, user["password"]
         ):
             raise InvalidCredentialsError()
-        token = self._security.create_access_token(str(user["_id"]))
-        return dict(
-            access_token=token,
+        user_id = str(user["_id"])
+        return TokenResponse(
+            access_token=self._security.create_access_token(user_id),
+            refresh_token=await self._refresh_tokens.issue(user_id),
             token_type="bearer",
             user=self._build_user_response(user),
         )
 
+    async def refresh(self, request: RefreshTokenRequest) -> TokenResponse:
+        """New tokens for a refresh token, with no password verify"""
+        user_id, refresh_token = await self._refresh_tokens.rotate(
+            request.refresh_token
+        )
+        try:
+            profile = await self.get_profile(user_id)
+        except UserNotFoundError:
+            raise InvalidTokenError("Invalid refresh token")
+        return TokenResponse(
+            access_token=self._security.create_access_token(user_id),
+            refresh_token=refresh_token,
+            token_type="bearer",
+            user=profile,
+        )
+
+    async def logout(self, request: RefreshTokenRequest):
+        await self._refresh_tokens.revoke(request.refresh_token)
+
     def _build_user_response(self, user: dict):
         if not user:
             return None
         user["id"] = str(user.pop("_id"))
         user.pop("password", None)
+        user.pop("is_active", None)
         return UserResponse(**user)
 
 
+_user_cache = None
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = TTLCache(
+            "users", settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS
+        )
+    return _user_cache
+
+
+_user_loaders: dict[tuple, BatchLoader] = {}
+
+
+async def _find_users(
+    mongo_client: MongoDBClient, projection: dict | None, ids: list[ObjectId]
+) -> dict:
+    collection = mongo_client.get_collection("users")
+    return {
+        user["_id"]: user
+        async for user in collection.find({"_id": {"$in": ids}}, projection)
+    }
+
+
+def get_user_loader(
+    mongo_client: MongoDBClient, projection: dict | None = None
+) -> BatchLoader:
+    """The process's loader of users by ObjectId, one per client and
+    projection, so lookups only merge with ones against the same database"""
+    key = (mongo_client, tuple(sorted((projection or {}).items())))
+    loader = _user_loaders.get(key)
+    if loader is None:
+        loader = _user_loaders[key] = BatchLoader(
+            "users",
+            functools.partial(_find_users, mongo_client, projection),
+            settings.USER_LOADER_MAX_BATCH,
+        )
+    return loader
+
+
+def _reset_after_fork():
+    global _user_cache
+    _user_cache = None
+    # Queued lookups hold futures of the parent's event loop
+    _user_loaders.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def get_user_service(
     mongo_client: MongoDBClient = Depends(get_mongodb_client),
     security_service: SecurityService = Depends(get_security_service),
+    user_cache: TTLCache = Depends(get_user_cache),
 ):
-    return UserService(mongo_client, security_service)
+    return UserService(mongo_client, security_service, user_cache)
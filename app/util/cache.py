@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from app.core.metrics import registry
+
+_hits = registry.counter("cache_hits", "Cache lookups served from memory", ("cache",))
+_misses = registry.counter("cache_misses", "Cache lookups that missed", ("cache",))
+_evictions = registry.counter(
+    "cache_evictions", "Entries dropped from a cache", ("cache", "reason")
+)
+_size = registry.gauge("cache_size", "Entries currently held in a cache", ("cache",))
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a time-to-live.
+
+    Not thread safe; it is meant to be used from the event loop only. A
+    ``max_size`` of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Bumped on every invalidation so a reader that started before a write
+        # cannot store the value it loaded after the write went through
+        self.generation = 0
+        _size.set_function(lambda: len(self._data), cache=name)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            _misses.inc(cache=self.name)
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            _evictions.inc(cache=self.name, reason="expired")
+            _misses.inc(cache=self.name)
+            return default
+        self._data.move_to_end(key)
+        _hits.inc(cache=self.name)
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: float | None = None,
+        generation: int | None = None,
+    ):
+        """Store ``value``; ``ttl_seconds`` may only shorten the default TTL"""
+        if self.max_size <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        ttl = (
+            self.ttl_seconds
+            if ttl_seconds is None
+            else min(ttl_seconds, self.ttl_seconds)
+        )
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            _evictions.inc(cache=self.name, reason="size")
+
+    def invalidate(self, key: Hashable):
+        self.generation += 1
+        if self._data.pop(key, None) is not None:
+            _evictions.inc(cache=self.name, reason="invalidated")
+
+    def clear(self):
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "size": len(self._data),
+            "hits": _hits.value(cache=self.name),
+            "misses": _misses.value(cache=self.name),
+            "evictions": sum(
+                _evictions.value(cache=self.name, reason=reason)
+                for reason in ("expired", "size", "invalidated")
+            ),
+        }
@@ -0,0 +1,38 @@
+from calendar import monthrange
+from datetime import UTC, datetime
+
+
+def utc_now() -> datetime:
+    """Current UTC time truncated to the millisecond precision Mongo stores"""
+    now = datetime.now(UTC)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    """Treat naive datetimes as UTC so comparisons and ordering stay consistent"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+def month_start(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def next_month_start(value: datetime) -> datetime:
+    start = month_start(value)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Same day ``months`` later, clamped to the end of shorter months"""
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+    return value.replace(
+        year=year, month=month, day=min(value.day, monthrange(year, month)[1])
+    )
@@ -0,0 +1,89 @@
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, status
+from fastapi.responses import Response
+
+from app.util.clock import as_utc
+
+# Responses differ per user, so only the client may keep them, and it must
+# revalidate before each use
+_CACHE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over whatever identifies a representation's version.
+
+    Weak because bodies carry a per-request id: two responses with the
+    same ETag hold the same data, not the same bytes.
+    """
+    digest = hashlib.blake2b(
+        "|".join(map(str, parts)).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag, **_CACHE_HEADERS}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            as_utc(last_modified).astimezone(UTC), usegmt=True
+        )
+    return headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def _unmodified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # HTTP dates have whole seconds
+    return as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: datetime | None = None
+) -> Response | None:
+    """A 304 if the client's copy is current, else None.
+
+    Call it before loading or serializing the body, and pass the same
+    validators to ``with_validators`` on the full response.
+    ``If-None-Match`` wins over ``If-Modified-Since`` when both are sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        current = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        current = (
+            if_modified_since is not None
+            and last_modified is not None
+            and _unmodified_since(if_modified_since, last_modified)
+        )
+    if not current:
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=_validator_headers(etag, last_modified),
+    )
+
+
+def with_validators(
+    response: Response, etag: str, last_modified: datetime | None = None
+) -> Response:
+    response.headers.update(_validator_headers(etag, last_modified))
+    return response
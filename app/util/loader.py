@@ -0,0 +1,108 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any
+
+from app.core.metrics import registry
+
+_lookups = registry.counter(
+    "loader_lookups", "Keys requested from a batch loader", ("loader",)
+)
+_shared = registry.counter(
+    "loader_shared",
+    "Lookups that joined a fetch already queued or running for the key",
+    ("loader",),
+)
+_fetches = registry.counter(
+    "loader_fetches", "Batched fetches a loader issued", ("loader",)
+)
+_fetched = registry.counter(
+    "loader_fetched_keys", "Distinct keys fetched in batches", ("loader",)
+)
+
+
+class BatchLoader:
+    """Coalesces concurrent lookups by key into batched fetches.
+
+    Keys asked for during one event loop iteration are queued and fetched
+    together on the next, by one ``fetch`` call per ``max_batch`` keys. A
+    key already queued or being fetched gets the pending future instead of
+    a second fetch. Nothing is kept once a fetch completes: the loader only
+    merges work that overlaps in time, and caching is left to ``TTLCache``.
+    ``loader_lookups`` over ``loader_fetches`` is the coalescing ratio.
+
+    ``fetch`` returns the values found by key; missing keys load as None.
+    Callers share the values, so they must copy before mutating them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[list[Hashable]], Awaitable[dict[Hashable, Any]]],
+        max_batch: int = 100,
+    ):
+        self.name = name
+        self._fetch = fetch
+        self._max_batch = max_batch
+        self._queued: dict[Hashable, asyncio.Future] = {}
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        # Shielded, so a caller giving up does not cancel it for the others
+        return await asyncio.shield(self._future(key))
+
+    async def load_many(self, keys: Iterable[Hashable]) -> dict[Hashable, Any]:
+        """Values of the keys that were found"""
+        futures = {key: self._future(key) for key in keys}
+        values = await asyncio.shield(asyncio.gather(*futures.values()))
+        return {
+            key: value
+            for key, value in zip(futures, values, strict=True)
+            if value is not None
+        }
+
+    def _future(self, key: Hashable) -> asyncio.Future:
+        _lookups.inc(loader=self.name)
+        future = self._queued.get(key)
+        if future is None:
+            future = self._in_flight.get(key)
+        if future is not None:
+            _shared.inc(loader=self.name)
+            return future
+        loop = asyncio.get_running_loop()
+        if not self._queued:
+            loop.call_soon(self._dispatch)
+        future = self._queued[key] = loop.create_future()
+        return future
+
+    def _dispatch(self):
+        keys = list(self._queued)
+        self._in_flight.update(self._queued)
+        self._queued = {}
+        for start in range(0, len(keys), self._max_batch):
+            # The fetch runs in the context of the first caller's request, so
+            # its database operations are counted against that request
+            task = asyncio.get_running_loop().create_task(
+                self._run(keys[start : start + self._max_batch])
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: list[Hashable]):
+        _fetches.inc(loader=self.name)
+        _fetched.inc(len(keys), loader=self.name)
+        futures = [self._in_flight[key] for key in keys]
+        try:
+            values = await self._fetch(keys)
+            for key, future in zip(keys, futures):
+                if not future.done():
+                    future.set_result(values.get(key))
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            for key, future in zip(keys, futures):
+                del self._in_flight[key]
+                # Still pending only if the fetch itself was cancelled
+                future.cancel()
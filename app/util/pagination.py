@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.core.exceptions import ValidationError
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"d": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"o": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "d" in value:
+            return datetime.fromisoformat(value["d"])
+        if "o" in value:
+            return ObjectId(value["o"])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(*values) -> str:
+    """Pack the sort key of the last returned item into an opaque cursor"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Unpack a cursor made by ``encode_cursor`` holding ``size`` values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("Unexpected cursor shape")
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError, InvalidId):
+        raise ValidationError({"details": "Invalid pagination cursor"})
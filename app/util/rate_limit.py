@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from app.core.metrics import registry
+
+_rejected = registry.counter(
+    "rate_limit_rejected", "Requests rejected by a rate limiter", ("limiter",)
+)
+_evictions = registry.counter(
+    "rate_limit_evictions", "Refilled buckets dropped to make room", ("limiter",)
+)
+_overflows = registry.counter(
+    "rate_limit_overflows",
+    "Requests of new keys charged to the overflow bucket of a full limiter",
+    ("limiter",),
+)
+_size = registry.gauge(
+    "rate_limit_buckets", "Buckets currently held by a limiter", ("limiter",)
+)
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "overflow")
+
+    def __init__(self, burst: int):
+        self.lock = threading.Lock()
+        # key -> [tokens, last refill timestamp], least recently used first
+        self.buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+        # Shared by keys that arrive while every bucket is still draining
+        self.overflow = [float(burst), time.monotonic()]
+
+
+class TokenBucketLimiter:
+    """In-process token-bucket rate limiter keyed by an arbitrary value.
+
+    Each key gets a bucket of ``burst`` tokens refilled at ``per_second``;
+    a request takes one token or is rejected. Keys are spread over shards,
+    each with its own lock and bound, so checks are O(1), stay cheap under
+    contention and memory never exceeds ``max_keys`` buckets.
+
+    Only buckets that have refilled completely are dropped to make room, as
+    a new bucket for their key would be the same. Buckets are kept least
+    recently used first, so when the oldest has not refilled none has; a
+    new key then shares its shard's overflow bucket instead of getting a
+    fresh burst. Flooding a limiter with keys therefore throttles new keys
+    rather than resetting the ones being limited.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        burst: int,
+        per_second: float,
+        max_keys: int,
+        shards: int = 16,
+    ):
+        self.name = name
+        self.burst = burst
+        self.per_second = per_second
+        self._shards = [_Shard(burst) for _ in range(shards)]
+        self._shard_size = max(1, max_keys // shards)
+        _size.set_function(lambda: len(self), limiter=name)
+
+    def __len__(self):
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token for ``key``.
+
+        Returns 0 when the request may go ahead, otherwise the seconds until
+        the bucket holds a token again.
+        """
+        now = time.monotonic()
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = self._new_bucket(shard, key, now)
+            else:
+                shard.buckets.move_to_end(key)
+                self._refill(bucket, now)
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            missing = 1 - bucket[0]
+        _rejected.inc(limiter=self.name)
+        return missing / self.per_second
+
+    def _new_bucket(self, shard: _Shard, key: Hashable, now: float) -> list[float]:
+        buckets = shard.buckets
+        while len(buckets) >= self._shard_size:
+            oldest = next(iter(buckets.values()))
+            if oldest[0] + (now - oldest[1]) * self.per_second < self.burst:
+                break
+            buckets.popitem(last=False)
+            _evictions.inc(limiter=self.name)
+        if len(buckets) < self._shard_size:
+            bucket = buckets[key] = [float(self.burst), now]
+            return bucket
+        _overflows.inc(limiter=self.name)
+        self._refill(shard.overflow, now)
+        return shard.overflow
+
+    def _refill(self, bucket: list[float], now: float):
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+        bucket[1] = now
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+                shard.overflow = [float(self.burst), time.monotonic()]
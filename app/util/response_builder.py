@@ -1,15 +1,37 @@
 from typing import Any
 
-from fastapi import Request
+from fastapi import Request, status
+from fastapi.responses import Response
+from pydantic import BaseModel
 
 from app.models.response_model import SuccessResponse
 
 
+class ModelJSONResponse(Response):
+    """JSON response rendered straight from a Pydantic model in a single pass.
+
+    Returning a Response skips FastAPI's ``response_model`` handling, which
+    would otherwise validate the payload again and serialize it through a
+    separate encoder.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.__pydantic_serializer__.to_json(content, by_alias=True)
+
+
 def build_success_response(
-    request: Request, data: Any = None, message: str = "Operation successful"
+    request: Request,
+    data: Any = None,
+    message: str = "Operation successful",
+    status_code: int = status.HTTP_200_OK,
 ):
-    return SuccessResponse(
+    # Unparametrized, so `data` is taken as-is; the models inside it serialize
+    # with their own schema
+    envelope = SuccessResponse(
         data=data,
         message=message,
         request_id=getattr(request.state, "request_id", None),
     )
+    return ModelJSONResponse(envelope, status_code=status_code)
@@ -0,0 +1,135 @@
+import codecs
+import csv
+import re
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+# Longest line, CSV record or OFX transaction block we are willing to buffer
+MAX_RECORD_LENGTH = 64 * 1024
+_OFX_BLOCK = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+class StatementParseError(Exception):
+    """Raised when an uploaded statement cannot be parsed any further"""
+
+
+async def iter_text(
+    chunks: AsyncIterator[bytes], encoding: str = "utf-8"
+) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally, keeping multi-byte characters whole"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_length: int = MAX_RECORD_LENGTH
+) -> AsyncIterator[str]:
+    """Split a decoded stream into lines, refusing any over ``max_length``.
+
+    A file with CR-only line endings is one long line, so without the cap it
+    would be buffered whole.
+    """
+    pending = ""
+    async for text in iter_text(chunks):
+        pending += text
+        *lines, pending = pending.split("\n")
+        if len(pending) > max_length or any(len(line) > max_length for line in lines):
+            raise StatementParseError(
+                f"Line longer than {max_length} characters; "
+                "lines must end with LF or CRLF"
+            )
+        for line in lines:
+            yield line.rstrip("\r")
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_csv_rows(
+    chunks: AsyncIterator[bytes], max_length: int = MAX_RECORD_LENGTH
+) -> AsyncIterator[tuple[int, dict[str, str]]]:
+    """Yield ``(row_number, row)`` from a CSV stream with a header line.
+
+    Lines are joined until their quotes balance, so quoted fields may contain
+    newlines, and each record is parsed on its own; only one record of at
+    most ``max_length`` characters is held in memory at a time, which also
+    stops an unbalanced quote from swallowing the rest of the file.
+    """
+    header: list[str] | None = None
+    record = ""
+    row_number = 0
+    async for line in iter_lines(chunks, max_length):
+        record = f"{record}\n{line}" if record else line
+        if len(record) > max_length:
+            raise StatementParseError(
+                f"Record longer than {max_length} characters; "
+                "is a quoted field left open?"
+            )
+        if record.count('"') % 2:
+            continue
+        if not record.strip():
+            record = ""
+            continue
+        values = next(csv.reader([record]))
+        record = ""
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        row_number += 1
+        yield row_number, dict(zip(header, (v.strip() for v in values)))
+    if record:
+        raise StatementParseError("Unterminated quoted field at end of file")
+
+
+def _parse_ofx_date(value: str) -> str:
+    # DTPOSTED is YYYYMMDD[HHMMSS[.XXX][[offset:TZ]]]; only the date is required
+    digits = value.strip()[:14]
+    if len(digits) == 14 and digits.isdigit():
+        posted = datetime.strptime(digits, "%Y%m%d%H%M%S")
+    else:
+        posted = datetime.strptime(digits[:8], "%Y%m%d")
+    return posted.replace(tzinfo=UTC).isoformat()
+
+
+def _ofx_row(block: str) -> dict[str, str]:
+    fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(block)}
+    row = {
+        "amount": fields.get("TRNAMT", ""),
+        "merchant": fields.get("NAME") or None,
+        "description": fields.get("MEMO") or fields.get("NAME") or None,
+        "external_id": fields.get("FITID") or None,
+    }
+    try:
+        row["date"] = _parse_ofx_date(fields.get("DTPOSTED", ""))
+    except ValueError:
+        row["date"] = fields.get("DTPOSTED", "")
+    return row
+
+
+async def iter_ofx_rows(
+    chunks: AsyncIterator[bytes], max_length: int = MAX_RECORD_LENGTH
+) -> AsyncIterator[tuple[int, dict[str, str]]]:
+    """Yield ``(row_number, row)`` for each <STMTTRN> block of an OFX stream"""
+    buffer = ""
+    row_number = 0
+    async for text in iter_text(chunks, "latin-1"):
+        buffer += text
+        end = 0
+        for match in _OFX_BLOCK.finditer(buffer):
+            row_number += 1
+            yield row_number, _ofx_row(match.group(1))
+            end = match.end()
+        buffer = buffer[end:]
+        # Drop header and statement noise before the next transaction block
+        start = buffer.upper().find("<STMTTRN>")
+        buffer = buffer[start:] if start >= 0 else buffer[-len("<STMTTRN>") :]
+        if len(buffer) > max_length:
+            raise StatementParseError(
+                f"OFX transaction block longer than {max_length} characters"
+            )
@@ -26,7 +26,7 @@ def check_password_strength(value: SecretStr | None):
         raise ValidationError(
             {"details": "Password must contain at least one uppercase letter"}
         )
-    if not re.search(rf"{punctuation}", password):
+    if not re.search(rf"[{re.escape(punctuation)}]", password):
         raise ValidationError(
             {"details": "Password must contain at least one special character"}
         )
@@ -0,0 +1,418 @@
+"""Load and latency benchmark for the API, driven in-process over ASGI.
+
+Run with ``python -m benchmarks.bench_api [--concurrency 1,8,32]``. The real
+``create_app()`` app, middleware and lifespan included, is called directly
+over ASGI with Mongo replaced by the in-memory stand-in from
+``benchmarks.mongo_standin``. Password hashing, JWTs and the caches are the
+real ones, so register and login are dominated by bcrypt by design.
+
+For every scenario and concurrency level it reports the best of ``--repeat``
+runs: throughput, p50/p95/p99 latency and Mongo operations per request.
+``--save-baseline`` stores the results; later runs compare against the
+baseline and exit non-zero when a scenario's median latency, throughput or
+Mongo operations per request are more than ``--threshold`` worse (the tail
+percentiles of sub-millisecond requests are too noisy to gate on).
+Baselines are machine specific: record one on the machine that checks it.
+
+Operation counts do not depend on the machine, so each scenario also
+declares the most Mongo operations a request may make; every run, saving a
+baseline included, fails when one goes over.
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+
+import app.db.mongodb as mongodb
+from app.core.config import settings
+from app.main import create_app
+from benchmarks.asgi_client import call
+from benchmarks.mongo_standin import StandInMongoClient
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "bench_api.json"
+_PASSWORD = "Bench!mark1"
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    expected_status: int = 200
+    # Builds the request body from the request number
+    body: Callable[[int], dict] | None = None
+    query: Callable[["BenchContext"], str] = lambda context: ""
+    headers: dict[str, str] = field(default_factory=dict)
+    authenticated: bool = True
+    # Share of --requests; bcrypt-bound scenarios run fewer
+    scale: float = 1.0
+    # Most Mongo operations per request, on average
+    max_db_ops: float = 1.0
+
+
+@dataclass
+class BenchContext:
+    headers: dict[str, str] = field(default_factory=dict)
+    deep_cursor: str = ""
+
+
+@dataclass
+class Result:
+    requests: int
+    seconds: float
+    latencies: list[float]
+    db_operations: int
+
+    def summary(self) -> dict:
+        cuts = statistics.quantiles(self.latencies, n=100, method="inclusive")
+        return {
+            "rps": round(self.requests / self.seconds, 1),
+            "p50_ms": round(cuts[49] * 1000, 3),
+            "p95_ms": round(cuts[94] * 1000, 3),
+            "p99_ms": round(cuts[98] * 1000, 3),
+            "db_ops": round(self.db_operations / self.requests, 2),
+        }
+
+
+def _scenarios() -> list[Scenario]:
+    return [
+        Scenario(
+            "register",
+            "POST",
+            "/api/v1/users/register",
+            expected_status=201,
+            body=lambda i: {
+                "full_name": "Bench User",
+                "email": f"bench-{i}-{ObjectId()}@example.com",
+                "password": _PASSWORD,
+            },
+            authenticated=False,
+            scale=0.05,
+        ),
+        # The user lookup and the refresh token family insert
+        Scenario(
+            "login",
+            "POST",
+            "/api/v1/users/login",
+            body=lambda i: {"email": "bench@example.com", "password": _PASSWORD},
+            authenticated=False,
+            scale=0.05,
+            max_db_ops=2,
+        ),
+        # Served from the user cache
+        Scenario("me", "GET", "/api/v1/users/me", max_db_ops=0),
+        # A client revalidating its copy; "*" matches whatever the ETag is
+        Scenario(
+            "me_not_modified",
+            "GET",
+            "/api/v1/users/me",
+            expected_status=304,
+            headers={"If-None-Match": "*"},
+            max_db_ops=0,
+        ),
+        # The find-and-modify, then reloading the user the update evicted
+        # from the cache unless a concurrent request already did
+        Scenario(
+            "me_update",
+            "PUT",
+            "/api/v1/users/me/update",
+            body=lambda i: {"full_name": f"Bench User {i % 10}"},
+            max_db_ops=2,
+        ),
+        Scenario("transactions_list", "GET", "/api/v1/transactions"),
+        Scenario(
+            "transactions_deep_page",
+            "GET",
+            "/api/v1/transactions",
+            query=lambda context: f"cursor={context.deep_cursor}",
+        ),
+        Scenario("accounts_list", "GET", "/api/v1/accounts"),
+        Scenario(
+            "monthly_report",
+            "GET",
+            "/api/v1/reports/monthly",
+            query=lambda context: "start_month=2023-01&end_month=2024-12",
+        ),
+    ]
+
+
+async def _request(app, scenario: Scenario, context: BenchContext, i: int):
+    body = json.dumps(scenario.body(i)).encode() if scenario.body else b""
+    headers = context.headers if scenario.authenticated else {}
+    headers = {**headers, **scenario.headers} or None
+    return await call(
+        app, scenario.method, scenario.path, body, headers, scenario.query(context)
+    )
+
+
+async def _seed(app, client: StandInMongoClient, transactions: int) -> BenchContext:
+    context = BenchContext()
+    user = {"full_name": "Bench User", "email": "bench@example.com"}
+    await call(
+        app,
+        "POST",
+        "/api/v1/users/register",
+        json.dumps({**user, "password": _PASSWORD}).encode(),
+    )
+    response = await call(
+        app,
+        "POST",
+        "/api/v1/users/login",
+        json.dumps({"email": user["email"], "password": _PASSWORD}).encode(),
+    )
+    login = json.loads(response.body)["data"]
+    context.headers = {"Authorization": f"Bearer {login['access_token']}"}
+    owner = ObjectId(login["user"]["_id"])
+
+    for name in ("Checking", "Savings", "Credit card"):
+        await call(
+            app,
+            "POST",
+            "/api/v1/accounts",
+            json.dumps({"name": name}).encode(),
+            context.headers,
+        )
+    # Straight into the stand-in: the list endpoints only need the documents
+    start = datetime(2023, 1, 1, tzinfo=UTC)
+    now = datetime.now(UTC)
+    await client.get_collection("transactions").insert_many(
+        [
+            {
+                "user_id": owner,
+                "amount": 10.0 + i % 90,
+                "type": "expense" if i % 4 else "income",
+                "category": ("groceries", "rent", "travel", "salary")[i % 4],
+                "description": f"Bench transaction {i}",
+                "merchant": None,
+                "date": start + timedelta(hours=6 * i),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(transactions)
+        ]
+    )
+    await client.get_collection("category_rollups").insert_many(
+        [
+            {
+                "user_id": owner,
+                "month": f"{2023 + m // 12}-{m % 12 + 1:02d}",
+                "category": category,
+                "income": 100.0,
+                "expense": 50.0,
+                "count": 3,
+            }
+            for m in range(24)
+            for category in ("groceries", "rent", "travel", "salary")
+        ]
+    )
+
+    # Cursor of the tenth page, for the deep-pagination scenario
+    query = ""
+    for _ in range(10):
+        response = await call(
+            app, "GET", "/api/v1/transactions", headers=context.headers, query=query
+        )
+        cursor = json.loads(response.body)["data"]["next_cursor"]
+        if cursor is None:
+            break
+        query = f"cursor={cursor}"
+    context.deep_cursor = query.removeprefix("cursor=")
+    return context
+
+
+async def _run_scenario(
+    app, scenario: Scenario, context: BenchContext, total: int, concurrency: int
+) -> Result:
+    # Warm-up requests are not measured
+    for i in range(min(5, total)):
+        await _request(app, scenario, context, -1 - i)
+    # Start every run from the same collector state so runs stay comparable
+    gc.collect()
+
+    latencies: list[float] = []
+    db_operations = 0
+    numbers = itertools.count()
+
+    async def worker():
+        nonlocal db_operations
+        while (i := next(numbers)) < total:
+            start = time.perf_counter()
+            response = await _request(app, scenario, context, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status != scenario.expected_status:
+                raise SystemExit(
+                    f"{scenario.name}: HTTP {response.status} {response.body[:200]!r}"
+                )
+            db_operations += int(response.headers.get("x-db-operations", 0))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return Result(total, time.perf_counter() - start, latencies, db_operations)
+
+
+def _compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        slower = current["p50_ms"] / previous["p50_ms"] - 1
+        if slower > threshold:
+            regressions.append(
+                f"{key}: p50 {previous['p50_ms']:.2f} -> {current['p50_ms']:.2f} ms "
+                f"(+{slower:.0%})"
+            )
+        fewer = previous["rps"] / current["rps"] - 1
+        if fewer > threshold:
+            regressions.append(
+                f"{key}: throughput {previous['rps']:.0f} -> {current['rps']:.0f} "
+                f"req/s (-{1 - current['rps'] / previous['rps']:.0%})"
+            )
+        if current["db_ops"] > previous["db_ops"] * (1 + threshold):
+            regressions.append(
+                f"{key}: Mongo ops {previous['db_ops']:.2f} -> "
+                f"{current['db_ops']:.2f} per request"
+            )
+    return regressions
+
+
+def _over_budget(results: dict) -> list[str]:
+    budgets = {scenario.name: scenario.max_db_ops for scenario in _scenarios()}
+    overruns = []
+    for key, summary in results.items():
+        budget = budgets[key.partition("@")[0]]
+        if summary["db_ops"] > budget:
+            overruns.append(
+                f"{key}: {summary['db_ops']:.2f} Mongo ops per request, "
+                f"budget {budget:g}"
+            )
+    return overruns
+
+
+async def _run(args) -> dict:
+    # The login scenario measures bcrypt, not the throttle in front of it
+    # (benchmarks.bench_login_throttle covers that)
+    settings.LOGIN_RATE_LIMIT_IP_BURST = 0
+    settings.LOGIN_RATE_LIMIT_EMAIL_BURST = 0
+    # Nothing recurs in the seeded data; keep its lease writes out of the numbers
+    settings.RECURRING_SCHEDULER_ENABLED = False
+    client = StandInMongoClient(latency=args.db_latency_ms / 1000)
+    # Services resolve the client through this singleton
+    mongodb._mongodb_client = client
+    app = create_app()
+    scenarios = [
+        s for s in _scenarios() if not args.scenarios or s.name in args.scenarios
+    ]
+    results = {}
+    async with app.router.lifespan_context(app):
+        context = await _seed(app, client, args.seed_transactions)
+        # The seeded documents live for the whole run; keep them out of the
+        # collector's way as a long-running process would
+        gc.collect()
+        gc.freeze()
+        print(
+            f"{'scenario':<24}{'conc':>5}{'req':>7}{'req/s':>10}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'db ops':>8}"
+        )
+        for scenario in scenarios:
+            total = max(20, int(args.requests * scenario.scale))
+            for concurrency in args.concurrency:
+                # Best of --repeat runs: noise only ever makes a run slower
+                summary = min(
+                    [
+                        (
+                            await _run_scenario(
+                                app, scenario, context, total, concurrency
+                            )
+                        ).summary()
+                        for _ in range(args.repeat)
+                    ],
+                    key=lambda summary: summary["p50_ms"],
+                )
+                results[f"{scenario.name}@{concurrency}"] = summary
+                print(
+                    f"{scenario.name:<24}{concurrency:>5}{total:>7}"
+                    f"{summary['rps']:>10.1f}{summary['p50_ms']:>9.2f}"
+                    f"{summary['p95_ms']:>9.2f}{summary['p99_ms']:>9.2f}"
+                    f"{summary['db_ops']:>8.1f}"
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per scenario, best one kept"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(c) for c in value.split(",")],
+        default=[1, 8, 32],
+        help="Comma-separated concurrency levels to sweep",
+    )
+    parser.add_argument("--scenarios", nargs="*", help="Only run these scenarios")
+    parser.add_argument("--seed-transactions", type=int, default=2000)
+    parser.add_argument(
+        "--db-latency-ms", type=float, default=0.0, help="Added per Mongo round trip"
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store results as the baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.3,
+        help="Allowed slowdown before a scenario counts as a regression",
+    )
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+
+    results = asyncio.run(_run(args))
+    overruns = _over_budget(results)
+    if overruns:
+        print("Mongo operation budgets exceeded:", *overruns, sep="\n  ")
+        sys.exit(1)
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        baseline = {
+            "recorded_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "requests": args.requests,
+            "db_latency_ms": args.db_latency_ms,
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    regressions = _compare(
+        results, json.loads(args.baseline.read_text()), args.threshold
+    )
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}:", *regressions, sep="\n  ")
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Budget evaluation throughput and memory on a million budget lines.
+
+Run with ``python -m benchmarks.bench_budgets [--lines 1000000]``. Stand-in
+collections generate budgets and their month's rollups lazily (five budgets
+per user), so only the evaluator itself can hold memory. The job is run once
+on ``--baseline-lines`` and once on ``--lines`` with the same chunk size; it
+fails if the traced peak of the large run is more than ``--max-growth`` times
+the small one, i.e. if memory follows the number of budgets instead of the
+chunk size. An untraced run reports throughput, and the vectorized chunk
+evaluation is timed against the same arithmetic done line by line.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import numpy as np
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.budget_evaluation import BudgetEvaluator, evaluate_chunk
+
+_CATEGORIES = ("groceries", "rent", "travel", "dining", "utilities")
+_MONTH = "2026-03"
+_NOW = datetime(2026, 3, 20, tzinfo=UTC)
+
+
+def _user(number: int) -> ObjectId:
+    return ObjectId(f"{number:024x}")
+
+
+def _spent(user: ObjectId, category: int) -> float:
+    # Spread from 0% to ~150% of the 100.0 limit so every alert path fires
+    return float((int(str(user), 16) * 7 + category * 31) % 150)
+
+
+class _BudgetCursor:
+    def __init__(self, lines: int):
+        self._lines = lines
+        self._batch = 1000
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, size: int):
+        self._batch = size
+        return self
+
+    async def close(self):
+        pass
+
+    async def __aiter__(self):
+        for i in range(self._lines):
+            if i % self._batch == 0:
+                # Stands in for the getMore round trip between batches
+                await asyncio.sleep(0)
+            yield {
+                "_id": ObjectId(f"{i + 1:024x}"),
+                "user_id": _user(i // len(_CATEGORIES)),
+                "category": _CATEGORIES[i % len(_CATEGORIES)],
+                "limit": 100.0,
+            }
+
+
+class _RollupCursor:
+    def __init__(self, users: list[ObjectId]):
+        self._users = users
+
+    async def __aiter__(self):
+        await asyncio.sleep(0)
+        for user in self._users:
+            for index, category in enumerate(_CATEGORIES):
+                yield {
+                    "user_id": user,
+                    "category": category,
+                    "expense": _spent(user, index),
+                }
+
+
+class _StandInCollection:
+    def __init__(self, name: str, lines: int):
+        self.name = name
+        self._lines = lines
+        self.writes = 0
+
+    def find(self, query, projection=None):
+        if self.name == "budgets":
+            return _BudgetCursor(self._lines)
+        return _RollupCursor(query["user_id"]["$in"])
+
+    async def bulk_write(self, operations, ordered=True):
+        await asyncio.sleep(0)
+        self.writes += len(operations)
+        return SimpleNamespace(upserted_count=len(operations))
+
+
+class _StandInClient:
+    def __init__(self, lines: int):
+        self.collections = {
+            name: _StandInCollection(name, lines)
+            for name in ("budgets", "category_rollups", "budget_alerts")
+        }
+
+    def get_collection(self, name):
+        return self.collections[name]
+
+
+async def _evaluate(lines: int, chunk_size: int, traced: bool):
+    client = _StandInClient(lines)
+    evaluator = BudgetEvaluator(client, chunk_size=chunk_size)
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    summary = await evaluator.evaluate(_MONTH, _NOW)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if traced:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if summary.budgets != lines:
+        raise SystemExit(f"Evaluated {summary.budgets} budgets, expected {lines}")
+    return summary, elapsed, peak
+
+
+def _per_line(spent: list[float], limits: list[float], elapsed: float, thresholds):
+    results = []
+    for used, limit in zip(spent, limits):
+        ratio = used / limit
+        projected = used / elapsed
+        level = sum(1 for threshold in thresholds if ratio >= threshold)
+        results.append((ratio, projected, level, projected >= limit > used))
+    return results
+
+
+def _compare_arithmetic(chunk_size: int, repeat: int = 20) -> tuple[float, float]:
+    rng = np.random.default_rng(1)
+    spent = rng.uniform(0, 150, chunk_size)
+    limits = np.full(chunk_size, 100.0)
+    thresholds = np.array(sorted(settings.BUDGET_ALERT_THRESHOLDS))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        evaluate_chunk(spent, limits, 0.6, thresholds)
+    vectorized = (time.perf_counter() - start) / repeat
+    spent_list, limits_list = spent.tolist(), limits.tolist()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _per_line(spent_list, limits_list, 0.6, thresholds.tolist())
+    looped = (time.perf_counter() - start) / repeat
+    return vectorized, looped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--baseline-lines", type=int, default=50_000)
+    parser.add_argument(
+        "--chunk-size", type=int, default=settings.BUDGET_EVALUATION_CHUNK_SIZE
+    )
+    parser.add_argument("--max-growth", type=float, default=1.5)
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+
+    summary, elapsed, _ = asyncio.run(_evaluate(args.lines, args.chunk_size, False))
+    _, _, small_peak = asyncio.run(
+        _evaluate(args.baseline_lines, args.chunk_size, True)
+    )
+    _, _, peak = asyncio.run(_evaluate(args.lines, args.chunk_size, True))
+    vectorized, looped = _compare_arithmetic(args.chunk_size)
+    growth = peak / small_peak
+
+    print(f"budget lines     : {args.lines:,} in {summary.chunks:,} chunks")
+    print(f"alert writes     : {summary.alerts:,}")
+    print(f"throughput       : {args.lines / elapsed:,.0f} lines/s ({elapsed:.1f}s)")
+    print(f"peak traced      : {peak / 2**20:,.1f} MiB")
+    print(
+        f"vs {args.baseline_lines:,} lines : {small_peak / 2**20:,.1f} MiB "
+        f"(x{growth:.2f})"
+    )
+    print(
+        f"chunk arithmetic : {vectorized * 1000:.2f} ms vectorized, "
+        f"{looped * 1000:.2f} ms per line ({looped / vectorized:.0f}x)"
+    )
+    if growth > args.max_growth:
+        raise SystemExit(f"Peak memory grew more than x{args.max_growth} with lines")
+
+
+if __name__ == "__main__":
+    main()
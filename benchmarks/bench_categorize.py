@@ -0,0 +1,152 @@
+"""Categorization of imported rows against thousands of rules.
+
+Run with ``python -m benchmarks.bench_categorize [--rules 5000 --rows 100000]``.
+``--rules`` synthetic rules (a quarter of them global, a fifth limited to
+the merchant or description) are compiled into a ``Categorizer``, which
+then categorizes ``--rows`` statement rows in import-sized batches. A fifth
+of the rows carry no pattern, though short patterns may still turn up in
+their random words. The same rows are categorized on a ``--sample`` by
+trying each rule's regex in turn, best rule first, which is the
+straightforward rules x rows approach; both must agree, and the run fails
+if the compiled matcher is not at least ``--min-speedup`` times faster.
+"""
+
+import argparse
+import logging
+import re
+import time
+
+import numpy as np
+from bson import ObjectId
+
+from app.core.config import settings
+from app.models.category_rule_model import RuleField
+from app.services.categorizer import Categorizer
+
+_SYLLABLES = "ka lo mi re su ta ne vo pi da zu be ko ra fi mo".split()
+_NOISE = ["pos", "card", "purchase", "ref", "online", "payment", "*", "#"]
+
+
+def _word(rng) -> str:
+    return "".join(rng.choice(_SYLLABLES, rng.integers(2, 5)).tolist())
+
+
+def _rules(count: int, rng) -> list[dict]:
+    owner = ObjectId()
+    fields = [RuleField.ANY] * 8 + [RuleField.MERCHANT, RuleField.DESCRIPTION]
+    patterns: dict[str, None] = {}
+    while len(patterns) < count:
+        words = [_word(rng) for _ in range(rng.integers(1, 3))]
+        patterns[" ".join(words)] = None
+    return [
+        {
+            "pattern": pattern,
+            "category": f"category-{rng.integers(0, 200)}",
+            "field": fields[rng.integers(0, len(fields))],
+            "user_id": None if rng.random() < 0.25 else owner,
+        }
+        for pattern in patterns
+    ]
+
+
+def _rows(count: int, rules: list[dict], rng) -> list[dict]:
+    rows = []
+    for _ in range(count):
+        noise = " ".join(rng.choice(_NOISE, 2).tolist())
+        merchant = _word(rng).upper()
+        description = f"{noise} {rng.integers(1000, 9999)}"
+        # Most rows carry a rule's pattern in some case and spacing
+        if rng.random() < 0.8:
+            pattern = rules[rng.integers(0, len(rules))]["pattern"]
+            merchant = f"{pattern.upper().replace(' ', '  ')} {merchant}"
+        rows.append(
+            {
+                "merchant": merchant,
+                "description": description,
+                "category": "uncategorized",
+            }
+        )
+    return rows
+
+
+def _regex_each(rules: list[dict], rows: list[dict]) -> list[str]:
+    # Best rule first, in the order the categorizer ranks them
+    ranked = sorted(
+        enumerate(rules),
+        key=lambda item: (
+            item[1]["user_id"] is None,
+            -len(item[1]["pattern"]),
+            item[0],
+        ),
+    )
+    compiled = [
+        (
+            re.compile(r"\s+".join(map(re.escape, rule["pattern"].split())), re.I),
+            rule["field"],
+            rule["category"],
+        )
+        for _, rule in ranked
+    ]
+    categories = []
+    for row in rows:
+        category = "uncategorized"
+        for pattern, field, rule_category in compiled:
+            if (field != RuleField.DESCRIPTION and pattern.search(row["merchant"])) or (
+                field != RuleField.MERCHANT and pattern.search(row["description"])
+            ):
+                category = rule_category
+                break
+        categories.append(category)
+    return categories
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=settings.IMPORT_BATCH_SIZE)
+    parser.add_argument("--sample", type=int, default=500)
+    parser.add_argument("--min-speedup", type=float, default=50.0)
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(5)
+    rules = _rules(args.rules, rng)
+    rows = _rows(args.rows, rules, rng)
+    sample = [dict(row) for row in rows[: args.sample]]
+
+    start = time.perf_counter()
+    categorizer = Categorizer(rules)
+    compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    categorized = 0
+    for offset in range(0, len(rows), args.batch):
+        categorized += len(categorizer.categorize(rows[offset : offset + args.batch]))
+    matched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = _regex_each(rules, sample)
+    looped = (time.perf_counter() - start) / len(sample)
+    if [row["category"] for row in rows[: len(sample)]] != expected:
+        raise SystemExit("Compiled matcher disagrees with the per-rule regexes")
+
+    per_row = matched / args.rows
+    speedup = looped / per_row
+    print(f"compile          : {args.rules:,} rules in {compiled * 1000:.0f} ms")
+    print(
+        f"compiled matcher : {args.rows:,} rows in {matched * 1000:.0f} ms "
+        f"({args.rows / matched / 1000:.0f}k rows/s), {categorized:,} categorized"
+    )
+    print(
+        f"regex per rule   : {looped * 1000:.2f} ms per row "
+        f"({looped * args.rows:.0f}s for {args.rows:,}), x{speedup:.0f} slower"
+    )
+    if speedup < args.min_speedup:
+        raise SystemExit(f"Compiled matcher under x{args.min_speedup} faster")
+
+
+if __name__ == "__main__":
+    main()
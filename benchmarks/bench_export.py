@@ -0,0 +1,135 @@
+"""Streaming export memory and throughput on a synthetic history.
+
+Run with ``python -m benchmarks.bench_export [--rows 1000000]``. A stand-in
+collection generates documents lazily behind a Motor-like cursor, so the only
+thing that could grow with the row count is the export pipeline itself. The
+export is run once on a small history and once on ``--rows``; it fails if the
+traced peak of the large run is more than ``--max-growth`` times the small one.
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.models.transaction_model import ExportFormat
+from app.services.export_service import TransactionExportService
+
+_MERCHANTS = ["Amazon", "Tesco", "Uber", "Netflix", "Shell", "Starbucks", "IKEA"]
+
+
+class _StandInCursor:
+    def __init__(self, rows: int):
+        self._rows = rows
+        self.batch = None
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, size: int):
+        self.batch = size
+        return self
+
+    async def close(self):
+        pass
+
+    async def __aiter__(self):
+        start = datetime(2015, 1, 1, tzinfo=UTC)
+        for i in range(self._rows):
+            if i % self.batch == 0:
+                # Stands in for the getMore round trip between batches
+                await asyncio.sleep(0)
+            yield {
+                "_id": ObjectId(),
+                "date": start + timedelta(minutes=i),
+                "type": "expense" if i % 5 else "income",
+                "amount": round(i % 25_000 / 100 + 0.01, 2),
+                "category": "groceries",
+                "description": f"Card payment #{i}, ref {i * 7}",
+                "merchant": _MERCHANTS[i % len(_MERCHANTS)],
+            }
+
+
+class _StandInCollection:
+    def __init__(self, rows: int):
+        self._rows = rows
+
+    def find(self, query, projection=None):
+        return _StandInCursor(self._rows)
+
+
+class _StandInClient:
+    def __init__(self, rows: int):
+        self._rows = rows
+
+    def get_collection(self, name):
+        return _StandInCollection(self._rows)
+
+
+async def _export(rows: int, format: ExportFormat, compress: bool):
+    service = TransactionExportService(_StandInClient(rows))
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = chunks = 0
+    async for chunk in service.export(str(ObjectId()), format, compress):
+        size += len(chunk)
+        chunks += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, chunks, elapsed, peak
+
+
+async def _check_output(rows: int, format: ExportFormat, compress: bool):
+    service = TransactionExportService(_StandInClient(rows))
+    body = b"".join(
+        [c async for c in service.export(str(ObjectId()), format, compress)]
+    )
+    if compress:
+        body = gzip.decompress(body)
+    lines = body.decode().splitlines()
+    expected = rows + (1 if format == ExportFormat.CSV else 0)
+    if len(lines) != expected:
+        raise SystemExit(f"{format.value}: {len(lines)} lines, expected {expected}")
+
+
+async def _run(rows: int, baseline_rows: int, max_growth: float, compress: bool):
+    failed = False
+    for format in ExportFormat:
+        await _check_output(baseline_rows, format, compress)
+        _, _, _, small_peak = await _export(baseline_rows, format, compress)
+        size, chunks, elapsed, peak = await _export(rows, format, compress)
+        growth = peak / small_peak
+        print(f"[{format.value}{' gzip' if compress else ''}]")
+        print(f"  rows           : {rows:,}")
+        print(f"  bytes          : {size / 2**20:,.1f} MiB in {chunks:,} chunks")
+        print(f"  throughput     : {rows / elapsed:,.0f} rows/s (traced)")
+        print(f"  peak traced    : {peak / 2**10:,.0f} KiB")
+        print(
+            f"  vs {baseline_rows:,} rows : {small_peak / 2**10:,.0f} KiB "
+            f"(x{growth:.2f})"
+        )
+        failed |= growth > max_growth
+    if failed:
+        raise SystemExit(f"Peak memory grew more than x{max_growth} with row count")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=10_000)
+    parser.add_argument("--max-growth", type=float, default=1.5)
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+    asyncio.run(_run(args.rows, args.baseline_rows, args.max_growth, args.gzip))
+
+
+if __name__ == "__main__":
+    main()
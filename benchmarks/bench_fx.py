@@ -0,0 +1,127 @@
+"""Currency conversion of a million amounts through the FX rate table.
+
+Run with ``python -m benchmarks.bench_fx [--amounts 1000000]``. A table of
+daily rates for ``--currencies`` currencies over ``--years`` years is built
+in memory, then ``--amounts`` random amounts (in those currencies and the
+home currency, on random days of the range) are converted with one
+vectorized ``to_home`` call. The same conversion done one amount at a time,
+with a ``bisect`` over per-currency Python lists (the fastest per-amount
+lookup), is timed on ``--sample`` amounts and must agree; the run fails if
+the vectorized path is not at least ``--min-speedup`` times faster per
+amount.
+"""
+
+import argparse
+import bisect
+import logging
+import time
+from datetime import date
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.fx_service import FxRateTable, day_number
+
+_START = date(2016, 1, 1)
+
+
+def _rates(currencies: int, years: int, rng) -> list[tuple[str, int, float]]:
+    first = day_number(_START)
+    days = np.arange(first, first + years * 365)
+    rows = []
+    for index in range(currencies):
+        name = f"C{index:02d}"
+        # A random walk around a per-currency level
+        walk = np.exp(np.cumsum(rng.normal(0, 0.004, len(days))))
+        rows.extend(
+            zip([name] * len(days), days.tolist(), (walk * (index + 1) / 7).tolist())
+        )
+    return rows
+
+
+def _by_currency(rows) -> dict[str, tuple[list[int], list[float]]]:
+    by_currency: dict[str, tuple[list[int], list[float]]] = {}
+    for currency, day, rate in sorted(rows):
+        entry = by_currency.setdefault(currency, ([], []))
+        entry[0].append(day)
+        entry[1].append(rate)
+    return by_currency
+
+
+def _bisect_each(by_currency, home, amounts, currencies, days) -> list[float]:
+    converted = []
+    for amount, currency, day in zip(amounts, currencies, days):
+        if currency == home:
+            converted.append(amount)
+            continue
+        known_days, rates = by_currency[currency]
+        position = max(bisect.bisect_right(known_days, day) - 1, 0)
+        converted.append(amount * rates[position])
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--amounts", type=int, default=1_000_000)
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--sample", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=3.0)
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(7)
+    home = settings.FX_HOME_CURRENCY
+    rows = _rates(args.currencies, args.years, rng)
+    start = time.perf_counter()
+    table = FxRateTable(home, rows)
+    build = time.perf_counter() - start
+
+    names = [home, *(f"C{i:02d}" for i in range(args.currencies))]
+    first = day_number(_START)
+    # Plain lists, as read from transaction documents. A few amounts fall
+    # before the first rate and take the earliest one
+    currencies = [names[i] for i in rng.integers(0, len(names), args.amounts)]
+    days = rng.integers(first - 30, first + args.years * 365 + 30, args.amounts)
+    days = days.tolist()
+    amounts = rng.uniform(1, 500, args.amounts).tolist()
+
+    vectorized = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        converted = table.to_home(amounts, currencies, days)
+        vectorized = min(vectorized, time.perf_counter() - start)
+
+    count = min(args.sample, args.amounts)
+    by_currency = _by_currency(rows)
+    start = time.perf_counter()
+    expected = _bisect_each(
+        by_currency, home, amounts[:count], currencies[:count], days[:count]
+    )
+    looped = (time.perf_counter() - start) / count
+    if not np.allclose(converted[:count], expected, rtol=0, atol=1e-9):
+        raise SystemExit("Vectorized conversion disagrees with the per-amount one")
+
+    per_amount = vectorized / args.amounts
+    speedup = looped / per_amount
+    print(
+        f"rate table       : {len(table):,} rates, {len(table.currencies)} "
+        f"currencies, {table.nbytes / 2**20:.1f} MiB, built in {build * 1000:.0f} ms"
+    )
+    print(
+        f"vectorized       : {args.amounts:,} amounts in {vectorized * 1000:.0f} ms "
+        f"({args.amounts / vectorized / 1e6:.1f}M/s)"
+    )
+    print(
+        f"per amount       : {looped * 1e6:.2f} us each "
+        f"({looped * args.amounts:.1f}s for {args.amounts:,}), x{speedup:.0f} slower"
+    )
+    if speedup < args.min_speedup:
+        raise SystemExit(f"Vectorized conversion under x{args.min_speedup} faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Statement import throughput and peak memory on a synthetic CSV.
+
+Run with ``python -m benchmarks.bench_import [--rows 100000]``. The file is
+generated chunk by chunk and the inserts go to an in-memory sink that only
+counts documents, so the numbers cover parsing, validation, hashing, rollup
+folding and batching, not the database.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import resource
+import time
+from datetime import date, timedelta
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.models.transaction_model import StatementFormat
+from app.services.categorizer import CategoryRules
+from app.services.import_service import StatementImportService
+
+_MERCHANTS = ["Amazon", "Tesco", "Uber", "Netflix", "Shell", "Starbucks", "IKEA"]
+
+
+class _EmptyCursor:
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class _SinkCollection:
+    def __init__(self):
+        self.count = 0
+
+    def find(self, filter=None, projection=None, session=None):
+        # No category rules: rows keep the category in the file
+        return _EmptyCursor()
+
+    async def insert_many(self, documents, ordered=True, session=None):
+        self.count += len(documents)
+
+    async def bulk_write(self, requests, ordered=True, session=None):
+        pass
+
+
+class _SinkClient:
+    def __init__(self):
+        self.collection = _SinkCollection()
+
+    def get_collection(self, name):
+        return self.collection
+
+
+async def _synthetic_csv(rows: int, rows_per_chunk: int = 500):
+    rng = random.Random(42)
+    start = date(2020, 1, 1)
+    yield b"date,amount,description,merchant,category\n"
+    lines = []
+    for i in range(rows):
+        merchant = rng.choice(_MERCHANTS)
+        amount = round(rng.uniform(-250, 250), 2) or 1.0
+        day = start + timedelta(days=i // 50)
+        lines.append(
+            f'{day},{amount},"Card payment #{i}, ref {i * 7}",{merchant},misc\n'
+        )
+        if len(lines) == rows_per_chunk:
+            yield "".join(lines).encode()
+            lines = []
+    if lines:
+        yield "".join(lines).encode()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _run(rows: int):
+    client = _SinkClient()
+    service = StatementImportService(client, CategoryRules(client))
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    summary = await service.import_statement(
+        str(ObjectId()), _synthetic_csv(rows), StatementFormat.CSV
+    )
+    elapsed = time.perf_counter() - start
+    print(f"rows             : {summary.total_rows}")
+    print(f"inserted         : {client.collection.count}")
+    print(f"batches          : {len(summary.batches)}")
+    print(f"elapsed          : {elapsed:.2f}s")
+    print(f"throughput       : {summary.total_rows / elapsed:,.0f} rows/s")
+    print(f"peak RSS         : {_peak_rss_mb():.1f} MiB (before: {rss_before:.1f} MiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+    asyncio.run(_run(args.rows))
+
+
+if __name__ == "__main__":
+    main()
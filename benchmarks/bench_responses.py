@@ -0,0 +1,172 @@
+"""Response serialization cost of the user routes, typed envelope vs legacy.
+
+Run with ``python -m benchmarks.bench_responses [--requests 5000]``. Both apps
+are driven directly over ASGI with stand-in services, so the numbers cover
+routing, validation and serialization only - no hashing, JWTs or database.
+
+- ``current``: the real user router, serializing ``SuccessResponse`` once
+  through ``build_success_response``
+- ``legacy``: the previous behaviour, returning ``SuccessResponse`` with an
+  ``Any`` payload under ``response_model`` so FastAPI validates and encodes
+  it a second time
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import UTC, datetime
+from typing import Annotated, Any
+
+from fastapi import Depends, FastAPI, Request
+from pydantic import BaseModel, Field
+
+from app.api.dependencies import get_current_user
+from app.api.v1.routes_users import router as user_router
+from app.core.config import settings
+from app.models.user_model import TokenResponse, UserCreate, UserLogin, UserResponse
+from app.services.user_service import get_user_service
+from benchmarks.asgi_client import call
+
+_USER = UserResponse(
+    id="6650f0c2a1b2c3d4e5f60718",
+    full_name="Jane Doe",
+    email="jane@example.com",
+    created_at=datetime(2024, 5, 24, 12, 0, tzinfo=UTC),
+    updated_at=datetime(2024, 5, 24, 12, 0, tzinfo=UTC),
+)
+_TOKEN = "eyJhbGciOiJIUzI1NiJ9." + "x" * 120 + ".signature"
+_REFRESH_TOKEN = "6650f0c2a1b2c3d4e5f60719." + "x" * 43
+_REGISTER = json.dumps(
+    {"full_name": "Jane Doe", "email": "jane@example.com", "password": "S3cure!pass"}
+).encode()
+_LOGIN = json.dumps({"email": "jane@example.com", "password": "S3cure!pass"}).encode()
+
+
+class _StandInUserService:
+    async def create(self, user_data: UserCreate):
+        return _USER
+
+    async def authenticate_user(self, user_data: UserLogin):
+        return TokenResponse(
+            access_token=_TOKEN, refresh_token=_REFRESH_TOKEN, user=_USER
+        )
+
+
+# Async so FastAPI calls them inline instead of through the threadpool
+async def _stand_in_user_service():
+    return _StandInUserService()
+
+
+async def _stand_in_current_user():
+    return _USER
+
+
+class _LegacySuccessResponse(BaseModel):
+    success: Annotated[bool, Field(True)]
+    message: Annotated[str | None, Field(None)]
+    data: Annotated[Any, Field(None)]
+    request_id: Annotated[str | None, Field(None)]
+
+
+def _legacy_envelope(request: Request, data: Any, message: str):
+    return _LegacySuccessResponse(
+        data=data,
+        message=message,
+        request_id=getattr(request.state, "request_id", None),
+    )
+
+
+def _legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post(
+        "/api/v1/users/register",
+        response_model=_LegacySuccessResponse,
+        status_code=201,
+    )
+    async def register_user(
+        user_data: UserCreate,
+        request: Request,
+        user_service: _StandInUserService = Depends(get_user_service),
+    ):
+        new_user = await user_service.create(user_data)
+        return _legacy_envelope(request, new_user, "User created successfully")
+
+    @app.post("/api/v1/users/login", response_model=_LegacySuccessResponse)
+    async def login_user(
+        user_data: UserLogin,
+        request: Request,
+        user_service: _StandInUserService = Depends(get_user_service),
+    ):
+        result = await user_service.authenticate_user(user_data)
+        return _legacy_envelope(request, dict(result), "User Authenticated")
+
+    @app.get("/api/v1/users/me", response_model=UserResponse)
+    async def get_current_user_profile(
+        current_user: UserResponse = Depends(get_current_user),
+    ):
+        return current_user
+
+    app.dependency_overrides[get_user_service] = _stand_in_user_service
+    app.dependency_overrides[get_current_user] = _stand_in_current_user
+    return app
+
+
+def _current_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(user_router, prefix="/api/v1")
+    app.dependency_overrides[get_user_service] = _stand_in_user_service
+    app.dependency_overrides[get_current_user] = _stand_in_current_user
+    return app
+
+
+async def _measure(app: FastAPI, method: str, path: str, body: bytes, n: int):
+    # Warm up routing and the schema caches
+    for _ in range(50):
+        await call(app, method, path, body)
+    size = 0
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(n):
+        response = await call(app, method, path, body)
+        size += len(response.body)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return response.status, response.body, cpu / n * 1e6, size / wall
+
+
+async def _run(n: int):
+    apps = {"legacy": _legacy_app(), "current": _current_app()}
+    routes = [
+        ("register", "POST", "/api/v1/users/register", _REGISTER),
+        ("login", "POST", "/api/v1/users/login", _LOGIN),
+        ("me", "GET", "/api/v1/users/me", b""),
+    ]
+    print(f"{'route':<10}{'app':<9}{'status':>7}{'CPU/request':>14}{'throughput':>14}")
+    for name, method, path, body in routes:
+        results = {}
+        for label, app in apps.items():
+            results[label] = await _measure(app, method, path, body, n)
+            status, _, cpu_us, rate = results[label]
+            print(
+                f"{name:<10}{label:<9}{status:>7}{cpu_us:>11.1f} us"
+                f"{rate / 2**20:>10.2f} MiB/s"
+            )
+        if json.loads(results["legacy"][1]) != json.loads(results["current"][1]):
+            raise SystemExit(f"{name}: response bodies differ")
+        speedup = results["legacy"][2] / results["current"][2]
+        print(f"{'':<10}CPU per request x{speedup:.2f} faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+    asyncio.run(_run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
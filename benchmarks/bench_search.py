@@ -0,0 +1,164 @@
+"""Search latency over one synthetic user with 500k transactions.
+
+Run with ``python -m benchmarks.bench_search [--transactions 500000]``. The
+user's history is generated in memory (Zipf-distributed merchants and
+description words) and indexed with ``UserSearchIndex`` as the first search
+would. Each query shape below is then run ``--repeat`` times, and its p50 and
+p95 are reported next to a case-insensitive regex scan over every document,
+which is what an unindexed ``$regex`` find has to do. The run fails if any
+query's p95 is above ``--target-ms``.
+"""
+
+import argparse
+import logging
+import re
+import statistics
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.search_index import SearchFilters, UserSearchIndex
+
+_SYLLABLES = "ka lo mi re su ta ne vo pi da zu be ko ra fi mo".split()
+_KNOWN_MERCHANTS = ["Amazon", "Amazon Marketplace", "Uber", "Uber Eats", "Starbucks"]
+_START = datetime(2016, 1, 1, tzinfo=UTC)
+
+
+def _words(rng, count: int) -> list[str]:
+    return [
+        "".join(rng.choice(_SYLLABLES, rng.integers(2, 5)).tolist())
+        for _ in range(count)
+    ]
+
+
+def _zipf(rng, size: int, count: int) -> np.ndarray:
+    return (rng.zipf(1.3, count) - 1) % size
+
+
+def _transactions(count: int, rng) -> list[dict]:
+    merchants = _KNOWN_MERCHANTS + [w.title() for w in _words(rng, 2000)]
+    vocabulary = ["coffee", "trip", "order", "books", "prime"] + _words(rng, 5000)
+    merchant_of = _zipf(rng, len(merchants), count)
+    lengths = rng.integers(1, 5, count)
+    word_of = _zipf(rng, len(vocabulary), int(lengths.sum()))
+    amounts = np.round(rng.lognormal(3, 1, count), 2)
+    minutes = np.sort(rng.integers(0, 10 * 365 * 24 * 60, count))
+    transactions, position = [], 0
+    for i in range(count):
+        words = word_of[position : position + lengths[i]]
+        position += lengths[i]
+        date = _START + timedelta(minutes=int(minutes[i]))
+        transactions.append(
+            {
+                # Generation time then a counter, so ids are unique
+                "_id": ObjectId(
+                    int(date.timestamp()).to_bytes(4, "big") + i.to_bytes(8, "big")
+                ),
+                "description": " ".join(vocabulary[w] for w in words),
+                "merchant": merchants[merchant_of[i]],
+                "amount": float(amounts[i]),
+                "date": date,
+                "updated_at": date,
+            }
+        )
+    return transactions
+
+
+def _build(transactions: list[dict], batch: int = 10_000) -> UserSearchIndex:
+    # In batches, as SearchIndexes reads them from Mongo
+    index = UserSearchIndex()
+    for start in range(0, len(transactions), batch):
+        index.add_many(transactions[start : start + batch])
+    return index
+
+
+def _regex_scan(transactions: list[dict], query: str, limit: int) -> list:
+    # Every word must match somewhere, as separate $regex clauses would
+    patterns = [re.compile(re.escape(word), re.IGNORECASE) for word in query.split()]
+    matches = [
+        t
+        for t in transactions
+        if all(p.search(t["description"]) or p.search(t["merchant"]) for p in patterns)
+    ]
+    matches.sort(key=lambda t: t["date"], reverse=True)
+    return matches[:limit]
+
+
+def _timed(function, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _deep_page(index: UserSearchIndex, words: list[str], pages: int, limit: int):
+    after = None
+    for _ in range(pages):
+        hits = index.search(words, SearchFilters(), limit + 1, after)
+        last_id, last_score, last_date = hits[limit - 1]
+        after = (last_score, last_date, last_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--transactions", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(11)
+    transactions = _transactions(args.transactions, rng)
+    start = time.perf_counter()
+    index = _build(transactions)
+    build = time.perf_counter() - start
+    # Traced separately, as tracing slows the build several times over
+    tracemalloc.start()
+    _build(transactions)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"index            : {len(index):,} transactions built in {build:.1f}s, "
+        f"{index.nbytes / 2**20:.0f} MiB of arrays, {peak / 2**20:.0f} MiB traced"
+    )
+
+    last_year = SearchFilters(start_date=_START + timedelta(days=9 * 365))
+    queries = [
+        ("amazon", "amazon", SearchFilters()),
+        ("prefix amaz", "amaz", SearchFilters()),
+        ("uber trip", "uber trip", SearchFilters()),
+        ("coffee >= 50", "coffee", SearchFilters(min_amount=50)),
+        ("order, last year", "order", last_year),
+        ("prefix k", "k", SearchFilters()),
+    ]
+    failed = []
+    print(f"{'query':<18}{'p50 ms':>9}{'p95 ms':>9}{'regex scan ms':>15}")
+    for name, query, filters in queries:
+        words = query.split()
+        timings = _timed(
+            lambda: index.search(words, filters, args.limit + 1), args.repeat
+        )
+        scan = min(_timed(lambda: _regex_scan(transactions, query, args.limit), 2))
+        p50 = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{name:<18}{p50:>9.1f}{p95:>9.1f}{scan:>15.0f}")
+        if p95 > args.target_ms:
+            failed.append(name)
+
+    timings = _timed(lambda: _deep_page(index, ["amazon"], 10, args.limit), 5)
+    print(f"{'amazon, page 10':<18}{statistics.median(timings) / 10:>9.1f} per page")
+    if failed:
+        raise SystemExit(f"p95 above {args.target_ms} ms: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
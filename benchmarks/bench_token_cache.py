@@ -0,0 +1,41 @@
+"""Per-request JWT verification cost with and without the verified-token cache.
+
+Run with ``python -m benchmarks.bench_token_cache`` (needs the usual settings
+in the environment or ``.env``).
+"""
+
+import argparse
+import time
+
+from app.core.security import SecurityService
+from app.core.worker_pool import WorkerPool
+from app.util.cache import TTLCache
+
+
+def _measure(service: SecurityService, token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        service.decode_token(token)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    pool = WorkerPool("bench", "thread", 1, 0)
+    uncached = SecurityService(pool, TTLCache("bench_uncached", 0, 3600))
+    cached = SecurityService(pool, TTLCache("bench_cached", 1024, 3600))
+    token = uncached.create_access_token("64b7f0c2e4b0a1a2b3c4d5e6")
+
+    before = _measure(uncached, token, args.iterations)
+    after = _measure(cached, token, args.iterations)
+    print(f"iterations       : {args.iterations}")
+    print(f"jwt.decode       : {before * 1e6:8.2f} us/request")
+    print(f"cached claims    : {after * 1e6:8.2f} us/request")
+    print(f"speed-up         : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
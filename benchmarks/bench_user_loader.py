@@ -0,0 +1,112 @@
+"""Concurrent user lookups with and without the coalescing user loader.
+
+Run with ``python -m benchmarks.bench_user_loader [--concurrency 500]``. Users
+live in the in-memory Mongo stand-in with ``--db-latency-ms`` per round trip
+and at most ``MONGO_MAX_POOL_SIZE`` round trips at once.
+Each round fires ``--concurrency`` lookups at once, Zipf-distributed over
+``--users`` ids so popular users overlap, as the authentication path of
+concurrent requests does. The rounds run once with one ``find_one`` per
+lookup and once through ``UserService.get_by_id``; Mongo queries, wall time
+and the loader's coalescing ratio are reported. ``get_many`` over every
+user is timed against the same ids looked up one by one. The run fails if
+the loader does not save at least ``--min-reduction`` times the queries.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import numpy as np
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.security import get_security_service
+from app.db.instrumentation import track_db_operations
+from app.services.user_service import UserService
+from benchmarks.mongo_standin import StandInMongoClient
+
+
+async def _seed(client: StandInMongoClient, count: int) -> list[str]:
+    ids = [ObjectId() for _ in range(count)]
+    await client.get_collection("users").insert_many(
+        [
+            {"_id": id, "email": f"user{i}@example.com", "full_name": f"User {i}"}
+            for i, id in enumerate(ids)
+        ]
+    )
+    return [str(id) for id in ids]
+
+
+async def _rounds(lookup, rounds: list[list[str]]) -> tuple[float, int]:
+    with track_db_operations() as operations:
+        start = time.perf_counter()
+        for ids in rounds:
+            await asyncio.gather(*(lookup(id) for id in ids))
+        elapsed = time.perf_counter() - start
+    return elapsed, operations.total
+
+
+def _counter(name: str) -> float:
+    return sum(value for _, _, value in registry.get(name).samples())
+
+
+async def _run(args):
+    client = StandInMongoClient(
+        latency=args.db_latency_ms / 1000, pool_size=settings.MONGO_MAX_POOL_SIZE
+    )
+    ids = await _seed(client, args.users)
+    service = UserService(client, get_security_service())
+    collection = client.get_collection("users")
+
+    rng = np.random.default_rng(3)
+    picks = (rng.zipf(1.2, (args.rounds, args.concurrency)) - 1) % args.users
+    rounds = [[ids[i] for i in row] for row in picks.tolist()]
+    lookups = args.rounds * args.concurrency
+
+    direct, direct_queries = await _rounds(
+        lambda id: collection.find_one({"_id": ObjectId(id)}), rounds
+    )
+    fetches = _counter("loader_fetches")
+    loaded, loaded_queries = await _rounds(service.get_by_id, rounds)
+    ratio = lookups / (_counter("loader_fetches") - fetches)
+    print(
+        f"find_one each    : {lookups:,} lookups, {direct_queries:,} queries, "
+        f"{direct * 1000:.0f} ms"
+    )
+    print(
+        f"user loader      : {lookups:,} lookups, {loaded_queries:,} queries, "
+        f"{loaded * 1000:.0f} ms, {ratio:.0f} lookups per query"
+    )
+
+    start = time.perf_counter()
+    found = await service.get_many(ids)
+    many = time.perf_counter() - start
+    one_by_one, _ = await _rounds(
+        lambda id: collection.find_one({"_id": ObjectId(id)}), [[id] for id in ids]
+    )
+    print(
+        f"get_many         : {len(found):,} users in {many * 1000:.0f} ms, "
+        f"{one_by_one * 1000:.0f} ms one by one"
+    )
+    if direct_queries / loaded_queries < args.min_reduction:
+        raise SystemExit(f"User loader saved under x{args.min_reduction} queries")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    parser.add_argument("--min-reduction", type=float, default=10.0)
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
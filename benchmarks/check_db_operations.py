@@ -0,0 +1,117 @@
+"""Check the exact Mongo operations the user endpoints make per request.
+
+Run with ``python -m benchmarks.check_db_operations``. The real app is called
+over ASGI with Mongo replaced by the in-memory stand-in, and every request is
+wrapped in ``track_db_operations()``. For login, fetching the profile (from
+Mongo, then from the user cache) and updating it, the check asserts that:
+
+- the operations counted by the enclosing scope, by name, are exactly the
+  expected ones;
+- ``X-DB-Operations`` reports the same total, so the request's own scope
+  missed nothing and nothing ran after the response started.
+
+Users are loaded with a batched ``find`` that concurrent requests share.
+
+``benchmarks.bench_api`` only holds average counts to an upper bound; this
+pins them, so an extra read slipped into one of these paths fails here even
+when it stays within budget. Exits non-zero on any mismatch.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+
+import app.db.mongodb as mongodb
+from app.core.config import settings
+from app.db.instrumentation import track_db_operations
+from app.main import create_app
+from benchmarks.asgi_client import call
+from benchmarks.mongo_standin import StandInMongoClient
+
+_EMAIL = "check@example.com"
+_PASSWORD = "Check!dbops1"
+
+
+async def _counted(app, method: str, path: str, body: dict | None = None, **kwargs):
+    """The response and the operations counted around it, by name"""
+    data = json.dumps(body).encode() if body is not None else b""
+    with track_db_operations() as counter:
+        response = await call(app, method, path, data, **kwargs)
+    return response, counter
+
+
+async def _check(app) -> list[str]:
+    failures = []
+
+    async def expect(name: str, status: int, operations: dict[str, int], *args, **kw):
+        response, counter = await _counted(app, *args, **kw)
+        header = response.headers.get("x-db-operations")
+        print(f"{name:<16} HTTP {response.status}  X-DB-Operations {header}")
+        if response.status != status:
+            failures.append(f"{name}: HTTP {response.status}, expected {status}")
+        if counter.by_operation != operations:
+            failures.append(f"{name}: {counter.by_operation}, expected {operations}")
+        if header != str(counter.total):
+            failures.append(
+                f"{name}: X-DB-Operations {header}, counted {counter.total}"
+            )
+        return response
+
+    body = {"full_name": "Check User", "email": _EMAIL, "password": _PASSWORD}
+    await call(app, "POST", "/api/v1/users/register", json.dumps(body).encode())
+
+    # The user lookup and the refresh token family insert
+    login = {"email": _EMAIL, "password": _PASSWORD}
+    response = await expect(
+        "login",
+        200,
+        {"find_one": 1, "insert_one": 1},
+        "POST",
+        "/api/v1/users/login",
+        login,
+    )
+    token = json.loads(response.body)["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # The first request loads the user; later ones are served from the cache
+    await expect("get", 200, {"find": 1}, "GET", "/api/v1/users/me", headers=headers)
+    await expect("get (cached)", 200, {}, "GET", "/api/v1/users/me", headers=headers)
+
+    # One find-and-modify, whose result is the response; the user it evicted
+    # from the cache is loaded again by the next request
+    await expect(
+        "update",
+        200,
+        {"find_one_and_update": 1},
+        "PUT",
+        "/api/v1/users/me/update",
+        {"full_name": "Checked User"},
+        headers=headers,
+    )
+    await expect(
+        "get (updated)", 200, {"find": 1}, "GET", "/api/v1/users/me", headers=headers
+    )
+    return failures
+
+
+async def _run() -> list[str]:
+    # Lease writes would land in whichever request happens to be running
+    settings.RECURRING_SCHEDULER_ENABLED = False
+    mongodb._mongodb_client = StandInMongoClient()
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        return await _check(app)
+
+
+def main():
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+    failures = asyncio.run(_run())
+    if failures:
+        print("Unexpected Mongo operations:", *failures, sep="\n  ")
+        sys.exit(1)
+    print("Mongo operations match for login, get and update")
+
+
+if __name__ == "__main__":
+    main()
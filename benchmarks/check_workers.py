@@ -0,0 +1,201 @@
+"""Check that forked workers never share the parent's process-bound resources.
+
+Run with ``python -m benchmarks.check_workers [--workers 4] [--connect]``.
+The parent imports the app and builds every singleton the way a preloading
+server would: Mongo client, password hashing pool (with its thread started),
+token cache, login throttle, metrics and log listener. It then forks the
+workers. Each one reports what it got and the parent checks that none of it
+is the parent's:
+
+- the Mongo client, hashing pool, caches and throttle are new objects;
+- the hashing pool still runs jobs, where an inherited one would hang on
+  threads that did not survive the fork;
+- the log listener thread is alive;
+- metrics recorded by the parent are gone.
+
+With ``--connect`` (needs the configured MongoDB) the parent and every worker
+also run concurrent ``hello`` commands. The server-side connection ids they
+report must be disjoint, which proves no driver connection is shared.
+Exits non-zero on any failure.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from pydantic import SecretStr
+
+import app.core.logging_config as logging_config
+from app.core.config import settings
+from app.core.exceptions import DatabaseConnectionError
+from app.core.metrics import registry
+from app.core.security import (
+    get_login_throttle,
+    get_password_hash_pool,
+    get_security_service,
+    get_token_cache,
+)
+from app.db.mongodb import get_mongodb_client
+from app.main import create_app
+from app.services.user_service import get_user_cache
+
+_probe = registry.counter("check_workers_probe", "Incremented by the parent only")
+# Keeps the parent's objects alive in the children so their ids cannot be reused
+_parent_objects: list = []
+
+
+async def _connection_ids(client, probes: int) -> list[int]:
+    replies = await asyncio.gather(
+        *(client._db.command("hello") for _ in range(probes))
+    )
+    return sorted({reply["connectionId"] for reply in replies})
+
+
+def _singletons() -> dict[str, int]:
+    objects = {
+        "mongo_client": get_mongodb_client(),
+        "hash_pool": get_password_hash_pool(),
+        "token_cache": get_token_cache(),
+        "user_cache": get_user_cache(),
+        "login_throttle": get_login_throttle(),
+    }
+    _parent_objects.extend(objects.values())
+    return {name: id(value) for name, value in objects.items()}
+
+
+async def _prepare_parent(args) -> dict:
+    security = get_security_service()
+    hashed = await security.hash_password(SecretStr("Check!workers1"))
+    get_token_cache().set("parent-token", {"sub": "parent"})
+    _probe.inc()
+    report = {"singletons": _singletons(), "hashed": hashed, "connections": []}
+    if args.connect:
+        client = get_mongodb_client()
+        await client.connect()
+        report["connections"] = await _connection_ids(client, args.probes)
+    return report
+
+
+async def _worker_report(args, hashed: str) -> dict:
+    security = get_security_service()
+    try:
+        verified = await asyncio.wait_for(
+            security.verify_password(SecretStr("Check!workers1"), hashed),
+            timeout=args.timeout,
+        )
+    except TimeoutError:
+        verified = False
+    report = {
+        "pid": os.getpid(),
+        "singletons": _singletons(),
+        "hash_pool_works": verified,
+        "token_cache_size": len(get_token_cache()),
+        "log_listener_alive": bool(
+            logging_config._listener and logging_config._listener._thread.is_alive()
+        ),
+        "parent_metric": _probe.value(),
+        "connections": [],
+    }
+    if args.connect:
+        client = get_mongodb_client()
+        await client.connect()
+        report["connections"] = await _connection_ids(client, args.probes)
+        await client.close()
+    return report
+
+
+def _fork_worker(args, hashed: str) -> tuple[int, int]:
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        status = 0
+        try:
+            report = asyncio.run(_worker_report(args, hashed))
+        except BaseException as exc:
+            report, status = {"pid": os.getpid(), "error": repr(exc)}, 1
+        with os.fdopen(write_end, "w") as pipe:
+            json.dump(report, pipe)
+        logging_config.stop_logging()
+        os._exit(status)
+    os.close(write_end)
+    return pid, read_end
+
+
+def _failures(parent: dict, reports: list[dict]) -> list[str]:
+    failures = []
+    seen_connections = {cid: "parent" for cid in parent["connections"]}
+    for report in reports:
+        worker = f"worker {report['pid']}"
+        if "error" in report:
+            failures.append(f"{worker}: {report['error']}")
+            continue
+        for name, object_id in report["singletons"].items():
+            if object_id == parent["singletons"][name]:
+                failures.append(f"{worker}: inherited the parent's {name}")
+        if not report["hash_pool_works"]:
+            failures.append(f"{worker}: hashing pool hung or gave a wrong result")
+        if report["token_cache_size"]:
+            failures.append(f"{worker}: token cache holds the parent's entries")
+        if not report["log_listener_alive"]:
+            failures.append(f"{worker}: log listener thread is not running")
+        if report["parent_metric"]:
+            failures.append(f"{worker}: metrics still hold the parent's samples")
+        for cid in report["connections"]:
+            if cid in seen_connections:
+                failures.append(
+                    f"{worker}: connection {cid} shared with {seen_connections[cid]}"
+                )
+            seen_connections[cid] = worker
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--connect", action="store_true", help="Compare server-side connection ids"
+    )
+    parser.add_argument(
+        "--probes", type=int, default=8, help="Concurrent hello commands per process"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=10, help="Seconds before a hash job hangs"
+    )
+    args = parser.parse_args()
+    logging.getLogger(settings.APP_NAME).setLevel(logging.WARNING)
+
+    # Import-time state of a preloading server, then the singletons on top
+    create_app()
+    try:
+        parent = asyncio.run(_prepare_parent(args))
+    except DatabaseConnectionError:
+        sys.exit("--connect needs a running MongoDB at MONGO_URI; none answered")
+    forked = [_fork_worker(args, parent["hashed"]) for _ in range(args.workers)]
+
+    reports = []
+    for pid, read_end in forked:
+        with os.fdopen(read_end) as pipe:
+            output = pipe.read()
+        os.waitpid(pid, 0)
+        reports.append(json.loads(output) if output else {"pid": pid, "error": "died"})
+
+    for report in reports:
+        connections = report.get("connections") or "-"
+        print(f"worker {report['pid']}: connections {connections}")
+    if args.connect:
+        print(f"parent: connections {parent['connections']}")
+    failures = _failures(parent, reports)
+    if failures:
+        print("Shared state after fork:", *failures, sep="\n  ")
+        sys.exit(1)
+    print(f"{args.workers} workers, no state shared with the parent or each other")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+"""In-memory stand-in for the Motor collections the services use.
+
+It implements the subset of the collection API the app calls - equality and
+range filters, ``$or``, projections, sorts, ``$set``/``$inc``/``$push`` updates with
+upserts, unique indexes and bulk writes - so the real app can be driven
+without a mongod. ``latency`` adds an ``asyncio.sleep`` to every round trip to
+stand in for the network; it is not a model of Mongo's own query costs.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+from pymongo import (
+    ASCENDING,
+    DeleteMany,
+    DeleteOne,
+    InsertOne,
+    ReplaceOne,
+    ReturnDocument,
+    UpdateMany,
+    UpdateOne,
+)
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.db.indexes import INDEXES
+from app.db.instrumentation import CountedCollection
+from app.db.mongodb import MongoDBClient
+
+_MISSING = object()
+
+
+def _compare(op: str, value, arg) -> bool:
+    if op == "$eq":
+        return value == arg
+    if op == "$ne":
+        return value != arg
+    if op == "$in":
+        return value in arg
+    if op == "$nin":
+        return value not in arg
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if value is _MISSING or value is None:
+        return False
+    if op == "$gt":
+        return value > arg
+    if op == "$gte":
+        return value >= arg
+    if op == "$lt":
+        return value < arg
+    if op == "$lte":
+        return value <= arg
+    raise NotImplementedError(f"Query operator {op} is not supported")
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, q) for q in condition):
+                return False
+        elif (
+            isinstance(condition, dict)
+            and condition
+            and all(k[:1] == "$" for k in condition)
+        ):
+            value = document.get(key, _MISSING)
+            if not all(_compare(op, value, arg) for op, arg in condition.items()):
+                return False
+        elif document.get(key, _MISSING) != condition:
+            return False
+    return True
+
+
+def _project(document: dict, projection) -> dict:
+    if not projection:
+        return dict(document)
+    if isinstance(projection, list | tuple):
+        projection = dict.fromkeys(projection, 1)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        result = {k: document[k] for k in include if k in document}
+        if projection.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    return {k: v for k, v in document.items() if projection.get(k, 1)}
+
+
+def _sort(documents: list[dict], keys) -> list[dict]:
+    if isinstance(keys, str):
+        keys = [(keys, ASCENDING)]
+    # Stable sorts applied from the least to the most significant key
+    for field, direction in reversed(list(keys)):
+        documents.sort(
+            key=lambda d: (d.get(field) is not None, d.get(field)),
+            reverse=direction < 0,
+        )
+    return documents
+
+
+def _apply_update(document: dict, update: dict, inserting: bool = False):
+    if not any(k[:1] == "$" for k in update):
+        replaced = {"_id": document["_id"], **update}
+        document.clear()
+        document.update(replaced)
+        return
+    for op, fields in update.items():
+        if op == "$set" or (op == "$setOnInsert" and inserting):
+            document.update(fields)
+        elif op == "$inc":
+            for field, amount in fields.items():
+                document[field] = document.get(field, 0) + amount
+        elif op == "$unset":
+            for field in fields:
+                document.pop(field, None)
+        elif op == "$push":
+            for field, value in fields.items():
+                each = value.get("$each") if isinstance(value, dict) else None
+                # A new list, so a copy taken before the update is unaffected
+                pushed = document.get(field, []) + ([value] if each is None else each)
+                if isinstance(value, dict) and "$slice" in value:
+                    limit = value["$slice"]
+                    pushed = pushed[limit:] if limit < 0 else pushed[:limit]
+                document[field] = pushed
+        elif op != "$setOnInsert":
+            raise NotImplementedError(f"Update operator {op} is not supported")
+
+
+class _UniqueIndex:
+    def __init__(self, fields: tuple[str, ...], partial: dict | None):
+        self.fields = fields
+        self.partial = partial
+        self.entries: dict[tuple, ObjectId] = {}
+
+    def key(self, document: dict):
+        if self.partial and not matches(document, self.partial):
+            return None
+        return tuple(document.get(field) for field in self.fields)
+
+
+class StandInCursor:
+    def __init__(self, collection: "StandInCollection", query: dict, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = (
+            [(key_or_list, direction)] if direction is not None else key_or_list
+        )
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    async def close(self):
+        pass
+
+    def _results(self) -> list[dict]:
+        documents = self._collection.select(self._query)
+        if self._sort:
+            documents = _sort(documents, self._sort)
+        documents = documents[self._skip :]
+        if self._limit:
+            documents = documents[: self._limit]
+        return [_project(d, self._projection) for d in documents]
+
+    async def to_list(self, length: int | None = None):
+        await self._collection.round_trip()
+        documents = self._results()
+        return documents[:length] if length else documents
+
+    async def __aiter__(self):
+        await self._collection.round_trip()
+        for document in self._results():
+            yield document
+
+
+class StandInCollection:
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.0,
+        pool: asyncio.Semaphore | None = None,
+    ):
+        self.name = name
+        self._latency = latency
+        self._pool = pool
+        self._documents: dict = {}
+        self._unique: list[_UniqueIndex] = []
+
+    async def round_trip(self):
+        if self._pool is None:
+            # Yield even without latency so concurrent requests interleave
+            await asyncio.sleep(self._latency)
+            return
+        async with self._pool:
+            await asyncio.sleep(self._latency)
+
+    def select(self, query: dict) -> list[dict]:
+        if "_id" in query and not isinstance(query["_id"], dict):
+            document = self._documents.get(query["_id"])
+            return [document] if document and matches(document, query) else []
+        if "_id" in query and query["_id"].keys() == {"$in"}:
+            # Point lookups on the _id index, one per listed id
+            documents = map(self._documents.get, dict.fromkeys(query["_id"]["$in"]))
+            return [d for d in documents if d is not None and matches(d, query)]
+        for index in self._unique:
+            # Exact lookups on a unique index skip the scan, as Mongo would
+            if set(query) == set(index.fields) and not any(
+                isinstance(value, dict) for value in query.values()
+            ):
+                _id = index.entries.get(tuple(query[f] for f in index.fields))
+                return [self._documents[_id]] if _id is not None else []
+        return [d for d in self._documents.values() if matches(d, query)]
+
+    def _index(self, document: dict):
+        keys = []
+        for index in self._unique:
+            key = index.key(document)
+            if key is None:
+                continue
+            owner = index.entries.get(key)
+            if owner is not None and owner != document["_id"]:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error index: {index.fields}", 11000
+                )
+            keys.append((index, key))
+        for index, key in keys:
+            index.entries[key] = document["_id"]
+
+    def _unindex(self, document: dict):
+        for index in self._unique:
+            key = index.key(document)
+            if key is not None and index.entries.get(key) == document["_id"]:
+                del index.entries[key]
+
+    def _insert(self, document: dict):
+        document.setdefault("_id", ObjectId())
+        stored = dict(document)
+        self._index(stored)
+        self._documents[stored["_id"]] = stored
+        return stored["_id"]
+
+    def _update(self, document: dict, update: dict):
+        previous = dict(document)
+        self._unindex(document)
+        _apply_update(document, update)
+        try:
+            self._index(document)
+        except DuplicateKeyError:
+            document.clear()
+            document.update(previous)
+            self._index(document)
+            raise
+
+    def _upsert(self, query: dict, update: dict) -> ObjectId:
+        document = {
+            k: v for k, v in query.items() if k[:1] != "$" and not isinstance(v, dict)
+        }
+        document["_id"] = document.get("_id", ObjectId())
+        _apply_update(document, update, inserting=True)
+        return self._insert(document)
+
+    def _update_matching(self, query, update, upsert=False, many=False):
+        documents = self.select(query)
+        if not many:
+            documents = documents[:1]
+        for document in documents:
+            self._update(document, update)
+        upserted_id = None
+        if not documents and upsert:
+            upserted_id = self._upsert(query, update)
+        return SimpleNamespace(
+            matched_count=len(documents),
+            modified_count=len(documents),
+            upserted_id=upserted_id,
+            acknowledged=True,
+        )
+
+    def _delete_matching(self, query, many=False):
+        documents = self.select(query)
+        if not many:
+            documents = documents[:1]
+        for document in documents:
+            self._unindex(document)
+            del self._documents[document["_id"]]
+        return SimpleNamespace(deleted_count=len(documents), acknowledged=True)
+
+    async def create_index(self, keys, unique=False, **kwargs):
+        await self.round_trip()
+        if isinstance(keys, str):
+            keys = [(keys, ASCENDING)]
+        fields = tuple(field for field, _ in keys)
+        if unique:
+            index = _UniqueIndex(fields, kwargs.get("partialFilterExpression"))
+            for document in self._documents.values():
+                key = index.key(document)
+                if key is not None:
+                    index.entries[key] = document["_id"]
+            self._unique.append(index)
+        return kwargs.get("name") or "_".join(f"{f}_1" for f in fields)
+
+    async def insert_one(self, document: dict, session=None):
+        await self.round_trip()
+        return SimpleNamespace(inserted_id=self._insert(document), acknowledged=True)
+
+    async def insert_many(self, documents, ordered=True, session=None):
+        await self.round_trip()
+        inserted, errors = [], []
+        for position, document in enumerate(documents):
+            try:
+                inserted.append(self._insert(document))
+            except DuplicateKeyError as exc:
+                errors.append({"index": position, "code": 11000, "errmsg": str(exc)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return SimpleNamespace(inserted_ids=inserted, acknowledged=True)
+
+    async def find_one(self, filter=None, projection=None, sort=None, session=None):
+        await self.round_trip()
+        documents = self.select(filter or {})
+        if sort:
+            documents = _sort(documents, sort)
+        return _project(documents[0], projection) if documents else None
+
+    def find(self, filter=None, projection=None, session=None):
+        return StandInCursor(self, filter or {}, projection)
+
+    async def find_one_and_update(
+        self,
+        filter,
+        update,
+        projection=None,
+        sort=None,
+        upsert=False,
+        return_document=ReturnDocument.BEFORE,
+        session=None,
+    ):
+        await self.round_trip()
+        documents = self.select(filter)
+        if sort:
+            documents = _sort(documents, sort)
+        if not documents:
+            if not upsert:
+                return None
+            _id = self._upsert(filter, update)
+            if return_document == ReturnDocument.AFTER:
+                return _project(self._documents[_id], projection)
+            return None
+        document = documents[0]
+        previous = dict(document)
+        self._update(document, update)
+        result = document if return_document == ReturnDocument.AFTER else previous
+        return _project(result, projection)
+
+    async def find_one_and_delete(self, filter, projection=None, session=None):
+        await self.round_trip()
+        documents = self.select(filter)
+        if not documents:
+            return None
+        document = documents[0]
+        self._delete_matching({"_id": document["_id"]})
+        return _project(document, projection)
+
+    async def update_one(self, filter, update, upsert=False, session=None):
+        await self.round_trip()
+        return self._update_matching(filter, update, upsert)
+
+    async def update_many(self, filter, update, upsert=False, session=None):
+        await self.round_trip()
+        return self._update_matching(filter, update, upsert, many=True)
+
+    async def replace_one(self, filter, replacement, upsert=False, session=None):
+        await self.round_trip()
+        return self._update_matching(filter, replacement, upsert)
+
+    async def delete_one(self, filter, session=None):
+        await self.round_trip()
+        return self._delete_matching(filter)
+
+    async def delete_many(self, filter, session=None):
+        await self.round_trip()
+        return self._delete_matching(filter, many=True)
+
+    async def count_documents(self, filter, session=None):
+        await self.round_trip()
+        return len(self.select(filter))
+
+    async def distinct(self, key, filter=None, session=None):
+        await self.round_trip()
+        values = (d.get(key) for d in self.select(filter or {}))
+        return list(dict.fromkeys(v for v in values if v is not None))
+
+    async def bulk_write(self, requests, ordered=True, session=None):
+        await self.round_trip()
+        counts = dict(inserted=0, matched=0, modified=0, deleted=0, upserted=0)
+        for request in requests:
+            if isinstance(request, InsertOne):
+                self._insert(request._doc)
+                counts["inserted"] += 1
+            elif isinstance(request, UpdateOne | UpdateMany | ReplaceOne):
+                many = isinstance(request, UpdateMany)
+                result = self._update_matching(
+                    request._filter, request._doc, request._upsert, many
+                )
+                counts["matched"] += result.matched_count
+                counts["modified"] += result.modified_count
+                counts["upserted"] += result.upserted_id is not None
+            elif isinstance(request, DeleteOne | DeleteMany):
+                many = isinstance(request, DeleteMany)
+                result = self._delete_matching(request._filter, many)
+                counts["deleted"] += result.deleted_count
+            else:
+                raise NotImplementedError(f"{type(request).__name__} is not supported")
+        return SimpleNamespace(
+            inserted_count=counts["inserted"],
+            matched_count=counts["matched"],
+            modified_count=counts["modified"],
+            deleted_count=counts["deleted"],
+            upserted_count=counts["upserted"],
+            acknowledged=True,
+        )
+
+    def aggregate(self, pipeline, session=None):
+        raise NotImplementedError("Aggregation pipelines are not supported")
+
+
+class StandInMongoClient(MongoDBClient):
+    """``MongoDBClient`` backed by in-memory collections.
+
+    ``connect`` creates the app's unique indexes on the stand-in so duplicate
+    emails and re-imported rows are rejected as they are in production.
+    ``pool_size`` caps round trips in progress at once, as the driver's
+    connection pool does; by default they are unlimited.
+    """
+
+    def __init__(self, latency: float = 0.0, pool_size: int | None = None):
+        super().__init__(uri="mongodb://stand-in", db_name="stand-in")
+        self._latency = latency
+        self._pool = asyncio.Semaphore(pool_size) if pool_size else None
+        self._collections: dict[str, StandInCollection] = {}
+
+    def _collection(self, name: str) -> StandInCollection:
+        if name not in self._collections:
+            self._collections[name] = StandInCollection(name, self._latency, self._pool)
+        return self._collections[name]
+
+    async def connect(self):
+        if self._client is None:
+            self._client = self._db = self._collections
+            # Only the unique indexes change behaviour here
+            for spec in INDEXES:
+                if spec.unique:
+                    await self._collection(spec.collection).create_index(
+                        list(spec.keys),
+                        unique=True,
+                        name=spec.name,
+                        partialFilterExpression=spec.partial_filter,
+                    )
+
+    async def close(self):
+        self._client = self._db = None
+
+    def transaction(self):
+        return _NoTransaction()
+
+    def get_collection(self, name: str):
+        return CountedCollection(self._collection(name))
+
+
+class _NoTransaction:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc_info):
+        return False